@@ -0,0 +1,123 @@
+"""
+Times decoding transactions.json partitions and encoding transaction responses, per 100k rows.
+
+Decoding compares the previous json.load plus StoredTransactions(**data) path with single-pass model_validate_json and
+with the unvalidated path taken for files whose manifest checksum matches. Encoding compares a FastAPI endpoint that
+returns list[Transaction], which FastAPI validates against the response model before serializing, with one returning
+TransactionListResponse.
+
+Usage: python -m benchmarks.bench_decode [--rows 100000] [--repeat 3]
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import random
+import time
+from datetime import date, timedelta
+from typing import Callable
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic_core import from_json
+
+from src.models import StoredTransactions, Transaction
+from src.routers.transactions import TransactionListResponse
+from src.services.storage.transaction_batch import TransactionBatch
+
+MERCHANTS = ["Tesco", "Sainsbury's", "Netflix", "Spotify", "Amazon", "Shell", "Costa", "Uber", "TfL", "Pret"]
+
+
+def build_transactions(rows: int) -> list[Transaction]:
+    rng = random.Random(0)
+    first_day = date(2025, 1, 1)
+
+    return [
+        Transaction(
+            bank_name="barclays",
+            date=first_day + timedelta(days=position * 28 // rows),
+            description=f"{rng.choice(MERCHANTS)} {rng.randrange(100)}",
+            amount_in=0.0,
+            amount_out=rng.randrange(1, 10000) / 100,
+            balance=rng.randrange(-100000, 1000000) / 100,
+        )
+        for position in range(rows)
+    ]
+
+
+def measure(query: Callable[[], object], repeat: int) -> float:
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        query()
+        timings.append(time.perf_counter() - start)
+
+    return min(timings)
+
+
+def decode_json_load(file_bytes: bytes) -> TransactionBatch:
+    """The previous read path: build a dict tree, then validate it into models."""
+
+    json_data = json.load(io.BytesIO(file_bytes))
+    return TransactionBatch.from_transactions(StoredTransactions(**json_data).transactions)
+
+
+def decode_validate_json(file_bytes: bytes) -> TransactionBatch:
+    return TransactionBatch.from_transactions(StoredTransactions.model_validate_json(file_bytes).transactions)
+
+
+def decode_trusted(file_bytes: bytes, checksum: str) -> TransactionBatch:
+    assert hashlib.sha256(file_bytes).hexdigest() == checksum
+    return TransactionBatch.from_records(from_json(file_bytes)["transactions"])
+
+
+def build_app(transactions: list[Transaction]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/validated")
+    async def get_validated() -> list[Transaction]:
+        return transactions
+
+    @app.get("/direct")
+    async def get_direct() -> list[Transaction]:
+        return TransactionListResponse(transactions)
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark partition decoding and response encoding.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    scale = 100_000 / args.rows
+    transactions = build_transactions(args.rows)
+    file_bytes = StoredTransactions(transactions=transactions).model_dump_json().encode()
+    checksum = hashlib.sha256(file_bytes).hexdigest()
+    client = TestClient(build_app(transactions))
+
+    print(f"{args.rows} rows, {len(file_bytes) / 1024 / 1024:.1f} MiB partition, figures per 100k rows")
+
+    for name, query in [
+        ("encode_partition", lambda: StoredTransactions(transactions=transactions).model_dump_json().encode()),
+        ("decode_json_load", lambda: decode_json_load(file_bytes)),
+        ("decode_validate_json", lambda: decode_validate_json(file_bytes)),
+        ("decode_trusted", lambda: decode_trusted(file_bytes, checksum)),
+        ("response_validated", lambda: client.get("/validated")),
+        ("response_direct", lambda: client.get("/direct")),
+    ]:
+        print(f"{name:<24} best {measure(query, args.repeat) * scale * 1000:9.1f} ms")
+
+    assert (
+        decode_json_load(file_bytes).to_transactions()
+        == decode_validate_json(file_bytes).to_transactions()
+        == decode_trusted(file_bytes, checksum).to_transactions()
+    )
+    assert client.get("/validated").json() == client.get("/direct").json()
+
+
+if __name__ == "__main__":
+    main()
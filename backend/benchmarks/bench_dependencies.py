@@ -0,0 +1,81 @@
+"""
+Measures the per-request cost of resolving settings and the statement parser, comparing the previous
+build-everything-per-request path against the process-lifetime singletons.
+
+Usage: python -m benchmarks.bench_dependencies [--requests 2000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from pydantic_ai import Agent
+from pydantic_ai.models.google import GoogleModel, GoogleModelSettings
+from pydantic_ai.providers.google import GoogleProvider
+
+from src.dependencies import get_model_statement_parser, get_settings
+from src.models import ParsedTransaction
+from src.settings import Settings
+
+
+def per_request_setup() -> Agent:
+    """The previous path: a new Settings, prompt read and provider/model/agent for every request."""
+
+    settings = Settings()
+    provider = GoogleProvider(api_key=settings.google_gen_ai_api_key)
+    model = GoogleModel(model_name=settings.google_gen_ai_model_name, provider=provider)
+    return Agent(
+        model=model,
+        model_settings=GoogleModelSettings(
+            temperature=settings.google_gen_ai_model_temp,
+            max_tokens=settings.google_gen_ai_model_max_tokens,
+            top_p=settings.google_gen_ai_model_top_p,
+        ),
+        instructions=settings.google_gen_ai_model_instructions,
+        output_type=list[ParsedTransaction],
+    )
+
+
+def singleton_setup() -> Agent:
+    return get_model_statement_parser(get_settings()).agent
+
+
+def measure(setup: Callable[[], Agent], requests: int) -> float:
+    # the first call builds the singletons, which the app lifespan does before serving any request
+    setup()
+    start = time.perf_counter()
+
+    for _ in range(requests):
+        setup()
+
+    return (time.perf_counter() - start) / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark per-request dependency resolution.")
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        prompt_file_path = Path(tmp_dir) / "prompt.txt"
+        prompt_file_path.write_text("Extract every transaction from the statement.\n" * 50)
+        os.environ.update(
+            GOOGLE_GEN_AI_API_KEY="bench-api-key",
+            GOOGLE_GEN_AI_MODEL_NAME="gemini-bench",
+            GOOGLE_GEN_AI_MODEL_TEMP="1",
+            GOOGLE_GEN_AI_MODEL_MAX_TOKENS="8000",
+            GOOGLE_GEN_AI_MODEL_TOP_P="0.95",
+            GOOGLE_GEN_AI_MODEL_PROMPT_PATH=str(prompt_file_path),
+            LOCAL_STORAGE_DIR_PATH=tmp_dir,
+        )
+
+        for name, setup in [("per_request", per_request_setup), ("singleton", singleton_setup)]:
+            seconds = measure(setup, args.requests)
+            print(f"{name:<12} {seconds * 1_000_000:10.1f} us per request")
+
+
+if __name__ == "__main__":
+    main()
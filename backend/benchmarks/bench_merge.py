@@ -0,0 +1,146 @@
+"""
+Compares the lazy k-way partition merge against the previous extend-and-sort query path.
+
+Usage: python -m benchmarks.bench_merge [--rows 1000000] [--banks 5] [--years 4]
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+from itertools import islice
+from typing import Callable
+
+from src.models import PartitionManifestEntry, Transaction
+from src.services.storage.merge import merge_partitions
+from src.services.storage.transaction_batch import TransactionBatch
+
+
+def build_partitions(
+    rows: int, banks: int, years: int
+) -> dict[tuple[str, int, int], tuple[PartitionManifestEntry, list[Transaction]]]:
+    rng = random.Random(0)
+    partition_count = banks * years * 12
+    rows_per_partition = rows // partition_count
+    partitions = {}
+
+    for bank_index in range(banks):
+        bank_name = f"bank_{bank_index}"
+
+        for year in range(2020, 2020 + years):
+            for month in range(1, 13):
+                first_day = date(year, month, 1)
+                days = [first_day + timedelta(days=rng.randrange(28)) for _ in range(rows_per_partition)]
+                days.sort()
+                transactions = [
+                    Transaction.model_construct(
+                        bank_name=bank_name,
+                        date=day,
+                        description=f"Payment {position}",
+                        amount_in=0.0,
+                        amount_out=1.0,
+                        balance=100.0,
+                    )
+                    for position, day in enumerate(days)
+                ]
+                entry = PartitionManifestEntry(
+                    bank_name=bank_name,
+                    year=year,
+                    month=month,
+                    row_count=len(transactions),
+                    min_date=days[0],
+                    max_date=days[-1],
+                    file_size=0,
+                    checksum="",
+                )
+                partitions[(bank_name, year, month)] = (entry, transactions)
+
+    return partitions
+
+
+def extend_and_sort(partitions: dict) -> list[Transaction]:
+    """The previous get_all_transactions: sort inside each bank, then sort everything again."""
+
+    all_transactions: list[Transaction] = []
+    bank_names = sorted({bank_name for bank_name, _, _ in partitions})
+
+    for bank_name in bank_names:
+        transactions_for_bank: list[Transaction] = []
+
+        for (partition_bank_name, _, _), (_, transactions) in sorted(partitions.items()):
+            if partition_bank_name == bank_name:
+                transactions_for_bank.extend(transactions)
+
+        transactions_for_bank.sort(key=lambda t: t.date)
+        all_transactions.extend(transactions_for_bank)
+
+    all_transactions.sort(key=lambda t: t.date)
+    return all_transactions
+
+
+def single_sort(partitions: dict) -> list[Transaction]:
+    """The current get_all_* path: concatenate in bank/year/month order and run one stable sort."""
+
+    all_transactions: list[Transaction] = []
+
+    for _, (_, transactions) in sorted(partitions.items()):
+        all_transactions.extend(transactions)
+
+    all_transactions.sort(key=lambda t: t.date)
+    return all_transactions
+
+
+def k_way_merge(partitions: dict, batches: dict, limit: int | None = None) -> list[Transaction]:
+    entries = [entry for entry, _ in partitions.values()]
+    load_partition = lambda entry: batches[(entry.bank_name, entry.year, entry.month)]
+    keyed_transactions = merge_partitions(entries, load_partition)
+    return [transaction for _, transaction in islice(keyed_transactions, limit)]
+
+
+def measure(query: Callable[[], list[Transaction]], repeat: int) -> tuple[list[Transaction], float, int]:
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = query()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    query()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, min(timings), peak_bytes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the k-way partition merge.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--banks", type=int, default=5)
+    parser.add_argument("--years", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    partitions = build_partitions(rows=args.rows, banks=args.banks, years=args.years)
+    # partitions are cached as batches, so building them is not part of any query
+    batches = {key: TransactionBatch.from_transactions(transactions) for key, (_, transactions) in partitions.items()}
+    row_count = sum(len(transactions) for _, transactions in partitions.values())
+    print(f"{row_count} rows in {len(partitions)} partitions")
+
+    results = {}
+
+    for name, query in [
+        ("extend_and_sort", lambda: extend_and_sort(partitions)),
+        ("single_sort", lambda: single_sort(partitions)),
+        ("k_way_merge", lambda: k_way_merge(partitions, batches)),
+        ("k_way_merge_first_100", lambda: k_way_merge(partitions, batches, limit=100)),
+    ]:
+        results[name], seconds, peak_bytes = measure(query, args.repeat)
+        print(f"{name:<24} best {seconds * 1000:9.1f} ms   peak {peak_bytes / 1024 / 1024:8.1f} MiB")
+
+    assert results["extend_and_sort"] == results["single_sort"] == results["k_way_merge"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Measures description search latency on the local JSON and SQLite backends once their indexes are warm.
+
+Usage: python -m benchmarks.bench_search [--rows 1000000] [--banks 5] [--years 4]
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable
+
+from src.models import Transaction
+from src.services.storage.local_storage_service import LocalStorageService
+from src.services.storage.partition_cache import PartitionCache
+from src.services.storage.pagination import TransactionPage
+from src.services.storage.sqlite_storage_service import SqliteStorageService
+from src.services.storage.storage_service import PartitionKey, StorageService
+
+MERCHANTS = [
+    "Netflix", "Spotify", "Tesco", "Sainsburys", "Amazon", "Uber", "Deliveroo", "Shell", "Boots", "Pret",
+    "Costa", "Greggs", "Argos", "Waitrose", "Lidl", "Aldi", "Trainline", "Apple", "Google", "Vodafone",
+]
+KINDS = ["Card Payment", "Direct Debit", "Online Transfer", "Contactless", "Refund"]
+
+QUERIES = ["netflix", "net*", "card payment", "tesco refund", "s*", "nomatch"]
+
+
+def build_partitions(rows: int, banks: int, years: int) -> dict[PartitionKey, list[Transaction]]:
+    rng = random.Random(0)
+    rows_per_partition = rows // (banks * years * 12)
+    partitions = {}
+
+    for bank_index in range(banks):
+        bank_name = f"bank_{bank_index}"
+
+        for year in range(2020, 2020 + years):
+            for month in range(1, 13):
+                first_day = date(year, month, 1)
+                days = sorted(first_day + timedelta(days=rng.randrange(28)) for _ in range(rows_per_partition))
+                partitions[(bank_name, year, month)] = [
+                    Transaction.model_construct(
+                        bank_name=bank_name,
+                        date=day,
+                        description=f"{rng.choice(MERCHANTS)} {rng.choice(KINDS)} {rng.randrange(10_000)}",
+                        amount_in=0.0,
+                        amount_out=1.0,
+                        balance=100.0,
+                    )
+                    for day in days
+                ]
+
+    return partitions
+
+
+def measure(search: Callable[[], TransactionPage], repeat: int) -> tuple[float, float]:
+    # the first call loads or builds the index, which is a one-off cost per partition
+    search()
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        search()
+        timings.append(time.perf_counter() - start)
+
+    return statistics.median(timings), max(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark transaction description search.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--banks", type=int, default=5)
+    parser.add_argument("--years", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    partitions = build_partitions(rows=args.rows, banks=args.banks, years=args.years)
+    row_count = sum(len(transactions) for transactions in partitions.values())
+    print(f"{row_count} rows in {len(partitions)} partitions")
+
+    with tempfile.TemporaryDirectory() as storage_dir:
+        storage_services: dict[str, StorageService] = {
+            # with a partition cache, as the app runs it
+            "local": LocalStorageService(Path(storage_dir) / "local", PartitionCache(max_entries=256)),
+            "sqlite": SqliteStorageService(Path(storage_dir) / "storage.sqlite3"),
+        }
+
+        for name, storage_service in storage_services.items():
+            start = time.perf_counter()
+            storage_service.store_many_transactions(partitions)
+            print(f"{name:<8} stored and indexed in {time.perf_counter() - start:6.1f} s")
+
+        for query in QUERIES:
+            for name, storage_service in storage_services.items():
+                median_seconds, max_seconds = measure(
+                    lambda: storage_service.search_transactions(query=query, limit=args.limit), args.repeat
+                )
+                print(
+                    f"{name:<8} {query!r:<16} median {median_seconds * 1000:7.2f} ms   max {max_seconds * 1000:7.2f} ms"
+                )
+
+        storage_services["sqlite"].close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""
+Benchmarks every StorageService method on each backend and every GET /transactions/ filter combination through the
+ASGI app, against a dataset built by benchmarks.data_generator.
+
+Each case is run once to warm caches, then --repeat timed runs give latency percentiles, throughput in operations and
+rows per second, and one further run under tracemalloc gives the peak memory it allocates. Nothing touches the
+network: requests go straight to the app in process and the model parser is never built.
+
+Results are written as JSON, by default to benchmarks/results/<commit>.json (ignored by git), so runs from two
+commits can be compared with benchmarks.compare_results.
+
+Usage: python -m benchmarks.bench_suite [--banks 3] [--years 2] [--transactions-per-month 200] [--seed 0]
+    [--repeat 20] [--backend local --backend sqlite ...] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import gc
+import io
+import json
+import math
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import httpx
+import pandas as pd
+
+from benchmarks.data_generator import (
+    FIRST_YEAR,
+    DatasetSpec,
+    build_storage_service,
+    fill_storage,
+    generate_partition,
+    generate_statement,
+)
+from src.dependencies import get_settings, get_storage_service
+from src.main import app
+from src.routers.transactions import NDJSON_MEDIA_TYPE
+from src.services.storage.local_storage_service import LocalStorageService
+from src.services.storage.pagination import TransactionPage
+from src.services.storage.partition_cache import PartitionCache
+from src.services.storage.sqlite_storage_service import SqliteStorageService
+from src.services.storage.storage_service import StorageService
+from src.settings import Settings
+
+BACKENDS = ["local", "parquet", "sqlite"]
+RESULTS_DIR_PATH = Path(__file__).parent / "results"
+
+SEARCH_QUERY = "netflix card*"
+
+
+def get_storage_methods() -> set[str]:
+    return {name for name, value in vars(StorageService).items() if callable(value) and not name.startswith("_")}
+
+
+def count_rows(result: Any) -> int | None:
+    if isinstance(result, TransactionPage):
+        return len(result.transactions)
+
+    if isinstance(result, (list, pd.DataFrame)):
+        return len(result)
+
+    return None
+
+
+def build_storage_cases(storage_service: StorageService, spec: DatasetSpec) -> list[tuple[str, Callable[[], Any]]]:
+    """
+    Returns (name, query) pairs covering every public StorageService method, named after the method with any variant
+    in brackets. Iterators are drained so their cost is measured. Writes store the data already held, so the dataset
+    is the same after each one.
+    """
+
+    bank_name = spec.bank_names[0]
+    year, month = FIRST_YEAR, 1
+    transactions = generate_partition(spec, bank_name, year, month)
+    statement_bytes = generate_statement(bank_name, year, month, transactions)
+    year_partitions = {(bank_name, year, m): generate_partition(spec, bank_name, year, m) for m in range(1, 13)}
+    range_end = date(year, 3, 31)
+
+    return [
+        ("store_statement", lambda: storage_service.store_statement(statement_bytes, bank_name, year, month)),
+        (
+            "store_statement_stream",
+            lambda: storage_service.store_statement_stream(io.BytesIO(statement_bytes), bank_name, year, month),
+        ),
+        (
+            "get_statement_bytes_for_bank_on_date",
+            lambda: storage_service.get_statement_bytes_for_bank_on_date(bank_name, year, month),
+        ),
+        (
+            "get_statement_for_bank_on_date",
+            lambda: storage_service.get_statement_for_bank_on_date(bank_name, year, month),
+        ),
+        ("store_transactions", lambda: storage_service.store_transactions(transactions, bank_name, year, month)),
+        ("store_many_transactions[bank,year]", lambda: storage_service.store_many_transactions(year_partitions)),
+        (
+            "get_transactions_for_bank_for_date",
+            lambda: storage_service.get_transactions_for_bank_for_date(bank_name, year, month),
+        ),
+        ("get_all_transactions_for_bank", lambda: storage_service.get_all_transactions_for_bank(bank_name)),
+        ("get_all_transactions_for_date", lambda: storage_service.get_all_transactions_for_date(year, month)),
+        (
+            "get_all_transactions_for_bank_for_year",
+            lambda: storage_service.get_all_transactions_for_bank_for_year(bank_name, year),
+        ),
+        ("get_all_transactions_for_year", lambda: storage_service.get_all_transactions_for_year(year)),
+        ("get_all_transactions", lambda: storage_service.get_all_transactions()),
+        ("list_partitions", lambda: storage_service.list_partitions()),
+        ("iter_keyed_transactions", lambda: list(storage_service.iter_keyed_transactions())),
+        (
+            "iter_keyed_transactions[date_range]",
+            lambda: list(storage_service.iter_keyed_transactions(start_date=date(year, 2, 1), end_date=range_end)),
+        ),
+        ("iter_transactions[bank]", lambda: list(storage_service.iter_transactions(bank_name=bank_name))),
+        ("get_transactions_page[limit=100]", lambda: storage_service.get_transactions_page(limit=100)),
+        ("iter_keyed_search_results", lambda: list(storage_service.iter_keyed_search_results(SEARCH_QUERY))),
+        ("search_transactions[limit=100]", lambda: storage_service.search_transactions(SEARCH_QUERY, limit=100)),
+        ("get_transactions_frame", lambda: storage_service.get_transactions_frame()),
+        # answered from the partition rollups
+        ("get_transaction_summary[bank,month]", lambda: storage_service.get_transaction_summary(["bank", "month"])),
+        # has to read every transaction
+        ("get_transaction_summary[week]", lambda: storage_service.get_transaction_summary(["week"])),
+    ]
+
+
+def build_http_cases(spec: DatasetSpec) -> list[tuple[str, dict[str, str], dict[str, str]]]:
+    """Returns (name, query params, headers) for every valid bank_name/year/month combination and each read mode."""
+
+    bank_name, year, month = spec.bank_names[0], str(FIRST_YEAR), "1"
+    filter_combinations = [
+        ("all", {}),
+        ("bank", {"bank_name": bank_name}),
+        ("bank,year", {"bank_name": bank_name, "year": year}),
+        ("bank,year,month", {"bank_name": bank_name, "year": year, "month": month}),
+        ("year", {"year": year}),
+        ("year,month", {"year": year, "month": month}),
+    ]
+    cases = []
+
+    for filter_name, params in filter_combinations:
+        cases.append((f"transactions[{filter_name}]", params, {}))
+        cases.append((f"transactions[{filter_name}|limit=100]", params | {"limit": "100"}, {}))
+        cases.append((f"transactions[{filter_name}|format=ndjson]", params | {"format": "ndjson"}, {}))
+
+    cases.append(("transactions[all|accept=ndjson]", {}, {"accept": NDJSON_MEDIA_TYPE}))
+    cases.append(("transactions[date_range]", {"start_date": f"{year}-02-01", "end_date": f"{year}-03-31"}, {}))
+    return cases
+
+
+def summarise_timings(timings: list[float], rows: int | None) -> dict[str, Any]:
+    timings = sorted(timings)
+    total_seconds = sum(timings)
+
+    def percentile(p: float) -> float:
+        # nearest rank, so every reported figure is a latency that was actually observed
+        return timings[max(math.ceil(p / 100 * len(timings)) - 1, 0)]
+
+    return {
+        "latency_ms": {
+            "min": timings[0] * 1000,
+            "p50": percentile(50) * 1000,
+            "p95": percentile(95) * 1000,
+            "p99": percentile(99) * 1000,
+            "max": timings[-1] * 1000,
+            "mean": total_seconds / len(timings) * 1000,
+        },
+        "ops_per_second": len(timings) / total_seconds,
+        "rows_per_second": rows * len(timings) / total_seconds if rows is not None else None,
+    }
+
+
+def measure_peak_memory(run: Callable[[], Any]) -> int:
+    gc.collect()
+    tracemalloc.start()
+
+    try:
+        run()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak_bytes
+
+
+def run_storage_case(query: Callable[[], Any], repeat: int) -> dict[str, Any]:
+    rows = count_rows(query())
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        query()
+        timings.append(time.perf_counter() - start)
+
+    return summarise_timings(timings, rows) | {"rows": rows, "peak_memory_bytes": measure_peak_memory(query)}
+
+
+async def run_http_case(
+    client: httpx.AsyncClient, params: dict[str, str], headers: dict[str, str], repeat: int
+) -> dict[str, Any]:
+    async def request() -> httpx.Response:
+        response = await client.get("/transactions/", params=params, headers=headers)
+        assert response.status_code == 200, f"{params} returned {response.status_code}: {response.text}"
+        return response
+
+    warm_response = await request()
+    if warm_response.headers["content-type"].startswith(NDJSON_MEDIA_TYPE):
+        rows = len(warm_response.content.splitlines())
+    else:
+        rows = len(warm_response.json())
+
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await request()
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+
+    try:
+        await request()
+        _, peak_memory_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return summarise_timings(timings, rows) | {"rows": rows, "peak_memory_bytes": peak_memory_bytes}
+
+
+def build_settings(backend: str, storage_dir_path: Path) -> Settings:
+    # the Google settings are required but never used, since no statement is parsed
+    return Settings(
+        google_gen_ai_api_key="benchmark",
+        google_gen_ai_model_name="benchmark",
+        google_gen_ai_model_temp=1,
+        google_gen_ai_model_max_tokens=8000,
+        google_gen_ai_model_top_p=0.95,
+        google_gen_ai_model_prompt_path=Path("src/prompt.txt"),
+        storage_backend=backend,
+        local_storage_dir_path=storage_dir_path,
+    )
+
+
+async def run_http_cases(
+    backend: str, storage_dir_path: Path, storage_service: StorageService, spec: DatasetSpec, repeat: int
+) -> list[dict[str, Any]]:
+    settings = build_settings(backend, storage_dir_path)
+    app.dependency_overrides[get_settings] = lambda: settings
+    app.dependency_overrides[get_storage_service] = lambda: storage_service
+    results = []
+
+    try:
+        # no lifespan, so the app never builds the model parser or starts job workers
+        transport = httpx.ASGITransport(app=app)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            for name, params, headers in build_http_cases(spec):
+                result = await run_http_case(client, params, headers, repeat)
+                results.append({"backend": backend, "kind": "http", "name": name} | result)
+    finally:
+        app.dependency_overrides = {}
+
+    return results
+
+
+def run_backend(backend: str, spec: DatasetSpec, repeat: int, storage_dir_path: Path) -> list[dict[str, Any]]:
+    storage_service = build_storage_service(backend, storage_dir_path)
+
+    if isinstance(storage_service, LocalStorageService):
+        # read through a partition cache as the app does
+        storage_service.partition_cache = PartitionCache(max_entries=256)
+
+    try:
+        fill_storage(storage_service, spec)
+        cases = build_storage_cases(storage_service, spec)
+        missing_methods = get_storage_methods() - {name.split("[")[0] for name, _ in cases}
+        assert not missing_methods, f"StorageService methods without a benchmark: {sorted(missing_methods)}"
+
+        results = [
+            {"backend": backend, "kind": "storage", "name": name} | run_storage_case(query, repeat)
+            for name, query in cases
+        ]
+        results.extend(asyncio.run(run_http_cases(backend, storage_dir_path, storage_service, spec, repeat)))
+    finally:
+        if isinstance(storage_service, SqliteStorageService):
+            storage_service.close()
+
+    return results
+
+
+def get_git_commit() -> str:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+    return completed.stdout.strip()
+
+
+def run_suite(spec: DatasetSpec, backends: list[str], repeat: int) -> dict[str, Any]:
+    results = []
+
+    for backend in backends:
+        with tempfile.TemporaryDirectory() as storage_dir:
+            results.extend(run_backend(backend, spec, repeat, Path(storage_dir)))
+
+    return {
+        "metadata": {
+            "commit": get_git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "dataset": asdict(spec) | {"partitions": len(spec.partition_keys), "rows": spec.row_count},
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the storage backends and the transactions endpoint.")
+    parser.add_argument("--banks", type=int, default=3)
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--transactions-per-month", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--backend", action="append", choices=BACKENDS, dest="backends")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    spec = DatasetSpec(
+        banks=args.banks, years=args.years, transactions_per_month=args.transactions_per_month, seed=args.seed
+    )
+    suite = run_suite(spec, args.backends or BACKENDS, args.repeat)
+    output_path = args.output or RESULTS_DIR_PATH / f"{suite['metadata']['commit']}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps(suite, indent=2))
+
+    for result in suite["results"]:
+        latency = result["latency_ms"]
+        print(
+            f"{result['backend']:<8} {result['kind']:<8} {result['name']:<48} p50 {latency['p50']:9.2f} ms  "
+            f"p95 {latency['p95']:9.2f} ms  {result['ops_per_second']:9.1f} ops/s  "
+            f"peak {result['peak_memory_bytes'] / 1024 / 1024:7.1f} MiB"
+        )
+
+    print(f"wrote {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Compares TransactionBatch columns against lists of Transaction models on the bulk read paths.
+
+Memory is what each representation keeps alive once built; times are the best of --repeat runs. Both are scaled to a
+million rows so runs at different sizes can be compared.
+
+Usage: python -m benchmarks.bench_transaction_batch [--rows 1000000] [--repeat 3]
+"""
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+from typing import Callable
+
+import pandas as pd
+
+from src.models import Transaction
+from src.services.storage.transaction_batch import TransactionBatch
+from src.services.storage.transaction_summary import summarise_transactions_frame
+
+MERCHANTS = ["Tesco", "Sainsbury's", "Netflix", "Spotify", "Amazon", "Shell", "Costa", "Uber", "TfL", "Pret"]
+
+
+def build_transactions(rows: int) -> list[Transaction]:
+    rng = random.Random(0)
+    first_day = date(2020, 1, 1)
+    transactions = []
+
+    for position in range(rows):
+        # formatted per row, like strings decoded from a partition file, so equal descriptions are separate objects
+        transactions.append(
+            Transaction.model_construct(
+                bank_name=f"bank_{position % 5}",
+                date=first_day + timedelta(days=position * 1460 // rows),
+                description=f"{rng.choice(MERCHANTS)} {rng.randrange(100)}",
+                amount_in=0.0,
+                amount_out=rng.randrange(1, 10000) / 100,
+                balance=rng.randrange(-100000, 1000000) / 100,
+            )
+        )
+
+    return transactions
+
+
+def measure_memory(build: Callable[[], object]) -> tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current_bytes
+
+
+def measure_time(query: Callable[[], object], repeat: int) -> float:
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        query()
+        timings.append(time.perf_counter() - start)
+
+    return min(timings)
+
+
+def models_to_frame(transactions: list[Transaction]) -> pd.DataFrame:
+    """The previous get_transactions_frame, building each column from the models."""
+
+    return pd.DataFrame(
+        {
+            "bank_name": [transaction.bank_name for transaction in transactions],
+            "date": pd.to_datetime([transaction.date for transaction in transactions]),
+            "description": [transaction.description for transaction in transactions],
+            "amount_in": [round(transaction.amount_in * 100) for transaction in transactions],
+            "amount_out": [round(transaction.amount_out * 100) for transaction in transactions],
+            "balance": [round(transaction.balance * 100) for transaction in transactions],
+        }
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark TransactionBatch against lists of Transaction models.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    scale = 1_000_000 / args.rows
+    transactions, models_bytes = measure_memory(lambda: build_transactions(args.rows))
+    shuffled_transactions = random.Random(1).sample(transactions, len(transactions))
+
+    # built from models that are dropped straight after, as a cached partition is
+    batch, batch_bytes = measure_memory(lambda: TransactionBatch.from_transactions(build_transactions(args.rows)))
+    shuffled_batch = TransactionBatch.from_transactions(shuffled_transactions)
+
+    print(f"{args.rows} rows, figures per million rows")
+    print(f"{'memory':<28} models {models_bytes * scale / 1024 / 1024:9.1f} MiB   "
+          f"batch {batch_bytes * scale / 1024 / 1024:9.1f} MiB")
+
+    for name, models_query, batch_query in [
+        (
+            "sort_by_date",
+            lambda: sorted(shuffled_transactions, key=lambda t: t.date),
+            lambda: shuffled_batch.sort_by_date(),
+        ),
+        ("transactions_frame", lambda: models_to_frame(transactions), lambda: batch.to_frame()),
+        (
+            "summary_by_bank_month",
+            lambda: summarise_transactions_frame(models_to_frame(transactions), ["bank", "month"]),
+            lambda: summarise_transactions_frame(batch.to_frame(), ["bank", "month"]),
+        ),
+        ("to_transactions", lambda: list(transactions), lambda: batch.to_transactions()),
+    ]:
+        models_seconds = measure_time(models_query, args.repeat)
+        batch_seconds = measure_time(batch_query, args.repeat)
+        print(
+            f"{name:<28} models {models_seconds * scale * 1000:9.1f} ms    "
+            f"batch {batch_seconds * scale * 1000:9.1f} ms"
+        )
+
+    assert batch.to_transactions() == transactions
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Compares two benchmarks.bench_suite result files case by case and flags regressions.
+
+A case regresses when its p50 latency in the new results is more than --threshold times that in the baseline. Cases
+only present in one file are listed but never fail the comparison. Exits with status 1 when any case regressed, so it
+can gate a change.
+
+Usage: python -m benchmarks.compare_results BASELINE.json NEW.json [--threshold 1.2]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+ResultKey = tuple[str, str, str]
+
+
+def load_results(results_file_path: Path) -> dict[ResultKey, dict[str, Any]]:
+    suite = json.loads(results_file_path.read_text())
+    return {(result["backend"], result["kind"], result["name"]): result for result in suite["results"]}
+
+
+def find_regressions(
+    baseline: dict[ResultKey, dict[str, Any]], new: dict[ResultKey, dict[str, Any]], threshold: float
+) -> list[tuple[ResultKey, float]]:
+    """Returns the keys present in both result sets whose p50 latency grew by more than threshold, with the ratio."""
+
+    regressions = []
+
+    for key in sorted(baseline.keys() & new.keys()):
+        ratio = new[key]["latency_ms"]["p50"] / baseline[key]["latency_ms"]["p50"]
+
+        if ratio > threshold:
+            regressions.append((key, ratio))
+
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("baseline_file_path", type=Path)
+    parser.add_argument("new_file_path", type=Path)
+    parser.add_argument("--threshold", type=float, default=1.2)
+    args = parser.parse_args()
+
+    baseline = load_results(args.baseline_file_path)
+    new = load_results(args.new_file_path)
+
+    for key in sorted(baseline.keys() & new.keys()):
+        baseline_p50 = baseline[key]["latency_ms"]["p50"]
+        new_p50 = new[key]["latency_ms"]["p50"]
+        print(f"{' '.join(key):<68} {baseline_p50:9.2f} ms -> {new_p50:9.2f} ms  x{new_p50 / baseline_p50:5.2f}")
+
+    for key in sorted(baseline.keys() ^ new.keys()):
+        print(f"{' '.join(key):<68} only in {'baseline' if key in baseline else 'new results'}")
+
+    regressions = find_regressions(baseline, new, args.threshold)
+
+    for key, ratio in regressions:
+        print(f"REGRESSION {' '.join(key)}: p50 x{ratio:.2f}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Deterministic synthetic statements and transactions for benchmarks.
+
+Fills a storage backend with banks x years x 12 months partitions of a fixed number of transactions each, together with
+a plain-text statement per partition. The same spec and seed always produce byte-identical data, so results from
+different commits are measured against the same dataset.
+
+Usage: python -m benchmarks.data_generator STORAGE_DIR [--backend local] [--banks 3] [--years 2]
+    [--transactions-per-month 500] [--seed 0]
+"""
+
+import argparse
+import random
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+from src.models import Transaction
+from src.services.storage.local_storage_service import LocalStorageService
+from src.services.storage.parquet_storage_service import ParquetStorageService
+from src.services.storage.sqlite_storage_service import SqliteStorageService
+from src.services.storage.storage_service import PartitionKey, StorageService
+
+MERCHANTS = [
+    "Netflix", "Spotify", "Tesco", "Sainsburys", "Amazon", "Uber", "Deliveroo", "Shell", "Boots", "Pret",
+    "Costa", "Greggs", "Argos", "Waitrose", "Lidl", "Aldi", "Trainline", "Apple", "Google", "Vodafone",
+]
+KINDS = ["Card Payment", "Direct Debit", "Online Transfer", "Contactless", "Refund"]
+
+FIRST_YEAR = 2020
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    banks: int
+    years: int
+    transactions_per_month: int
+    seed: int = 0
+
+    @property
+    def bank_names(self) -> list[str]:
+        return [f"bank_{bank_index}" for bank_index in range(self.banks)]
+
+    @property
+    def partition_keys(self) -> list[PartitionKey]:
+        return [
+            (bank_name, year, month)
+            for bank_name in self.bank_names
+            for year in range(FIRST_YEAR, FIRST_YEAR + self.years)
+            for month in range(1, 13)
+        ]
+
+    @property
+    def row_count(self) -> int:
+        return len(self.partition_keys) * self.transactions_per_month
+
+
+def generate_partition(spec: DatasetSpec, bank_name: str, year: int, month: int) -> list[Transaction]:
+    """Generates one month of date-ordered transactions with a running balance."""
+
+    # seeded per partition, so any one partition can be regenerated without the others
+    rng = random.Random(f"{spec.seed}/{bank_name}/{year}/{month}")
+    days = sorted(rng.randint(1, 28) for _ in range(spec.transactions_per_month))
+    balance = rng.randrange(0, 500_000)
+    transactions = []
+
+    for day in days:
+        if rng.random() < 0.1:
+            amount_in, amount_out = rng.randrange(1, 300_000), 0
+        else:
+            amount_in, amount_out = 0, rng.randrange(1, 20_000)
+
+        balance += amount_in - amount_out
+        transactions.append(
+            Transaction(
+                bank_name=bank_name,
+                date=date(year, month, day),
+                description=f"{rng.choice(MERCHANTS)} {rng.choice(KINDS)} {rng.randrange(10_000)}",
+                amount_in=amount_in / 100,
+                amount_out=amount_out / 100,
+                balance=balance / 100,
+            )
+        )
+
+    return transactions
+
+
+def generate_partitions(spec: DatasetSpec) -> dict[PartitionKey, list[Transaction]]:
+    return {
+        (bank_name, year, month): generate_partition(spec, bank_name, year, month)
+        for bank_name, year, month in spec.partition_keys
+    }
+
+
+def generate_statement(bank_name: str, year: int, month: int, transactions: list[Transaction]) -> bytes:
+    """Renders a plain-text statement listing the partition's transactions, standing in for an uploaded PDF."""
+
+    lines = [f"{bank_name} statement {year}-{month:02}", "Date Description Paid in Paid out Balance"]
+    lines.extend(
+        f"{t.date.isoformat()} {t.description} {t.amount_in:.2f} {t.amount_out:.2f} {t.balance:.2f}"
+        for t in transactions
+    )
+    return "\n".join(lines).encode()
+
+
+def build_storage_service(backend: str, storage_dir_path: Path) -> StorageService:
+    if backend == "parquet":
+        return ParquetStorageService(storage_dir_path)
+
+    if backend == "sqlite":
+        return SqliteStorageService(storage_dir_path / "storage.sqlite3")
+
+    return LocalStorageService(storage_dir_path)
+
+
+def fill_storage(storage_service: StorageService, spec: DatasetSpec) -> None:
+    partitions = generate_partitions(spec)
+    storage_service.store_many_transactions(partitions)
+
+    for (bank_name, year, month), transactions in partitions.items():
+        storage_service.store_statement(
+            generate_statement(bank_name, year, month, transactions), bank_name=bank_name, year=year, month=month
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fill a storage directory with synthetic benchmark data.")
+    parser.add_argument("storage_dir_path", type=Path)
+    parser.add_argument("--backend", choices=["local", "parquet", "sqlite"], default="local")
+    parser.add_argument("--banks", type=int, default=3)
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--transactions-per-month", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    spec = DatasetSpec(
+        banks=args.banks, years=args.years, transactions_per_month=args.transactions_per_month, seed=args.seed
+    )
+    fill_storage(build_storage_service(args.backend, args.storage_dir_path), spec)
+    print(f"wrote {spec.row_count} transactions in {len(spec.partition_keys)} partitions to {args.storage_dir_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Drives a mixed upload and read workload against the app in process, with the fake model standing in for Google.
+
+Concurrent virtual users repeatedly pick an operation by weight: upload a new statement and poll its job until it
+finishes, or read transactions, search them or summarise them. Each request's latency is recorded per endpoint, along
+with upload-to-job-finished times and how late a ticker task on the same event loop wakes up, which shows how much
+request handling blocks the loop. Nothing leaves the process, so it needs no API key or network.
+
+Usage: python -m benchmarks.load_test [--users 20] [--duration 30] [--upload-weight 1] [--read-weight 8]
+    [--model-latency 0.5] [--model-sigma 0.5] [--model-error-rate 0.0] [--model-rate-limit-rate 0.0]
+    [--output results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import httpx
+from loguru import logger
+
+from benchmarks.data_generator import FIRST_YEAR, DatasetSpec, fill_storage, generate_partition, generate_statement
+from src.dependencies import get_partition_cache, get_settings, get_storage_service, shut_down
+from src.main import app
+from src.settings import Settings
+
+UPLOAD_BANK_NAME = "uploads"
+SEARCH_QUERIES = ["netflix", "tesco card*", "direct debit", "refund"]
+
+# how often the lag ticker expects to wake up
+LAG_INTERVAL_SECONDS = 0.01
+
+# how often an upload's job is polled until it finishes
+JOB_POLL_INTERVAL_SECONDS = 0.05
+
+
+@dataclass(frozen=True)
+class LoadTestConfig:
+    users: int = 20
+    duration_seconds: float = 30
+    upload_weight: float = 1
+    read_weight: float = 8
+    dataset: DatasetSpec = DatasetSpec(banks=3, years=2, transactions_per_month=200)
+    model_latency_median_seconds: float = 0.5
+    model_latency_sigma: float = 0.5
+    model_error_rate: float = 0.0
+    model_rate_limit_rate: float = 0.0
+    seed: int = 0
+
+
+class LoadTestRecorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.status_codes: dict[str, Counter[int]] = defaultdict(Counter)
+        self.job_seconds: list[float] = []
+        self.job_states: Counter[str] = Counter()
+        self.lags: list[float] = []
+
+    async def request(
+        self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs
+    ) -> httpx.Response:
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies[endpoint].append(time.perf_counter() - start)
+        self.status_codes[endpoint][response.status_code] += 1
+        return response
+
+
+def summarise_latencies(latencies: list[float]) -> dict[str, float]:
+    latencies = sorted(latencies)
+
+    def percentile(p: float) -> float:
+        # nearest rank, as in benchmarks.bench_suite
+        return latencies[max(math.ceil(p / 100 * len(latencies)) - 1, 0)] * 1000
+
+    return {"p50": percentile(50), "p95": percentile(95), "p99": percentile(99), "max": latencies[-1] * 1000}
+
+
+def build_settings(config: LoadTestConfig, storage_dir_path: Path) -> Settings:
+    return Settings(
+        google_gen_ai_api_key="load-test",
+        google_gen_ai_model_name="load-test",
+        google_gen_ai_model_temp=1,
+        google_gen_ai_model_max_tokens=8000,
+        google_gen_ai_model_top_p=0.95,
+        google_gen_ai_model_prompt_path=Path("src/prompt.txt"),
+        statement_parser_model="fake",
+        fake_model_latency_median_seconds=config.model_latency_median_seconds,
+        fake_model_latency_sigma=config.model_latency_sigma,
+        fake_model_error_rate=config.model_error_rate,
+        fake_model_rate_limit_rate=config.model_rate_limit_rate,
+        fake_model_seed=config.seed,
+        local_storage_dir_path=storage_dir_path,
+    )
+
+
+async def upload_statement(
+    client: httpx.AsyncClient, recorder: LoadTestRecorder, config: LoadTestConfig, upload_number: int
+) -> None:
+    # a new seed per upload, so every statement is new to the parse cache and goes through the model
+    spec = DatasetSpec(
+        banks=1, years=1, transactions_per_month=config.dataset.transactions_per_month, seed=upload_number
+    )
+    year, month = FIRST_YEAR + upload_number // 12 % config.dataset.years, upload_number % 12 + 1
+    statement_bytes = generate_statement(
+        UPLOAD_BANK_NAME, year, month, generate_partition(spec, UPLOAD_BANK_NAME, year, month)
+    )
+
+    start = time.perf_counter()
+    response = await recorder.request(
+        client,
+        "POST /statements/{bank_name}/{year}/{month}",
+        "POST",
+        f"/statements/{UPLOAD_BANK_NAME}/{year}/{month}",
+        files={"statement": ("statement.txt", statement_bytes, "text/plain")},
+    )
+    job = response.json()
+
+    while job["state"] in ("queued", "running"):
+        await asyncio.sleep(JOB_POLL_INTERVAL_SECONDS)
+        job = (await recorder.request(client, "GET /jobs/{job_id}", "GET", f"/jobs/{job['id']}")).json()
+
+    recorder.job_seconds.append(time.perf_counter() - start)
+    recorder.job_states[job["state"]] += 1
+
+
+async def read_transactions(
+    client: httpx.AsyncClient, recorder: LoadTestRecorder, config: LoadTestConfig, rng: random.Random
+) -> None:
+    bank_name = rng.choice(config.dataset.bank_names)
+    year = rng.randrange(FIRST_YEAR, FIRST_YEAR + config.dataset.years)
+    month = rng.randint(1, 12)
+
+    endpoint, params = rng.choice(
+        [
+            ("GET /transactions/", {"bank_name": bank_name, "year": year, "month": month}),
+            ("GET /transactions/", {"bank_name": bank_name, "year": year}),
+            ("GET /transactions/", {"year": year, "month": month}),
+            ("GET /transactions/?limit", {"bank_name": bank_name, "limit": 100}),
+            ("GET /transactions/search", {"q": rng.choice(SEARCH_QUERIES), "limit": 50}),
+            ("GET /transactions/summary", {"group_by": ["bank", "month"]}),
+        ]
+    )
+    await recorder.request(client, endpoint, "GET", endpoint.split(" ")[1].split("?")[0], params=params)
+
+
+async def run_user(
+    client: httpx.AsyncClient, recorder: LoadTestRecorder, config: LoadTestConfig, user: int, deadline: float
+) -> None:
+    rng = random.Random(f"{config.seed}/{user}")
+    upload_number = user
+
+    while time.perf_counter() < deadline:
+        if rng.random() * (config.upload_weight + config.read_weight) < config.upload_weight:
+            await upload_statement(client, recorder, config, upload_number)
+            upload_number += config.users
+        else:
+            await read_transactions(client, recorder, config, rng)
+
+
+async def measure_event_loop_lag(recorder: LoadTestRecorder, deadline: float) -> None:
+    while time.perf_counter() < deadline:
+        expected = time.perf_counter() + LAG_INTERVAL_SECONDS
+        await asyncio.sleep(LAG_INTERVAL_SECONDS)
+        recorder.lags.append(max(time.perf_counter() - expected, 0.0))
+
+
+async def run_load_test(config: LoadTestConfig, storage_dir_path: Path) -> dict[str, Any]:
+    settings = build_settings(config, storage_dir_path)
+    fill_storage(get_storage_service(settings, get_partition_cache(settings)), config.dataset)
+    app.dependency_overrides[get_settings] = lambda: settings
+    recorder = LoadTestRecorder()
+
+    try:
+        # no lifespan: the job queue starts its workers on the first upload and is stopped by shut_down below
+        transport = httpx.ASGITransport(app=app)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=None) as client:
+            start = time.perf_counter()
+            deadline = start + config.duration_seconds
+            await asyncio.gather(
+                measure_event_loop_lag(recorder, deadline),
+                *(run_user(client, recorder, config, user, deadline) for user in range(config.users)),
+            )
+            elapsed_seconds = time.perf_counter() - start
+    finally:
+        await shut_down(settings)
+        app.dependency_overrides = {}
+
+    return {
+        "config": asdict(config),
+        "elapsed_seconds": elapsed_seconds,
+        "endpoints": {
+            endpoint: {
+                "requests": len(latencies),
+                "requests_per_second": len(latencies) / elapsed_seconds,
+                "status_codes": {str(code): count for code, count in sorted(recorder.status_codes[endpoint].items())},
+                "latency_ms": summarise_latencies(latencies),
+            }
+            for endpoint, latencies in sorted(recorder.latencies.items())
+        },
+        "jobs": {
+            "states": dict(recorder.job_states),
+            "latency_ms": summarise_latencies(recorder.job_seconds) if recorder.job_seconds else None,
+        },
+        "event_loop_lag_ms": summarise_latencies(recorder.lags) if recorder.lags else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test uploads and reads against the app with a fake model.")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--upload-weight", type=float, default=1)
+    parser.add_argument("--read-weight", type=float, default=8)
+    parser.add_argument("--banks", type=int, default=3)
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--transactions-per-month", type=int, default=200)
+    parser.add_argument("--model-latency", type=float, default=0.5, help="median fake model latency in seconds")
+    parser.add_argument("--model-sigma", type=float, default=0.5, help="sigma of the log-normal latency")
+    parser.add_argument("--model-error-rate", type=float, default=0.0)
+    parser.add_argument("--model-rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    config = LoadTestConfig(
+        users=args.users,
+        duration_seconds=args.duration,
+        upload_weight=args.upload_weight,
+        read_weight=args.read_weight,
+        dataset=DatasetSpec(banks=args.banks, years=args.years, transactions_per_month=args.transactions_per_month),
+        model_latency_median_seconds=args.model_latency,
+        model_latency_sigma=args.model_sigma,
+        model_error_rate=args.model_error_rate,
+        model_rate_limit_rate=args.model_rate_limit_rate,
+        seed=args.seed,
+    )
+
+    # every parse logs at INFO and every fake model failure at WARNING, which would bury the report
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+
+    with tempfile.TemporaryDirectory() as storage_dir:
+        report = asyncio.run(run_load_test(config, Path(storage_dir)))
+
+    for endpoint, endpoint_report in report["endpoints"].items():
+        latency = endpoint_report["latency_ms"]
+        print(
+            f"{endpoint:<46} {endpoint_report['requests']:6} req  {endpoint_report['requests_per_second']:8.1f} req/s  "
+            f"p50 {latency['p50']:8.1f} ms  p95 {latency['p95']:8.1f} ms  p99 {latency['p99']:8.1f} ms  "
+            f"{endpoint_report['status_codes']}"
+        )
+
+    for name, latency in [("jobs", report["jobs"]["latency_ms"]), ("event loop lag", report["event_loop_lag_ms"])]:
+        if latency is not None:
+            print(
+                f"{name:<46} p50 {latency['p50']:8.1f} ms  p95 {latency['p95']:8.1f} ms  p99 {latency['p99']:8.1f} ms"
+            )
+
+    print(f"job states {report['jobs']['states']}")
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,184 @@
+from functools import lru_cache
+from pathlib import Path
 from typing import Annotated
 
+from anyio import CapacityLimiter
 from fastapi.params import Depends
 
+from src.services.jobs.statement_job_queue import StatementJobQueue
+from src.services.jobs.statement_job_store import StatementJobStore
+from src.services.metrics.app_metrics import AppMetrics
+from src.services.statement_parser.fake_model import FAKE_MODEL_NAME, build_fake_model
 from src.services.statement_parser.model_statement_parser import ModelStatementParser
+from src.services.statement_parser.parse_cache import ParseCache
+from src.services.storage.async_storage_service import AsyncStorageService, ThreadPoolAsyncStorageService
 from src.services.storage.local_storage_service import LocalStorageService
+from src.services.storage.parquet_storage_service import ParquetStorageService
+from src.services.storage.partition_cache import PartitionCache
+from src.services.storage.sqlite_storage_service import SqliteStorageService
+from src.services.storage.storage_service import StorageService
 from src.settings import Settings
 
 
+@lru_cache
 def get_settings() -> Settings:
+    # read .env once per process rather than on every request
     return Settings()
 
 
+@lru_cache
+def get_app_metrics() -> AppMetrics:
+    # one set for the whole process, kept across app restarts as Prometheus expects of counters
+    return AppMetrics()
+
+
 def get_model_statement_parser(settings: Annotated[Settings, Depends(get_settings)]) -> ModelStatementParser:
+    return _get_model_statement_parser(settings)
+
+
+@lru_cache
+def _get_model_statement_parser(settings: Settings) -> ModelStatementParser:
+    # one parser per settings so its model client and pooled connections are reused across requests
+    if settings.statement_parser_model == "fake":
+        model_name = FAKE_MODEL_NAME
+        model = build_fake_model(
+            latency_median_seconds=settings.fake_model_latency_median_seconds,
+            latency_sigma=settings.fake_model_latency_sigma,
+            error_rate=settings.fake_model_error_rate,
+            rate_limit_rate=settings.fake_model_rate_limit_rate,
+            seed=settings.fake_model_seed,
+        )
+    else:
+        model_name, model = settings.google_gen_ai_model_name, None
+
     return ModelStatementParser(
         api_key=settings.google_gen_ai_api_key,
-        model_name=settings.google_gen_ai_model_name,
+        model_name=model_name,
         temperature=settings.google_gen_ai_model_temp,
         max_tokens=settings.google_gen_ai_model_max_tokens,
         top_p=settings.google_gen_ai_model_top_p,
         instructions=settings.google_gen_ai_model_instructions,
+        pages_per_window=settings.google_gen_ai_pages_per_window,
+        window_overlap_lines=settings.google_gen_ai_window_overlap_lines,
+        max_concurrent_windows=settings.google_gen_ai_max_concurrent_windows,
+        model=model,
+        metrics=get_app_metrics(),
     )
 
 
-def get_local_storage_service(settings: Annotated[Settings, Depends(get_settings)]) -> LocalStorageService:
-    return LocalStorageService(settings.local_storage_dir_path)
+@lru_cache
+def _get_parse_cache(cache_dir_path: Path, max_bytes: int) -> ParseCache:
+    # shared so hit counts and LRU order cover every request and job worker
+    return ParseCache(cache_dir_path, max_bytes=max_bytes)
+
+
+def get_parse_cache(settings: Annotated[Settings, Depends(get_settings)]) -> ParseCache:
+    return _get_parse_cache(settings.parse_cache_dir_path, settings.parse_cache_max_bytes)
+
+
+@lru_cache
+def _get_partition_cache(max_entries: int) -> PartitionCache:
+    # shared by every storage service reading the same files, so decoded partitions stay warm across requests
+    return PartitionCache(max_entries=max_entries)
+
+
+def get_partition_cache(settings: Annotated[Settings, Depends(get_settings)]) -> PartitionCache:
+    return _get_partition_cache(settings.local_storage_cache_max_entries)
+
+
+@lru_cache
+def _get_sqlite_storage_service(
+    db_file_path: Path, pool_size: int, pool_timeout_seconds: float
+) -> SqliteStorageService:
+    # one instance per database so its connection pool is shared across requests
+    return SqliteStorageService(db_file_path, pool_size=pool_size, pool_timeout_seconds=pool_timeout_seconds)
+
+
+@lru_cache
+def _get_local_storage_service(
+    storage_backend: str, storage_dir_path: Path, partition_cache: PartitionCache
+) -> LocalStorageService:
+    # one instance per directory so its in-memory manifest is shared across requests
+    if storage_backend == "parquet":
+        return ParquetStorageService(storage_dir_path, partition_cache=partition_cache)
+
+    return LocalStorageService(storage_dir_path, partition_cache=partition_cache)
+
+
+def get_storage_service(
+    settings: Annotated[Settings, Depends(get_settings)],
+    partition_cache: Annotated[PartitionCache, Depends(get_partition_cache)],
+) -> StorageService:
+    if settings.storage_backend == "sqlite":
+        return _get_sqlite_storage_service(
+            settings.sqlite_storage_db_file_path,
+            settings.sqlite_storage_pool_size,
+            settings.sqlite_storage_pool_timeout_seconds,
+        )
+
+    return _get_local_storage_service(settings.storage_backend, settings.local_storage_dir_path, partition_cache)
+
+
+@lru_cache
+def _get_storage_limiter(max_threads: int) -> CapacityLimiter:
+    # shared so the bound on concurrent storage threads holds across all requests
+    return CapacityLimiter(max_threads)
+
+
+def get_async_storage_service(
+    settings: Annotated[Settings, Depends(get_settings)],
+    storage_service: Annotated[StorageService, Depends(get_storage_service)],
+) -> AsyncStorageService:
+    return ThreadPoolAsyncStorageService(
+        storage_service, limiter=_get_storage_limiter(settings.storage_max_threads), metrics=get_app_metrics()
+    )
+
+
+def get_statement_job_queue(settings: Annotated[Settings, Depends(get_settings)]) -> StatementJobQueue:
+    return _get_statement_job_queue(settings)
+
+
+@lru_cache
+def _get_statement_job_queue(settings: Settings) -> StatementJobQueue:
+    storage_service = get_storage_service(settings, get_partition_cache(settings))
+    return StatementJobQueue(
+        job_store=StatementJobStore(settings.statement_jobs_dir_path),
+        statement_parser=_get_model_statement_parser(settings),
+        storage_service=get_async_storage_service(settings, storage_service),
+        concurrency=settings.statement_job_workers,
+        parse_cache=get_parse_cache(settings),
+    )
+
+
+def warm_up(settings: Settings) -> None:
+    """Builds the process-wide parser, storage service and job queue up front so requests don't pay for them."""
+
+    _get_model_statement_parser(settings)
+    get_storage_service(settings, get_partition_cache(settings))
+    _get_statement_job_queue(settings)
+
+
+async def shut_down(settings: Settings) -> None:
+    """Stops the job workers, closes the shared clients and forgets them, so a restarted app builds fresh ones."""
+
+    await _get_statement_job_queue(settings).stop()
+    await _get_model_statement_parser(settings).aclose()
+
+    if settings.storage_backend == "sqlite":
+        _get_sqlite_storage_service(
+            settings.sqlite_storage_db_file_path,
+            settings.sqlite_storage_pool_size,
+            settings.sqlite_storage_pool_timeout_seconds,
+        ).close()
+
+    for cached_function in [
+        _get_statement_job_queue,
+        _get_model_statement_parser,
+        _get_parse_cache,
+        _get_partition_cache,
+        _get_sqlite_storage_service,
+        _get_local_storage_service,
+        _get_storage_limiter,
+        get_settings,
+    ]:
+        cached_function.cache_clear()
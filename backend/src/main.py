@@ -1,11 +1,30 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 
-from src.routers import transactions, statements
+from src.dependencies import get_app_metrics, get_settings, get_statement_job_queue, shut_down, warm_up
+from src.routers import jobs, metrics, transactions, statements
+from src.services.metrics.request_metrics_middleware import RequestMetricsMiddleware
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    settings = get_settings()
+    warm_up(settings)
+    # resumes any jobs left unfinished by the previous run
+    await get_statement_job_queue(settings).start()
+    yield
+    await shut_down(settings)
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(RequestMetricsMiddleware, metrics=get_app_metrics())
 
 app.include_router(transactions.router)
 app.include_router(statements.router)
+app.include_router(jobs.router)
+app.include_router(metrics.router)
 
 
 @app.get("/")
@@ -1,4 +1,5 @@
-from datetime import date
+from datetime import date, datetime
+from typing import Literal
 
 from pydantic import BaseModel
 
@@ -28,3 +29,103 @@ class Transaction(ParsedTransaction):
 
 class StoredTransactions(BaseModel):
     transactions: list[Transaction]
+
+
+class PartitionRollup(BaseModel):
+    # the bank name reported on the partition's transactions, which summaries group by
+    bank_name: str
+    # amounts in whole pence
+    money_in: int
+    money_out: int
+    opening_balance: int
+    closing_balance: int
+
+
+class PartitionManifestEntry(BaseModel):
+    bank_name: str
+    year: int
+    month: int
+    row_count: int
+    min_date: date | None
+    max_date: date | None
+    file_size: int
+    checksum: str
+    # None for empty partitions, partitions mixing bank names and entries written before rollups existed
+    rollup: PartitionRollup | None = None
+    # when the partition was last written; None for entries written before modification times were recorded
+    modified_at: datetime | None = None
+
+
+class StoredPartitionManifest(BaseModel):
+    partitions: list[PartitionManifestEntry]
+
+
+class StoredSearchIndex(BaseModel):
+    # checksum of the partition file the index was built from
+    checksum: str
+    # date of the transaction at each position, so results can be ordered without loading the partition
+    dates: list[date]
+    # positions of the transactions whose description holds each token
+    tokens: dict[str, list[int]]
+
+
+TransactionSummaryGroup = Literal["bank", "year", "month", "week", "day"]
+
+
+class TransactionSummary(BaseModel):
+    bank_name: str | None = None
+    # "2025", "2025-01", "2025-W02" (ISO week) or "2025-01-03", depending on the period grouped by
+    period: str | None = None
+    transaction_count: int
+    money_in: float
+    money_out: float
+    net: float
+    closing_balance: float
+
+
+StatementJobState = Literal["queued", "running", "succeeded", "failed"]
+
+
+class StatementJob(BaseModel):
+    id: str
+    bank_name: str
+    year: int
+    month: int
+    state: StatementJobState
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    error: str | None = None
+    transaction_count: int | None = None
+    statement_sha256: str | None = None
+    statement_size_bytes: int | None = None
+    estimated_prompt_tokens: int | None = None
+    cache_hit: bool = False
+
+
+class BulkStatementManifestEntry(BaseModel):
+    file_name: str
+    bank_name: str
+    year: int
+    month: int
+
+
+class BulkStatementManifest(BaseModel):
+    statements: list[BulkStatementManifestEntry]
+
+
+class BulkStatementResult(BaseModel):
+    file_name: str
+    bank_name: str
+    year: int
+    month: int
+    state: Literal["succeeded", "failed"]
+    transaction_count: int | None = None
+    cache_hit: bool = False
+    error: str | None = None
+
+
+class BulkStatementUploadSummary(BaseModel):
+    succeeded: int
+    failed: int
+    results: list[BulkStatementResult]
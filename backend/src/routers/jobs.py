@@ -0,0 +1,32 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from src.dependencies import get_statement_job_queue
+from src.models import StatementJob
+from src.services.jobs.statement_job_queue import StatementJobQueue
+from src.services.jobs.statement_job_store import StatementJobStoreException
+
+router = APIRouter(prefix="/jobs")
+
+
+@router.get("/{job_id}")
+async def get_job(
+    job_id: str,
+    statement_job_queue: Annotated[StatementJobQueue, Depends(get_statement_job_queue)],
+) -> StatementJob:
+    """
+    Gets the state of a statement parsing job, with its timings and, for failed jobs, the error.
+
+    If the job does not exist, raises a 404 Not Found error.
+    """
+
+    try:
+        job = await statement_job_queue.get(job_id)
+    except StatementJobStoreException:
+        raise HTTPException(status_code=500, detail="Invalid job file")
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Cannot find requested job")
+
+    return job
@@ -0,0 +1,31 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Response
+
+from src.dependencies import get_app_metrics, get_async_storage_service, get_parse_cache, get_partition_cache
+from src.services.metrics.app_metrics import AppMetrics
+from src.services.statement_parser.parse_cache import ParseCache
+from src.services.storage.async_storage_service import AsyncStorageService
+from src.services.storage.partition_cache import PartitionCache
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+router = APIRouter(prefix="/metrics")
+
+
+@router.get("")
+async def get_metrics(
+    metrics: Annotated[AppMetrics, Depends(get_app_metrics)],
+    storage_service: Annotated[AsyncStorageService, Depends(get_async_storage_service)],
+    partition_cache: Annotated[PartitionCache, Depends(get_partition_cache)],
+    parse_cache: Annotated[ParseCache, Depends(get_parse_cache)],
+) -> Response:
+    """
+    Gets the app's metrics in the Prometheus text format: request latency per route, storage latency per method,
+    model call latency and token usage, the stored partition count and the partition and parse cache hit ratios.
+    """
+
+    metrics.storage_partitions.set(len(await storage_service.list_partitions()))
+    metrics.record_cache_stats("partition", partition_cache.stats)
+    metrics.record_cache_stats("parse", parse_cache.stats)
+    return Response(content=metrics.render(), media_type=PROMETHEUS_MEDIA_TYPE)
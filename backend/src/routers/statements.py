@@ -1,39 +1,125 @@
+from contextlib import nullcontext
 from typing import Annotated
 
-from fastapi import APIRouter, UploadFile, Depends
+from fastapi import APIRouter, UploadFile, Depends, Form, HTTPException, Response
 
-from src.dependencies import get_local_storage_service, get_model_statement_parser
+from src.dependencies import get_async_storage_service, get_model_statement_parser, get_parse_cache, get_settings, \
+    get_statement_job_queue
+from src.models import BulkStatementUploadSummary, StatementJob
+from src.services.jobs.bulk_statement_import import BulkStatementImportException, import_statements, \
+    read_bulk_statements, open_bulk_statements_zip
+from src.services.jobs.statement_job_queue import StatementJobQueue
 from src.services.statement_parser.model_statement_parser import ModelStatementParser
-from src.services.storage.storage_service import StorageService
+from src.services.statement_parser.parse_cache import ParseCache, ParseCacheStats
+from src.services.storage.async_storage_service import AsyncStorageService
+from src.settings import Settings
 
 router = APIRouter(prefix="/statements")
 
 
-@router.post("/{bank_name}/{year}/{month}")
+@router.post("/instructions/reload")
+async def reload_instructions(
+    settings: Annotated[Settings, Depends(get_settings)],
+    statement_parser: Annotated[ModelStatementParser, Depends(get_model_statement_parser)],
+):
+    """
+    Re-reads the model prompt file so edits take effect without restarting the app.
+    The model client and its open connections are kept.
+    """
+
+    statement_parser.reload_instructions(settings.google_gen_ai_model_instructions)
+
+
+@router.get("/parse-cache/stats")
+async def get_parse_cache_stats(parse_cache: Annotated[ParseCache, Depends(get_parse_cache)]) -> ParseCacheStats:
+    """
+    Gets the parse cache's hit rate, size and the model time saved by hits since the app started.
+    """
+
+    return parse_cache.stats
+
+
+@router.post("/bulk")
+async def upload_statements(
+    statements: list[UploadFile],
+    settings: Annotated[Settings, Depends(get_settings)],
+    storage_service: Annotated[AsyncStorageService, Depends(get_async_storage_service)],
+    statement_job_queue: Annotated[StatementJobQueue, Depends(get_statement_job_queue)],
+    manifest: Annotated[str | None, Form()] = None,
+) -> BulkStatementUploadSummary:
+    """
+    Processes many statements in one request and stores the results.
+
+    Either upload the statement files with a manifest form field, or upload a single zip holding the statements and a
+    manifest.json. The manifest is a JSON object like
+    {"statements": [{"file_name": "jan.pdf", "bank_name": "barclays", "year": 2025, "month": 1}]}.
+    Statements are parsed concurrently and every parsed month is stored at the end.
+    Returns the outcome for each statement; one failing does not stop the others.
+    """
+
+    try:
+        # statements are streamed from the spooled uploads, or out of the zip, as they are imported
+        if manifest is None and len(statements) == 1 and (statements[0].filename or "").endswith(".zip"):
+            bulk_statements_context = open_bulk_statements_zip(statements[0].file)
+        elif manifest is None:
+            raise HTTPException(status_code=400, detail="A manifest is required unless uploading a single zip")
+        else:
+            file_names = [statement.filename for statement in statements]
+
+            # the manifest refers to uploads by name, so every upload needs its own
+            if None in file_names or "" in file_names:
+                raise HTTPException(status_code=400, detail="Every uploaded statement must have a file name")
+
+            if len(set(file_names)) != len(file_names):
+                raise HTTPException(status_code=400, detail="Uploaded statements must have distinct file names")
+
+            files = {statement.filename: statement.file for statement in statements}
+            bulk_statements_context = nullcontext(read_bulk_statements(manifest, files))
+
+        with bulk_statements_context as bulk_statements:
+            results = await import_statements(
+                bulk_statements,
+                statement_job_queue=statement_job_queue,
+                storage_service=storage_service,
+                max_concurrency=settings.bulk_upload_max_concurrency,
+            )
+    except BulkStatementImportException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    succeeded = sum(result.state == "succeeded" for result in results)
+    return BulkStatementUploadSummary(succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
+
+@router.post("/{bank_name}/{year}/{month}", status_code=202)
 async def upload_statement(
     bank_name: str,
     year: int,
     month: int,
     statement: UploadFile,
-    statement_parser: Annotated[ModelStatementParser, Depends(get_model_statement_parser)],
-    storage_service: Annotated[StorageService, Depends(get_local_storage_service)],
-):
+    response: Response,
+    storage_service: Annotated[AsyncStorageService, Depends(get_async_storage_service)],
+    statement_job_queue: Annotated[StatementJobQueue, Depends(get_statement_job_queue)],
+) -> StatementJob:
     """
-    Processes the uploaded statement and stores the result.
-    Also stores the raw uploaded file.
-    Does not return the result - this must be retrieved by one of the above GET methods.
+    Stores the uploaded statement and queues a job to parse it in the background.
+    Returns 202 Accepted with the job, whose progress can be followed at /jobs/{job_id}.
+    If the same statement has already been parsed, the cached transactions are stored immediately and the
+    succeeded job is returned with 200 OK.
+    The parsed transactions must be retrieved by one of the /transactions GET methods once the job has succeeded.
     """
 
-    # extract bytes from uploaded statement
-    statement_bytes = statement.file.read()
+    # stream the upload to storage in chunks rather than holding it in memory
+    statement_sha256 = await storage_service.store_statement_stream(
+        statement_stream=statement.file, bank_name=bank_name, year=year, month=month
+    )
 
-    # store uploaded statement
-    storage_service.store_statement(statement_bytes=statement_bytes, bank_name=bank_name, year=year, month=month)
+    # parse it off the request, or straight from the parse cache for a statement seen before
+    job = await statement_job_queue.enqueue(
+        bank_name=bank_name, year=year, month=month, statement_sha256=statement_sha256
+    )
 
-    # get json data from pdf via model
-    transactions = await statement_parser.parse_transactions(bank_name=bank_name, statement=statement_bytes.decode())
+    if job.cache_hit:
+        response.status_code = 200
 
-    # store parsed transactions
-    storage_service.store_transactions(
-        transactions=transactions, bank_name=bank_name, year=year, month=month
-    )
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return job
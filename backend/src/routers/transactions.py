@@ -1,21 +1,55 @@
-from typing import Annotated
+from datetime import date, datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Annotated, AsyncIterator, Literal
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 
-from src.dependencies import get_local_storage_service
-from src.models import Transaction
-from src.services.storage.storage_service import StorageService, StorageServiceException, \
-    StorageServiceNotFoundException
+from src.dependencies import get_async_storage_service
+from src.models import Transaction, TransactionSummary, TransactionSummaryGroup
+from src.services.storage.pagination import TransactionCursor
+from src.services.storage.query_version import QueryVersion, build_query_version
+from src.services.storage.search_index import parse_search_query
+from src.services.storage.transaction_summary import PERIOD_GROUPS
+from src.services.storage.async_storage_service import AsyncStorageService
+from src.services.storage.storage_service import StorageServiceException, StorageServiceNotFoundException
 
 router = APIRouter(prefix="/transactions")
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_SEARCH_LIMIT = 50
+
+_TRANSACTIONS_ADAPTER = TypeAdapter(list[Transaction])
+
+
+class TransactionListResponse(Response):
+    """
+    JSON array of transactions serialized straight to bytes. Storage only hands out validated transactions, so returning
+    this skips the second validation pass FastAPI would otherwise run over every row of the response model.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: list[Transaction]) -> bytes:
+        return _TRANSACTIONS_ADAPTER.dump_json(content)
+
 
 @router.get("/")
 async def get_transactions(
-    storage_service: Annotated[StorageService, Depends(get_local_storage_service)],
+    storage_service: Annotated[AsyncStorageService, Depends(get_async_storage_service)],
     bank_name: str | None = None,
     year: int | None = None,
     month: int | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    limit: Annotated[int | None, Query(ge=1)] = None,
+    cursor: str | None = None,
+    response_format: Annotated[Literal["json", "ndjson"] | None, Query(alias="format")] = None,
+    accept: Annotated[str | None, Header()] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+    if_modified_since: Annotated[str | None, Header()] = None,
 ) -> list[Transaction]:
     """
     Gets requested transactions.
@@ -24,31 +58,291 @@ async def get_transactions(
     - bank_name: optional, filter by bank
     - year: optional, filter by year (requires month if month is provided)
     - month: optional, filter by month (requires year)
+    - start_date, end_date: optional, only transactions dated within this inclusive range (YYYY-MM-DD); combine
+      with the filters above, so a range spanning months or years needs no bank_name, year or month
+    - limit: optional, maximum number of transactions to return; when more exist, the X-Next-Cursor
+      response header holds the cursor for the next page
+    - cursor: optional, X-Next-Cursor value from a previous page; only transactions after it are returned
+    - format: optional, "ndjson" streams one transaction per line instead of a JSON array
+      (also selected by an Accept: application/x-ndjson header)
+
+    Responses carry ETag and Last-Modified headers versioning the partitions the query reads. A request whose
+    If-None-Match or If-Modified-Since header still matches gets a 304 Not Modified response without any rows being
+    read.
 
     If no data exists, raises a 404 Not Found error.
     """
 
+    stream = response_format == "ndjson" or (
+        response_format is None and accept is not None and NDJSON_MEDIA_TYPE in accept
+    )
+
+    try:
+        after = TransactionCursor.decode(cursor) if cursor is not None else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if start_date is not None and end_date is not None and start_date > end_date:
+        raise HTTPException(status_code=400, detail="Invalid start_date, end_date combination")
+
+    if month is not None and year is None:
+        raise HTTPException(status_code=400, detail="Invalid bank_name, year, month combination")
+
+    version = await _get_query_version(storage_service, bank_name=bank_name, year=year, month=month)
+    # the same URL serves JSON or NDJSON depending on the Accept header, so each format gets its own tag
+    version_headers = _build_version_headers(version, variant="ndjson" if stream else "json") | {"Vary": "Accept"}
+
+    if _is_not_modified(version_headers["ETag"], version.last_modified, if_none_match, if_modified_since):
+        return Response(status_code=304, headers=version_headers)
+
+    if stream or limit is not None or after is not None or start_date is not None or end_date is not None:
+        return await _get_transactions_in_order(
+            storage_service=storage_service,
+            bank_name=bank_name,
+            year=year,
+            month=month,
+            limit=limit,
+            after=after,
+            start_date=start_date,
+            end_date=end_date,
+            stream=stream,
+            headers=version_headers,
+        )
+
     try:
         if bank_name is None and year is None and month is None:
-            return storage_service.get_all_transactions()
+            transactions = await storage_service.get_all_transactions()
+        elif bank_name is not None and year is None and month is None:
+            transactions = await storage_service.get_all_transactions_for_bank(bank_name)
+        elif bank_name is not None and year is not None and month is None:
+            transactions = await storage_service.get_all_transactions_for_bank_for_year(bank_name=bank_name, year=year)
+        elif bank_name is not None and year is not None and month is not None:
+            transactions = await storage_service.get_transactions_for_bank_for_date(
+                bank_name=bank_name, year=year, month=month
+            )
+        elif bank_name is None and year is not None and month is None:
+            transactions = await storage_service.get_all_transactions_for_year(year)
+        elif bank_name is None and year is not None and month is not None:
+            transactions = await storage_service.get_all_transactions_for_date(year=year, month=month)
+        else:
+            raise HTTPException(status_code=400, detail="Invalid bank_name, year, month combination")
+    except StorageServiceNotFoundException:
+        raise HTTPException(status_code=404, detail="Cannot find requested file")
+    except StorageServiceException:
+        raise HTTPException(status_code=500, detail="Invalid file")
 
-        if bank_name is not None and year is None and month is None:
-            return storage_service.get_all_transactions_for_bank(bank_name)
+    return TransactionListResponse(transactions, headers=version_headers)
 
-        if bank_name is not None and year is not None and month is None:
-            return storage_service.get_all_transactions_for_bank_for_year(bank_name=bank_name, year=year)
 
-        if bank_name is not None and year is not None and month is not None:
-            return storage_service.get_transactions_for_bank_for_date(bank_name=bank_name, year=year, month=month)
+@router.get("/search")
+async def search_transactions(
+    storage_service: Annotated[AsyncStorageService, Depends(get_async_storage_service)],
+    q: Annotated[str, Query(min_length=1)],
+    bank_name: str | None = None,
+    year: int | None = None,
+    month: int | None = None,
+    limit: Annotated[int, Query(ge=1)] = DEFAULT_SEARCH_LIMIT,
+    cursor: str | None = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+    if_modified_since: Annotated[str | None, Header()] = None,
+) -> list[Transaction]:
+    """
+    Searches transaction descriptions.
 
-        if bank_name is None and year is not None and month is None:
-            return storage_service.get_all_transactions_for_year(year)
+    Query parameters:
+    - q: required, words that must all appear in the description; a word ending in * matches any word starting
+      with it, e.g. "netflix" or "net*"
+    - bank_name, year, month: optional, filter the transactions as for GET /transactions
+    - limit: optional, maximum number of transactions to return, 50 by default; when more exist, the X-Next-Cursor
+      response header holds the cursor for the next page
+    - cursor: optional, X-Next-Cursor value from a previous page; only matches after it are returned
 
-        if bank_name is None and year is not None and month is not None:
-            return storage_service.get_all_transactions_for_date(year=year, month=month)
+    Matches are returned in date order. Conditional requests are answered as for GET /transactions. If no data exists
+    for a requested month, raises a 404 Not Found error.
+    """
 
+    if month is not None and year is None:
         raise HTTPException(status_code=400, detail="Invalid bank_name, year, month combination")
+
+    try:
+        after = TransactionCursor.decode(cursor) if cursor is not None else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    try:
+        parse_search_query(q)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid search query")
+
+    version = await _get_query_version(storage_service, bank_name=bank_name, year=year, month=month)
+    version_headers = _build_version_headers(version)
+
+    if _is_not_modified(version_headers["ETag"], version.last_modified, if_none_match, if_modified_since):
+        return Response(status_code=304, headers=version_headers)
+
+    try:
+        page = await storage_service.search_transactions(
+            query=q, limit=limit, bank_name=bank_name, year=year, month=month, after=after
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid search query")
     except StorageServiceNotFoundException:
         raise HTTPException(status_code=404, detail="Cannot find requested file")
     except StorageServiceException:
         raise HTTPException(status_code=500, detail="Invalid file")
+
+    if page.next_cursor is not None:
+        version_headers[NEXT_CURSOR_HEADER] = page.next_cursor.encode()
+
+    return TransactionListResponse(page.transactions, headers=version_headers)
+
+
+@router.get("/summary")
+async def get_transaction_summary(
+    response: Response,
+    storage_service: Annotated[AsyncStorageService, Depends(get_async_storage_service)],
+    bank_name: str | None = None,
+    year: int | None = None,
+    month: int | None = None,
+    group_by: Annotated[list[TransactionSummaryGroup], Query()] = ["bank", "month"],
+    if_none_match: Annotated[str | None, Header()] = None,
+    if_modified_since: Annotated[str | None, Header()] = None,
+) -> list[TransactionSummary]:
+    """
+    Gets money in, money out, net and closing balance totals for the requested transactions.
+
+    Query parameters:
+    - bank_name, year, month: optional, filter the transactions as for GET /transactions
+    - group_by: optional, repeatable; "bank" and at most one of "year", "month", "week" or "day".
+      Defaults to bank and month. The closing balance sums the last balance of each bank in the group.
+
+    Conditional requests are answered as for GET /transactions. If no data exists for a requested month, raises a
+    404 Not Found error.
+    """
+
+    if month is not None and year is None:
+        raise HTTPException(status_code=400, detail="Invalid bank_name, year, month combination")
+
+    if sum(group in PERIOD_GROUPS for group in group_by) > 1:
+        raise HTTPException(status_code=400, detail="Invalid group_by combination")
+
+    version = await _get_query_version(storage_service, bank_name=bank_name, year=year, month=month)
+    version_headers = _build_version_headers(version)
+
+    if _is_not_modified(version_headers["ETag"], version.last_modified, if_none_match, if_modified_since):
+        return Response(status_code=304, headers=version_headers)
+
+    try:
+        summaries = await storage_service.get_transaction_summary(
+            group_by=group_by, bank_name=bank_name, year=year, month=month
+        )
+    except StorageServiceNotFoundException:
+        raise HTTPException(status_code=404, detail="Cannot find requested file")
+    except StorageServiceException:
+        raise HTTPException(status_code=500, detail="Invalid file")
+
+    response.headers.update(version_headers)
+    return summaries
+
+
+async def _get_transactions_in_order(
+    storage_service: AsyncStorageService,
+    bank_name: str | None,
+    year: int | None,
+    month: int | None,
+    limit: int | None,
+    after: TransactionCursor | None,
+    start_date: date | None,
+    end_date: date | None,
+    stream: bool,
+    headers: dict[str, str],
+) -> Response:
+    try:
+        if limit is None:
+            transactions = await storage_service.iter_transactions(
+                bank_name=bank_name, year=year, month=month, after=after, start_date=start_date, end_date=end_date
+            )
+
+            if stream:
+                return StreamingResponse(_to_ndjson(transactions), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+            return TransactionListResponse([transaction async for transaction in transactions], headers=headers)
+
+        page = await storage_service.get_transactions_page(
+            limit=limit,
+            bank_name=bank_name,
+            year=year,
+            month=month,
+            after=after,
+            start_date=start_date,
+            end_date=end_date,
+        )
+    except StorageServiceNotFoundException:
+        raise HTTPException(status_code=404, detail="Cannot find requested file")
+    except StorageServiceException:
+        raise HTTPException(status_code=500, detail="Invalid file")
+
+    if page.next_cursor is not None:
+        headers = headers | {NEXT_CURSOR_HEADER: page.next_cursor.encode()}
+
+    if stream:
+        return StreamingResponse(
+            (transaction.model_dump_json().encode() + b"\n" for transaction in page.transactions),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers=headers,
+        )
+
+    return TransactionListResponse(page.transactions, headers=headers)
+
+
+async def _get_query_version(
+    storage_service: AsyncStorageService, bank_name: str | None, year: int | None, month: int | None
+) -> QueryVersion:
+    # versioned before any rows are read, so a write landing mid-query can only leave the response tagged as older
+    # than its data, which costs the client one extra full response rather than a missed update
+    try:
+        partitions = await storage_service.list_partitions(bank_name=bank_name, year=year, month=month)
+    except StorageServiceException:
+        raise HTTPException(status_code=500, detail="Invalid file")
+
+    # a month without data has no representation, so it is reported missing before any conditional header is checked
+    if month is not None and not partitions:
+        raise HTTPException(status_code=404, detail="Cannot find requested file")
+
+    return build_query_version(partitions)
+
+
+def _build_version_headers(version: QueryVersion, variant: str = "json") -> dict[str, str]:
+    headers = {"ETag": f'"{version.etag}-{variant}"'}
+
+    if version.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(version.last_modified.astimezone(timezone.utc), usegmt=True)
+
+    return headers
+
+
+def _is_not_modified(
+    etag: str, last_modified: datetime | None, if_none_match: str | None, if_modified_since: str | None
+) -> bool:
+    # If-None-Match takes precedence, as HTTP dates only resolve to the second
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+
+    if if_modified_since is None or last_modified is None:
+        return False
+
+    try:
+        modified_since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+    if modified_since.tzinfo is None:
+        modified_since = modified_since.replace(tzinfo=timezone.utc)
+
+    return last_modified.replace(microsecond=0) <= modified_since
+
+
+async def _to_ndjson(transactions: AsyncIterator[Transaction]) -> AsyncIterator[bytes]:
+    async for transaction in transactions:
+        yield transaction.model_dump_json().encode() + b"\n"
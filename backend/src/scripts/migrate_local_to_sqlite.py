@@ -0,0 +1,66 @@
+"""
+Imports an existing local storage directory into a SQLite database.
+
+Usage: python -m src.scripts.migrate_local_to_sqlite [--storage-dir-path PATH] [--db-path PATH]
+"""
+
+import argparse
+from pathlib import Path
+
+from loguru import logger
+
+from src.services.storage.local_storage_service import LocalStorageService
+from src.services.storage.sqlite_storage_service import SqliteStorageService
+from src.settings import Settings
+
+
+def migrate_local_storage(
+    local_storage_service: LocalStorageService, sqlite_storage_service: SqliteStorageService
+) -> int:
+    """Copies every statement and transaction partition across, returning the number of partitions imported."""
+
+    for statement_file_path in local_storage_service.storage_dir_path.glob("*/*/*/statement.pdf"):
+        month_dir_path = statement_file_path.parent
+        year_dir_path = month_dir_path.parent
+
+        if not year_dir_path.name.isdigit() or not month_dir_path.name.isdigit():
+            continue
+
+        sqlite_storage_service.store_statement(
+            statement_bytes=statement_file_path.read_bytes(),
+            bank_name=year_dir_path.parent.name,
+            year=int(year_dir_path.name),
+            month=int(month_dir_path.name),
+        )
+
+    partitions = local_storage_service.rebuild_manifest()
+
+    for partition in partitions:
+        transactions = local_storage_service.get_transactions_for_bank_for_date(
+            bank_name=partition.bank_name, year=partition.year, month=partition.month
+        )
+        sqlite_storage_service.store_transactions(
+            transactions=transactions, bank_name=partition.bank_name, year=partition.year, month=partition.month
+        )
+
+    return len(partitions)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import a local storage directory into a SQLite database.")
+    parser.add_argument("--storage-dir-path", type=Path, help="defaults to LOCAL_STORAGE_DIR_PATH from the settings")
+    parser.add_argument("--db-path", type=Path, help="defaults to the SQLite database path from the settings")
+    args = parser.parse_args()
+
+    settings = Settings() if args.storage_dir_path is None or args.db_path is None else None
+    storage_dir_path = args.storage_dir_path or settings.local_storage_dir_path
+    db_path = args.db_path or settings.sqlite_storage_db_file_path
+
+    sqlite_storage_service = SqliteStorageService(db_path)
+    partition_count = migrate_local_storage(LocalStorageService(storage_dir_path), sqlite_storage_service)
+    sqlite_storage_service.close()
+    logger.info(f"Imported {partition_count} partitions from {storage_dir_path} into {db_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Regenerates the partition manifest of a local storage directory from the files on disk.
+
+Usage: python -m src.scripts.rebuild_manifest [storage_dir_path]
+"""
+
+import argparse
+from pathlib import Path
+
+from loguru import logger
+
+from src.services.storage.local_storage_service import LocalStorageService
+from src.settings import Settings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the partition manifest of a local storage directory.")
+    parser.add_argument(
+        "storage_dir_path",
+        type=Path,
+        nargs="?",
+        help="storage directory to index, defaults to LOCAL_STORAGE_DIR_PATH from the settings",
+    )
+    args = parser.parse_args()
+
+    storage_dir_path = args.storage_dir_path or Settings().local_storage_dir_path
+    entries = LocalStorageService(storage_dir_path).rebuild_manifest()
+    logger.info(f"Rebuilt manifest for {storage_dir_path} with {len(entries)} partitions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Checks the stored partition rollups against the raw transactions of the configured storage backend.
+
+Usage: python -m src.scripts.verify_rollups [--repair]
+
+Exits with status 1 if any rollup is stale, unless --repair rewrote those partitions to recompute them.
+"""
+
+import argparse
+import sys
+
+from loguru import logger
+
+from src.dependencies import get_partition_cache, get_storage_service
+from src.models import PartitionManifestEntry
+from src.services.storage.storage_service import StorageService
+from src.services.storage.transaction_batch import TransactionBatch
+from src.services.storage.transaction_summary import build_partition_rollup
+from src.settings import Settings
+
+
+def find_stale_rollups(storage_service: StorageService) -> list[PartitionManifestEntry]:
+    """Recomputes every partition's rollup from its transactions, returning the partitions whose stored one differs."""
+
+    stale_partitions: list[PartitionManifestEntry] = []
+
+    for partition in storage_service.list_partitions():
+        transactions = storage_service.get_transactions_for_bank_for_date(
+            bank_name=partition.bank_name, year=partition.year, month=partition.month
+        )
+
+        if build_partition_rollup(TransactionBatch.from_transactions(transactions)) != partition.rollup:
+            stale_partitions.append(partition)
+
+    return stale_partitions
+
+
+def repair_rollups(storage_service: StorageService, partitions: list[PartitionManifestEntry]) -> None:
+    """Rewrites the given partitions unchanged, which recomputes their rollups along with the rest of their entry."""
+
+    storage_service.store_many_transactions(
+        {
+            (partition.bank_name, partition.year, partition.month): storage_service.get_transactions_for_bank_for_date(
+                bank_name=partition.bank_name, year=partition.year, month=partition.month
+            )
+            for partition in partitions
+        }
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Verify partition rollups against the stored transactions.")
+    parser.add_argument("--repair", action="store_true", help="recompute the rollups of any stale partitions")
+    args = parser.parse_args()
+
+    settings = Settings()
+    storage_service = get_storage_service(settings, get_partition_cache(settings))
+    stale_partitions = find_stale_rollups(storage_service)
+
+    for partition in stale_partitions:
+        logger.warning(f"Stale rollup for {partition.bank_name} {partition.year}-{partition.month:02}")
+
+    if stale_partitions and args.repair:
+        repair_rollups(storage_service, stale_partitions)
+        logger.info(f"Recomputed {len(stale_partitions)} stale rollups")
+    elif stale_partitions:
+        sys.exit(1)
+    else:
+        logger.info("All rollups match the stored transactions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import asyncio
+import zipfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Generator
+
+from loguru import logger
+from pydantic import ValidationError
+
+from src.models import BulkStatementManifest, BulkStatementResult, Transaction
+from src.services.jobs.statement_job_queue import StatementJobQueue
+from src.services.statement_parser.model_statement_parser import ModelStatementParserException
+from src.services.statement_parser.statement_preprocessor import StatementPreprocessorException
+from src.services.storage.async_storage_service import AsyncStorageService
+from src.services.storage.storage_service import PartitionKey, StorageServiceException
+
+ZIP_MANIFEST_FILE_NAME = "manifest.json"
+
+
+class BulkStatementImportException(Exception):
+    def __init__(self, message: str):
+        super().__init__(message)
+
+
+@dataclass
+class BulkStatement:
+    file_name: str
+    bank_name: str
+    year: int
+    month: int
+    # None when the manifest names a file that was not uploaded
+    statement_stream: BinaryIO | None
+
+
+def read_bulk_statements(manifest_json: str | bytes, files: dict[str, BinaryIO]) -> list[BulkStatement]:
+    """Pairs each manifest entry with its uploaded file. Raises BulkStatementImportException for a bad manifest."""
+
+    try:
+        manifest = BulkStatementManifest.model_validate_json(manifest_json)
+    except ValidationError:
+        raise BulkStatementImportException("Invalid bulk upload manifest")
+
+    partition_keys = [(entry.bank_name, entry.year, entry.month) for entry in manifest.statements]
+
+    if len(set(partition_keys)) != len(partition_keys):
+        raise BulkStatementImportException("Bulk upload manifest names the same bank, year and month more than once")
+
+    return [
+        BulkStatement(
+            file_name=entry.file_name,
+            bank_name=entry.bank_name,
+            year=entry.year,
+            month=entry.month,
+            statement_stream=files.get(entry.file_name),
+        )
+        for entry in manifest.statements
+    ]
+
+
+@contextmanager
+def open_bulk_statements_zip(zip_stream: BinaryIO) -> Generator[list[BulkStatement], Any, None]:
+    """
+    Opens a zip holding the statements and a manifest.json mapping their file names to bank, year and month.
+    Each statement is streamed out of the zip as it is read, so the zip must stay open while they are imported.
+    """
+
+    try:
+        zip_file = zipfile.ZipFile(zip_stream)
+    except zipfile.BadZipFile:
+        raise BulkStatementImportException("Invalid bulk upload zip")
+
+    with zip_file:
+        file_names = set(zip_file.namelist())
+
+        if ZIP_MANIFEST_FILE_NAME not in file_names:
+            raise BulkStatementImportException(f"Bulk upload zip has no {ZIP_MANIFEST_FILE_NAME}")
+
+        bulk_statements = read_bulk_statements(zip_file.read(ZIP_MANIFEST_FILE_NAME), files={})
+
+        for bulk_statement in bulk_statements:
+            if bulk_statement.file_name in file_names:
+                bulk_statement.statement_stream = zip_file.open(bulk_statement.file_name)
+
+        yield bulk_statements
+
+
+async def import_statements(
+    bulk_statements: list[BulkStatement],
+    statement_job_queue: StatementJobQueue,
+    storage_service: AsyncStorageService,
+    max_concurrency: int,
+) -> list[BulkStatementResult]:
+    """
+    Stores and parses the statements, at most max_concurrency at a time, then writes every parsed partition in one
+    storage batch so the partition index is updated once. Returns one result per statement, in the given order.
+    """
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def import_statement(bulk_statement: BulkStatement) -> tuple[BulkStatementResult, list[Transaction]]:
+        result = BulkStatementResult(
+            file_name=bulk_statement.file_name,
+            bank_name=bulk_statement.bank_name,
+            year=bulk_statement.year,
+            month=bulk_statement.month,
+            state="failed",
+        )
+
+        if bulk_statement.statement_stream is None:
+            return result.model_copy(update={"error": "File not found in upload"}), []
+
+        async with semaphore:
+            try:
+                statement_sha256 = await storage_service.store_statement_stream(
+                    statement_stream=bulk_statement.statement_stream,
+                    bank_name=bulk_statement.bank_name,
+                    year=bulk_statement.year,
+                    month=bulk_statement.month,
+                )
+                parsed_statement = await statement_job_queue.parse_statement(
+                    bank_name=bulk_statement.bank_name,
+                    year=bulk_statement.year,
+                    month=bulk_statement.month,
+                    statement_sha256=statement_sha256,
+                )
+            except (ModelStatementParserException, StatementPreprocessorException, StorageServiceException) as e:
+                return result.model_copy(update={"error": str(e)}), []
+            except Exception as e:
+                # record the failure against this statement rather than failing the whole batch in gather
+                logger.exception(f"Bulk import of {bulk_statement.file_name} failed")
+                return result.model_copy(update={"error": f"Unexpected error: {e!r}"}), []
+
+        result = result.model_copy(
+            update={
+                "state": "succeeded",
+                "transaction_count": len(parsed_statement.transactions),
+                "cache_hit": parsed_statement.cache_hit,
+            }
+        )
+        return result, parsed_statement.transactions
+
+    outcomes = await asyncio.gather(*(import_statement(bulk_statement) for bulk_statement in bulk_statements))
+    partitions: dict[PartitionKey, list[Transaction]] = {
+        (result.bank_name, result.year, result.month): transactions
+        for result, transactions in outcomes
+        if result.state == "succeeded"
+    }
+
+    try:
+        await storage_service.store_many_transactions(partitions)
+    except StorageServiceException as e:
+        return [
+            result.model_copy(update={"state": "failed", "transaction_count": None, "error": str(e)})
+            if result.state == "succeeded"
+            else result
+            for result, _ in outcomes
+        ]
+
+    return [result for result, _ in outcomes]
@@ -0,0 +1,242 @@
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from anyio.to_thread import run_sync
+from loguru import logger
+
+from src.models import StatementJob, Transaction
+from src.services.jobs.statement_job_store import StatementJobStore
+from src.services.statement_parser.model_statement_parser import ModelStatementParser, ModelStatementParserException
+from src.services.statement_parser.parse_cache import ParseCache
+from src.services.statement_parser.statement_preprocessor import StatementPreprocessorException, preprocess_statement
+from src.services.storage.async_storage_service import AsyncStorageService
+from src.services.storage.storage_service import StorageServiceException
+
+
+@dataclass
+class ParsedStatement:
+    transactions: list[Transaction]
+    statement_size_bytes: int | None
+    estimated_prompt_tokens: int | None
+    cache_hit: bool
+
+
+class StatementJobQueue:
+    """
+    Parses stored statements in the background on a fixed number of worker tasks.
+
+    Every state change is written to the job store before it takes effect, so jobs that were queued or running when
+    the process stopped are picked up again by the next start(). With a parse cache, statements the model has
+    already parsed under the same configuration are stored straight away instead of being queued.
+    """
+
+    def __init__(
+        self,
+        job_store: StatementJobStore,
+        statement_parser: ModelStatementParser,
+        storage_service: AsyncStorageService,
+        concurrency: int,
+        parse_cache: ParseCache | None = None,
+    ):
+        self.job_store = job_store
+        self.statement_parser = statement_parser
+        self.storage_service = storage_service
+        self.concurrency = concurrency
+        self.parse_cache = parse_cache
+        self._queue: asyncio.Queue[StatementJob] | None = None
+        self._workers: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Starts the workers and re-queues any unfinished jobs left by a previous run. Does nothing if running."""
+
+        if self._queue is not None:
+            return
+
+        self._queue = asyncio.Queue()
+        unfinished_jobs = await run_sync(self.job_store.find, {"queued", "running"})
+
+        for job in unfinished_jobs:
+            self._queue.put_nowait(job.model_copy(update={"state": "queued", "started_at": None}))
+
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        """Cancels the workers. Jobs they were running stay marked as running and are retried by the next start()."""
+
+        for worker in self._workers:
+            worker.cancel()
+
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._queue, self._workers = None, []
+
+    async def enqueue(
+        self, bank_name: str, year: int, month: int, statement_sha256: str | None = None
+    ) -> StatementJob:
+        """
+        Records a job to parse the statement already stored for the given bank and month, and queues it.
+
+        If the statement's sha256 is given and the parse cache holds its result, the cached transactions are stored
+        and the job is returned already succeeded.
+        """
+
+        await self.start()
+
+        job = StatementJob(
+            id=uuid4().hex,
+            bank_name=bank_name,
+            year=year,
+            month=month,
+            state="queued",
+            created_at=datetime.now(timezone.utc),
+            statement_sha256=statement_sha256,
+        )
+        cached_transactions = await self.get_cached_transactions(bank_name=bank_name, statement_sha256=statement_sha256)
+
+        if cached_transactions is not None:
+            await self.storage_service.store_transactions(
+                transactions=cached_transactions, bank_name=bank_name, year=year, month=month
+            )
+            job = job.model_copy(
+                update={
+                    "state": "succeeded",
+                    "started_at": job.created_at,
+                    "finished_at": datetime.now(timezone.utc),
+                    "transaction_count": len(cached_transactions),
+                    "cache_hit": True,
+                }
+            )
+            await run_sync(self.job_store.save, job)
+            return job
+
+        await run_sync(self.job_store.save, job)
+        self._queue.put_nowait(job)
+        return job
+
+    async def get(self, job_id: str) -> StatementJob | None:
+        return await run_sync(self.job_store.get, job_id)
+
+    async def get_cached_transactions(self, bank_name: str, statement_sha256: str | None) -> list[Transaction] | None:
+        cache_key = self._parse_cache_key(statement_sha256)
+
+        if cache_key is None:
+            return None
+
+        parsed_transactions = await run_sync(self.parse_cache.get, cache_key)
+
+        if parsed_transactions is None:
+            return None
+
+        return [
+            Transaction.from_parsed_transaction(bank_name=bank_name, parsed_transaction=transaction)
+            for transaction in parsed_transactions
+        ]
+
+    async def parse_statement(
+        self, bank_name: str, year: int, month: int, statement_sha256: str | None = None, check_cache: bool = True
+    ) -> ParsedStatement:
+        """
+        Runs the statement stored for the given bank and month through the parse cache, local preprocessing and the
+        model without storing the result. The statement is only read back from storage on a cache miss.
+        The result is always cached, under the sha256 of the statement read back rather than the one given;
+        check_cache=False skips the lookup for callers that have already made it.
+
+        Raises StatementPreprocessorException or ModelStatementParserException if it cannot be parsed.
+        """
+
+        cached_transactions = (
+            await self.get_cached_transactions(bank_name=bank_name, statement_sha256=statement_sha256)
+            if check_cache
+            else None
+        )
+
+        if cached_transactions is not None:
+            return ParsedStatement(
+                transactions=cached_transactions,
+                statement_size_bytes=None,
+                estimated_prompt_tokens=None,
+                cache_hit=True,
+            )
+
+        statement_bytes = await self.storage_service.get_statement_bytes_for_bank_on_date(
+            bank_name=bank_name, year=year, month=month
+        )
+
+        # extraction is CPU bound, so keep it off the event loop
+        preprocessed_statement = await run_sync(preprocess_statement, statement_bytes)
+
+        # keyed by the bytes actually read, which differ from statement_sha256 if the month was uploaded again since,
+        # and before parsing so the result is cached against the instructions the model actually used
+        cache_key = self._parse_cache_key(hashlib.sha256(statement_bytes).hexdigest())
+        model_start = time.perf_counter()
+        transactions = await self.statement_parser.parse_statement_pages(
+            bank_name=bank_name, pages=preprocessed_statement.pages
+        )
+        model_seconds = time.perf_counter() - model_start
+
+        if cache_key is not None:
+            await run_sync(self.parse_cache.put, cache_key, transactions, model_seconds)
+
+        return ParsedStatement(
+            transactions=transactions,
+            statement_size_bytes=preprocessed_statement.input_bytes,
+            estimated_prompt_tokens=preprocessed_statement.estimated_tokens,
+            cache_hit=False,
+        )
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+
+            try:
+                await self._process(job)
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job: StatementJob) -> None:
+        job = job.model_copy(update={"state": "running", "started_at": datetime.now(timezone.utc)})
+        await run_sync(self.job_store.save, job)
+
+        try:
+            # enqueue already looked the statement up in the parse cache
+            parsed_statement = await self.parse_statement(
+                bank_name=job.bank_name,
+                year=job.year,
+                month=job.month,
+                statement_sha256=job.statement_sha256,
+                check_cache=False,
+            )
+            job = job.model_copy(
+                update={
+                    "statement_size_bytes": parsed_statement.statement_size_bytes,
+                    "estimated_prompt_tokens": parsed_statement.estimated_prompt_tokens,
+                    "cache_hit": parsed_statement.cache_hit,
+                }
+            )
+            await self.storage_service.store_transactions(
+                transactions=parsed_statement.transactions, bank_name=job.bank_name, year=job.year, month=job.month
+            )
+        except (ModelStatementParserException, StatementPreprocessorException, StorageServiceException) as e:
+            job = job.model_copy(update={"state": "failed", "error": str(e)})
+        except Exception as e:
+            # keep the worker alive and surface the failure on the job rather than losing it in the task
+            logger.exception(f"Statement job {job.id} failed")
+            job = job.model_copy(update={"state": "failed", "error": f"Unexpected error: {e!r}"})
+        else:
+            job = job.model_copy(update={"state": "succeeded", "transaction_count": len(parsed_statement.transactions)})
+
+        await run_sync(self.job_store.save, job.model_copy(update={"finished_at": datetime.now(timezone.utc)}))
+
+    def _parse_cache_key(self, statement_sha256: str | None) -> str | None:
+        if self.parse_cache is None or statement_sha256 is None:
+            return None
+
+        return self.parse_cache.build_key(
+            statement_sha256=statement_sha256,
+            model_name=self.statement_parser.model_name,
+            temperature=self.statement_parser.temperature,
+            instructions=self.statement_parser.instructions,
+        )
@@ -0,0 +1,57 @@
+import os
+from pathlib import Path
+
+from pydantic import ValidationError
+
+from src.models import StatementJob, StatementJobState
+
+
+class StatementJobStoreException(Exception):
+    def __init__(self, message: str):
+        super().__init__(message)
+
+
+class StatementJobStore:
+    """Keeps one JSON file per statement job so queued work survives a restart."""
+
+    def __init__(self, jobs_dir_path: Path):
+        self.jobs_dir_path = jobs_dir_path
+
+    def save(self, job: StatementJob) -> None:
+        self.jobs_dir_path.mkdir(parents=True, exist_ok=True)
+        file_path = self._job_file_path(job.id)
+
+        # write to a temporary file and swap it in so a crash never leaves a half-written job behind
+        tmp_file_path = file_path.with_name(f".{file_path.name}.tmp")
+        tmp_file_path.write_text(job.model_dump_json())
+        os.replace(tmp_file_path, file_path)
+
+    def get(self, job_id: str) -> StatementJob | None:
+        # job ids are generated hex strings, so anything else cannot name a job file
+        if not job_id.isalnum():
+            return None
+
+        file_path = self._job_file_path(job_id)
+
+        try:
+            return StatementJob.model_validate_json(file_path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except ValidationError:
+            raise StatementJobStoreException(f"Failed to read statement job at path: {file_path}")
+
+    def find(self, states: set[StatementJobState]) -> list[StatementJob]:
+        """Returns the jobs in any of the given states, oldest first."""
+
+        jobs = []
+
+        for file_path in self.jobs_dir_path.glob("*.json"):
+            job = self.get(file_path.stem)
+
+            if job is not None and job.state in states:
+                jobs.append(job)
+
+        return sorted(jobs, key=lambda job: job.created_at)
+
+    def _job_file_path(self, job_id: str) -> Path:
+        return self.jobs_dir_path / f"{job_id}.json"
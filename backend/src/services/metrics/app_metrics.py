@@ -0,0 +1,72 @@
+from src.services.metrics.prometheus_metrics import Counter, Gauge, Histogram, Metric, render_metrics
+from src.services.statement_parser.parse_cache import ParseCacheStats
+from src.services.storage.partition_cache import PartitionCacheStats
+
+# upper bounds of the partition count buckets storage calls are labelled with, keeping the label's values few
+PARTITION_COUNT_BUCKETS = (0, 1, 10, 100)
+
+
+def partition_count_bucket(partition_count: int) -> str:
+    """Returns the partitions label for a storage call touching partition_count partitions, like "2-10"."""
+
+    lower_bound = 0
+
+    for upper_bound in PARTITION_COUNT_BUCKETS:
+        if partition_count <= upper_bound:
+            return str(upper_bound) if lower_bound == upper_bound else f"{lower_bound}-{upper_bound}"
+
+        lower_bound = upper_bound + 1
+
+    return f"{lower_bound}+"
+
+
+class AppMetrics:
+    """
+    The metrics served at GET /metrics, showing where time goes between requests, storage and the model.
+
+    Latencies are recorded as they happen. Cache statistics and the partition count are kept by their own services
+    and only copied in when metrics are scraped, so the read path pays nothing extra for them.
+    """
+
+    def __init__(self):
+        self.request_duration = Histogram(
+            "http_request_duration_seconds",
+            "Time to handle an HTTP request, until its response body has been sent.",
+            ("method", "route", "status_code"),
+        )
+        self.storage_duration = Histogram(
+            "storage_operation_duration_seconds",
+            "Time for a storage call, including waiting for a storage thread, by the partitions it read or wrote.",
+            ("method", "partitions"),
+        )
+        self.storage_partitions = Gauge("storage_partitions", "Number of stored bank/month partitions.")
+        self.model_duration = Histogram(
+            "model_request_duration_seconds",
+            "Time for one model call parsing a statement or window of one.",
+            ("model", "outcome"),
+        )
+        self.model_input_tokens = Counter(
+            "model_input_tokens_total", "Input tokens sent to the model, as reported by it.", ("model",)
+        )
+        self.model_output_tokens = Counter(
+            "model_output_tokens_total", "Output tokens returned by the model, as reported by it.", ("model",)
+        )
+        self.cache_hits = Counter("cache_hits_total", "Lookups answered from a cache.", ("cache",))
+        self.cache_misses = Counter("cache_misses_total", "Lookups a cache could not answer.", ("cache",))
+        self.cache_hit_ratio = Gauge("cache_hit_ratio", "Share of lookups answered from a cache.", ("cache",))
+
+    @property
+    def metrics(self) -> list[Metric]:
+        return [metric for metric in vars(self).values() if isinstance(metric, Metric)]
+
+    def record_cache_stats(self, cache: str, stats: PartitionCacheStats | ParseCacheStats) -> None:
+        lookups = stats.hits + stats.misses
+        self.cache_hits.set_total(stats.hits, cache)
+        self.cache_misses.set_total(stats.misses, cache)
+        self.cache_hit_ratio.set(stats.hits / lookups if lookups else 0.0, cache)
+
+    def record_storage_call(self, method: str, partition_count: int, seconds: float) -> None:
+        self.storage_duration.observe(seconds, method, partition_count_bucket(partition_count))
+
+    def render(self) -> str:
+        return render_metrics(self.metrics)
@@ -0,0 +1,144 @@
+from bisect import bisect_left
+from threading import Lock
+
+# request and storage latencies in seconds, from a cached partition read up to a slow model call
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = tuple[str, ...]
+
+
+class Metric:
+    """
+    A named metric whose series are told apart by their label values, rendered in the Prometheus text format.
+
+    Updates take a lock held only for a few additions, since storage calls report from worker threads.
+    """
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._lock = Lock()
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+    def _format_labels(self, label_values: LabelValues, extra_labels: dict[str, str] | None = None) -> str:
+        labels = dict(zip(self.label_names, label_values)) | (extra_labels or {})
+
+        if not labels:
+            return ""
+
+        return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in labels.items()) + "}"
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def set_total(self, total: float, *label_values: str) -> None:
+        """Sets the total outright, for counts kept elsewhere such as cache hits, which are copied in on scrape."""
+
+        with self._lock:
+            self._values[label_values] = total
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+
+        return super().render() + [
+            f"{self.name}{self._format_labels(label_values)} {_format_value(value)}" for label_values, value in values
+        ]
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def set(self, value: float, *label_values: str) -> None:
+        self.set_total(value, *label_values)
+
+
+class _HistogramSeries:
+    def __init__(self, bucket_count: int):
+        # the last bucket counts observations above every bound
+        self.bucket_counts = [0] * bucket_count
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = buckets
+        self._series: dict[LabelValues, _HistogramSeries] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        # bucket bounds are inclusive, so a value equal to a bound counts towards that bucket
+        bucket_index = bisect_left(self.buckets, value)
+
+        with self._lock:
+            series = self._series.get(label_values)
+
+            if series is None:
+                series = self._series[label_values] = _HistogramSeries(len(self.buckets) + 1)
+
+            series.bucket_counts[bucket_index] += 1
+            series.sum += value
+            series.count += 1
+
+    def render(self) -> list[str]:
+        with self._lock:
+            series_by_labels = [
+                (label_values, list(series.bucket_counts), series.sum, series.count)
+                for label_values, series in sorted(self._series.items())
+            ]
+
+        lines = super().render()
+
+        for label_values, bucket_counts, total, count in series_by_labels:
+            cumulative_count = 0
+
+            # buckets are kept per bucket so observing is one increment, and only summed up here
+            for bound, bucket_count in zip((*self.buckets, float("inf")), bucket_counts):
+                cumulative_count += bucket_count
+                labels = self._format_labels(label_values, {"le": _format_value(bound)})
+                lines.append(f"{self.name}_bucket{labels} {cumulative_count}")
+
+            lines.append(f"{self.name}_sum{self._format_labels(label_values)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{self._format_labels(label_values)} {count}")
+
+        return lines
+
+
+def render_metrics(metrics: list[Metric]) -> str:
+    """Renders the metrics in the Prometheus text exposition format, version 0.0.4."""
+
+    return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape_label_value(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
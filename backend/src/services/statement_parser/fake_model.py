@@ -0,0 +1,82 @@
+import asyncio
+import math
+import random
+import re
+
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, ToolCallPart, UserPromptPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+FAKE_MODEL_NAME = "fake"
+
+# a statement line as written by benchmarks.data_generator: date, description, paid in, paid out, balance
+_TRANSACTION_LINE_PATTERN = re.compile(
+    r"^(\d{4}-\d{2}-\d{2}) (.+) (-?\d+(?:\.\d+)?) (-?\d+(?:\.\d+)?) (-?\d+(?:\.\d+)?)$"
+)
+
+
+def build_fake_model(
+    latency_median_seconds: float = 0.0,
+    latency_sigma: float = 0.0,
+    error_rate: float = 0.0,
+    rate_limit_rate: float = 0.0,
+    seed: int | None = None,
+) -> FunctionModel:
+    """
+    Builds a stand-in for the Google model that needs no network or API key, for load testing the upload path.
+
+    Each response reads the transactions off the statement lines that look like
+    "2025-01-03 Grocery Store 0.00 75.20 1924.80", so the same statement always parses to the same transactions.
+    Response times are drawn from a log-normal distribution with the given median and sigma, and the given fractions
+    of requests fail with a 500 or a 429 as the real model endpoint would.
+    """
+
+    rng = random.Random(seed)
+
+    async def respond(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        outcome = rng.random()
+
+        if latency_median_seconds > 0:
+            # sleeping rather than blocking, so slow responses hold up only their own request as a real one would
+            await asyncio.sleep(rng.lognormvariate(math.log(latency_median_seconds), latency_sigma))
+
+        if outcome < rate_limit_rate:
+            raise ModelHTTPError(status_code=429, model_name=FAKE_MODEL_NAME, body="Resource has been exhausted")
+
+        if outcome < rate_limit_rate + error_rate:
+            raise ModelHTTPError(status_code=500, model_name=FAKE_MODEL_NAME, body="Internal error")
+
+        transactions = parse_statement_lines(_get_user_prompt(messages))
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, {"response": transactions})])
+
+    return FunctionModel(respond, model_name=FAKE_MODEL_NAME)
+
+
+def parse_statement_lines(statement: str) -> list[dict[str, str | float]]:
+    transactions = []
+
+    for line in statement.splitlines():
+        match = _TRANSACTION_LINE_PATTERN.match(line.strip())
+
+        if match is None:
+            continue
+
+        transaction_date, description, amount_in, amount_out, balance = match.groups()
+        transactions.append(
+            {
+                "date": transaction_date,
+                "description": description,
+                "amount_in": float(amount_in),
+                "amount_out": float(amount_out),
+                "balance": float(balance),
+            }
+        )
+
+    return transactions
+
+
+def _get_user_prompt(messages: list[ModelMessage]) -> str:
+    request = next(message for message in reversed(messages) if isinstance(message, ModelRequest))
+    return "\n".join(
+        part.content for part in request.parts if isinstance(part, UserPromptPart) and isinstance(part.content, str)
+    )
@@ -1,10 +1,17 @@
-from pydantic_ai import Agent
+import asyncio
+import time
+
+from pydantic_ai import Agent, AgentRunResult
+from pydantic_ai.models import Model
 from pydantic_ai.models.google import GoogleModel, GoogleModelSettings
 from pydantic_ai.providers.google import GoogleProvider
 from pydantic_ai.exceptions import AgentRunError, UsageLimitExceeded, UnexpectedModelBehavior
 from loguru import logger
 
 from src.models import ParsedTransaction, Transaction
+from src.services.metrics.app_metrics import AppMetrics
+from src.services.statement_parser.statement_windows import StatementStitchingException, build_page_windows, \
+    stitch_window_transactions
 
 
 class ModelStatementParserException(Exception):
@@ -13,6 +20,17 @@ class ModelStatementParserException(Exception):
 
 
 class ModelStatementParser:
+    """
+    Parses statements into transactions with a Google model, or with the given model instead, such as the fake one
+    used for load testing.
+
+    The provider, model and agent are built once and reused for every parse, so the HTTP client and its pooled
+    keep-alive connections to the model endpoint live as long as the parser does.
+
+    Long statements are split into windows of pages that are parsed concurrently, so parse time tracks the longest
+    window rather than the whole statement.
+    """
+
     def __init__(
         self,
         api_key: str,
@@ -21,6 +39,11 @@ class ModelStatementParser:
         max_tokens: int,
         top_p: float,
         instructions: str,
+        pages_per_window: int = 2,
+        window_overlap_lines: int = 3,
+        max_concurrent_windows: int = 8,
+        model: Model | None = None,
+        metrics: AppMetrics | None = None,
     ):
         self.api_key = api_key
         self.model_name = model_name
@@ -28,26 +51,56 @@ class ModelStatementParser:
         self.max_tokens = max_tokens
         self.top_p = top_p
         self.instructions = instructions
+        self.pages_per_window = pages_per_window
+        self.window_overlap_lines = window_overlap_lines
+        self.max_concurrent_windows = max_concurrent_windows
+        self.provider = GoogleProvider(api_key=api_key) if model is None else None
+        self.model = model or GoogleModel(model_name=model_name, provider=self.provider)
+        self.metrics = metrics
+        self.agent = self._build_agent()
 
-    @property
-    def agent(self) -> Agent:
-        settings = GoogleModelSettings(
-            temperature=self.temperature,
-            max_tokens=self.max_tokens,
-            top_p=self.top_p,
-        )
-        provider = GoogleProvider(api_key=self.api_key)
-        model = GoogleModel(model_name=self.model_name, provider=provider)
-        return Agent(
-            model=model,
-            model_settings=settings,
-            instructions=self.instructions,
-            output_type=list[ParsedTransaction],
+    def reload_instructions(self, instructions: str) -> None:
+        """Swaps in new instructions, keeping the existing model client and its connections."""
+
+        self.instructions = instructions
+        self.agent = self._build_agent()
+
+    async def aclose(self) -> None:
+        if self.provider is not None:
+            await self.provider.client.aio.aclose()
+
+    async def parse_statement_pages(self, bank_name: str, pages: list[str]) -> list[Transaction]:
+        """
+        Parses each window of pages concurrently and stitches the results together by running balance.
+
+        If the balances do not line up across windows, the whole statement is parsed again in one prompt rather than
+        returning transactions with a gap in them.
+        """
+
+        windows = build_page_windows(
+            pages, pages_per_window=self.pages_per_window, overlap_lines=self.window_overlap_lines
         )
 
+        if len(windows) == 1:
+            return await self.parse_transactions(bank_name=bank_name, statement=windows[0])
+
+        semaphore = asyncio.Semaphore(self.max_concurrent_windows)
+
+        async def parse_window(window: str) -> list[Transaction]:
+            async with semaphore:
+                return await self.parse_transactions(bank_name=bank_name, statement=window)
+
+        window_transactions = await asyncio.gather(*(parse_window(window) for window in windows))
+
+        try:
+            return stitch_window_transactions(window_transactions)
+        except StatementStitchingException as e:
+            logger.warning(f"Parsing statement in one prompt after stitching failed: {str(e)}")
+            return await self.parse_transactions(bank_name=bank_name, statement="\n".join(pages))
+
     async def parse_transactions(self, bank_name: str, statement: str) -> list[Transaction]:
         try:
-            result = await self.agent.run(user_prompt=statement)
+            result = await self._run_agent(statement)
             parsed_transactions: list[ParsedTransaction] = result.output
             return [
                 Transaction.from_parsed_transaction(bank_name=bank_name, parsed_transaction=transaction)
@@ -62,3 +115,34 @@ class ModelStatementParser:
         except AgentRunError as e:
             logger.warning(f"Agent run error: {str(e)}")
             raise ModelStatementParserException(f"Agent run error: {str(e)}") from e
+
+    async def _run_agent(self, statement: str) -> AgentRunResult[list[ParsedTransaction]]:
+        if self.metrics is None:
+            return await self.agent.run(user_prompt=statement)
+
+        start = time.perf_counter()
+        outcome = "error"
+
+        try:
+            result = await self.agent.run(user_prompt=statement)
+            outcome = "success"
+        finally:
+            self.metrics.model_duration.observe(time.perf_counter() - start, self.model_name, outcome)
+
+        usage = result.usage
+        self.metrics.model_input_tokens.inc(self.model_name, amount=usage.input_tokens)
+        self.metrics.model_output_tokens.inc(self.model_name, amount=usage.output_tokens)
+        return result
+
+    def _build_agent(self) -> Agent:
+        settings = GoogleModelSettings(
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            top_p=self.top_p,
+        )
+        return Agent(
+            model=self.model,
+            model_settings=settings,
+            instructions=self.instructions,
+            output_type=list[ParsedTransaction],
+        )
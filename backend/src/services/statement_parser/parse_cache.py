@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+
+from pydantic import BaseModel, ValidationError
+
+from src.models import ParsedTransaction
+
+
+@dataclass
+class ParseCacheStats:
+    hits: int
+    misses: int
+    hit_rate: float
+    evictions: int
+    entries: int
+    size_bytes: int
+    max_bytes: int
+    saved_model_seconds: float
+
+
+class CachedParse(BaseModel):
+    transactions: list[ParsedTransaction]
+    model_seconds: float
+
+
+class ParseCache:
+    """
+    Size-bounded LRU cache of model parse results kept on disk, one JSON file per entry.
+
+    Entries are keyed by the statement's sha256 and the model configuration, so an identical statement is only sent
+    to the model once per model and prompt. Recency is kept in the files' mtimes, so it survives a restart.
+    """
+
+    def __init__(self, cache_dir_path: Path, max_bytes: int):
+        self.cache_dir_path = cache_dir_path
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._saved_model_seconds = 0.0
+        self._entries: OrderedDict[str, int] = OrderedDict()
+
+        # least recently used first
+        for file_path in sorted(self.cache_dir_path.glob("*.json"), key=lambda path: path.stat().st_mtime_ns):
+            self._entries[file_path.stem] = file_path.stat().st_size
+
+        self._size_bytes = sum(self._entries.values())
+
+    @staticmethod
+    def build_key(statement_sha256: str, model_name: str, temperature: float, instructions: str) -> str:
+        instructions_sha256 = hashlib.sha256(instructions.encode()).hexdigest()
+        key_parts = json.dumps([statement_sha256, model_name, temperature, instructions_sha256])
+        return hashlib.sha256(key_parts.encode()).hexdigest()
+
+    def get(self, key: str) -> list[ParsedTransaction] | None:
+        file_path = self._entry_file_path(key)
+
+        with self._lock:
+            if key not in self._entries:
+                self._misses += 1
+                return None
+
+            try:
+                cached_parse = CachedParse.model_validate_json(file_path.read_bytes())
+            except (FileNotFoundError, ValidationError):
+                # removed or damaged outside the service, so drop it and parse again
+                self._remove(key)
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            os.utime(file_path)
+            self._hits += 1
+            self._saved_model_seconds += cached_parse.model_seconds
+
+        return cached_parse.transactions
+
+    def put(self, key: str, transactions: list[ParsedTransaction], model_seconds: float) -> None:
+        file_bytes = CachedParse(transactions=transactions, model_seconds=model_seconds).model_dump_json().encode()
+
+        if len(file_bytes) > self.max_bytes:
+            return
+
+        file_path = self._entry_file_path(key)
+
+        with self._lock:
+            self.cache_dir_path.mkdir(parents=True, exist_ok=True)
+            tmp_file_path = file_path.with_name(f".{file_path.name}.tmp")
+            tmp_file_path.write_bytes(file_bytes)
+            os.replace(tmp_file_path, file_path)
+
+            self._size_bytes += len(file_bytes) - self._entries.pop(key, 0)
+            self._entries[key] = len(file_bytes)
+
+            while self._size_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    @property
+    def stats(self) -> ParseCacheStats:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return ParseCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                hit_rate=self._hits / lookups if lookups else 0.0,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                size_bytes=self._size_bytes,
+                max_bytes=self.max_bytes,
+                saved_model_seconds=self._saved_model_seconds,
+            )
+
+    def _remove(self, key: str) -> None:
+        self._size_bytes -= self._entries.pop(key)
+        self._entry_file_path(key).unlink(missing_ok=True)
+
+    def _entry_file_path(self, key: str) -> Path:
+        return self.cache_dir_path / f"{key}.json"
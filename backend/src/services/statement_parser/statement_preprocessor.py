@@ -0,0 +1,123 @@
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from io import BytesIO
+
+from loguru import logger
+from pypdf import PdfReader
+
+PDF_SIGNATURE = b"%PDF"
+
+# lines at the top and bottom of each page that are checked for headers and footers repeated across pages
+HEADER_FOOTER_LINES = 3
+
+# rough characters-per-token ratio for the model's tokenizer on statement text
+CHARS_PER_TOKEN = 4
+
+_PAGE_NUMBER_PATTERN = re.compile(r"^page \d+( of \d+)?$", re.IGNORECASE)
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+class StatementPreprocessorException(Exception):
+    def __init__(self, message: str):
+        super().__init__(message)
+
+
+@dataclass
+class PreprocessedStatement:
+    text: str
+    pages: list[str]
+    page_count: int
+    input_bytes: int
+    estimated_tokens: int
+
+
+def preprocess_statement(statement_bytes: bytes) -> PreprocessedStatement:
+    """
+    Turns an uploaded statement into the compact text sent to the model.
+
+    PDFs have their page text extracted locally, and the text of each page that has any is kept separately as well
+    as joined. Whitespace is collapsed, blank lines and page numbers are dropped,
+    and header and footer lines repeated across pages are kept only where they first appear. Anything without the PDF
+    signature is treated as text; a PDF that cannot be read, or has no text, raises StatementPreprocessorException.
+    """
+
+    pages = _extract_pages(statement_bytes)
+    page_texts = ["\n".join(page) for page in _strip_repeated_headers_and_footers(pages) if page]
+
+    if not page_texts:
+        raise StatementPreprocessorException("No text could be extracted from the statement")
+
+    text = "\n".join(page_texts)
+    preprocessed_statement = PreprocessedStatement(
+        text=text,
+        pages=page_texts,
+        page_count=len(pages),
+        input_bytes=len(statement_bytes),
+        estimated_tokens=estimate_tokens(text),
+    )
+    logger.info(
+        f"Preprocessed statement: {preprocessed_statement.input_bytes} bytes over {preprocessed_statement.page_count} "
+        f"pages to about {preprocessed_statement.estimated_tokens} tokens"
+    )
+    return preprocessed_statement
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _extract_pages(statement_bytes: bytes) -> list[list[str]]:
+    if not statement_bytes.startswith(PDF_SIGNATURE):
+        return [_clean_lines(statement_bytes.decode(errors="replace"))]
+
+    try:
+        reader = PdfReader(BytesIO(statement_bytes))
+        return [_clean_lines(page.extract_text()) for page in reader.pages]
+    except Exception as e:
+        # a damaged PDF can fail anywhere in pypdf, and its raw bytes must never reach the model as text
+        logger.warning(f"Could not read statement as a PDF: {e!r}")
+        raise StatementPreprocessorException("The statement is not a readable PDF")
+
+
+def _clean_lines(page_text: str) -> list[str]:
+    lines = (_WHITESPACE_PATTERN.sub(" ", line).strip() for line in page_text.splitlines())
+    return [line for line in lines if line and not _PAGE_NUMBER_PATTERN.match(line)]
+
+
+def _strip_repeated_headers_and_footers(pages: list[list[str]]) -> list[list[str]]:
+    if len(pages) < 2:
+        return pages
+
+    edge_line_counts = Counter(line for page in pages for line in set(_edge_lines(page)))
+    repeated_lines = {line for line, count in edge_line_counts.items() if count > 1}
+    seen_lines: set[str] = set()
+    stripped_pages = []
+
+    for page in pages:
+        edge_line_indexes = _edge_line_indexes(page)
+        stripped_page = []
+
+        for index, line in enumerate(page):
+            if index in edge_line_indexes and line in repeated_lines:
+                if line in seen_lines:
+                    continue
+
+                seen_lines.add(line)
+
+            stripped_page.append(line)
+
+        stripped_pages.append(stripped_page)
+
+    return stripped_pages
+
+
+def _edge_line_indexes(page: list[str]) -> set[int]:
+    header_line_indexes = range(min(HEADER_FOOTER_LINES, len(page)))
+    footer_line_indexes = range(max(len(page) - HEADER_FOOTER_LINES, 0), len(page))
+    return set(header_line_indexes) | set(footer_line_indexes)
+
+
+def _edge_lines(page: list[str]) -> list[str]:
+    return [page[index] for index in _edge_line_indexes(page)]
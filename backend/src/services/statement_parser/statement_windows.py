@@ -0,0 +1,80 @@
+from src.models import Transaction
+
+# balances are in pounds, so anything under half a penny is rounding
+BALANCE_TOLERANCE = 0.005
+
+
+class StatementStitchingException(Exception):
+    def __init__(self, message: str):
+        super().__init__(message)
+
+
+def build_page_windows(pages: list[str], pages_per_window: int, overlap_lines: int) -> list[str]:
+    """
+    Groups consecutive pages into prompt windows.
+
+    Every window after the first starts with the last overlap_lines lines of the page before it, so a transaction
+    split across a page break is seen whole by at least one window.
+    """
+
+    windows = []
+
+    for start in range(0, len(pages), pages_per_window):
+        window_pages = pages[start:start + pages_per_window]
+
+        if start > 0 and overlap_lines > 0:
+            window_pages = ["\n".join(pages[start - 1].splitlines()[-overlap_lines:]), *window_pages]
+
+        windows.append("\n".join(window_pages))
+
+    return windows
+
+
+def stitch_window_transactions(window_transactions: list[list[Transaction]]) -> list[Transaction]:
+    """
+    Joins the transactions parsed from consecutive windows into one list.
+
+    Transactions parsed twice from the overlap between windows are matched on date, amounts and running balance and
+    kept once. At each join the balance must carry on from the previous transaction, otherwise a transaction was
+    dropped or misread and StatementStitchingException is raised.
+    """
+
+    transactions: list[Transaction] = []
+
+    for window_index, window in enumerate(window_transactions):
+        window = window[_overlap_length(transactions, window):]
+
+        if transactions and window and not _balance_continues(transactions[-1], window[0]):
+            raise StatementStitchingException(
+                f"Balance does not carry on from window {window_index - 1} to window {window_index}"
+            )
+
+        transactions.extend(window)
+
+    return transactions
+
+
+def _overlap_length(transactions: list[Transaction], window: list[Transaction]) -> int:
+    """Returns the length of the longest prefix of window that repeats the end of transactions."""
+
+    for length in range(min(len(transactions), len(window)), 0, -1):
+        if all(
+            _same_transaction(previous, current)
+            for previous, current in zip(transactions[-length:], window[:length])
+        ):
+            return length
+
+    return 0
+
+
+def _same_transaction(first: Transaction, second: Transaction) -> bool:
+    return (
+        first.date == second.date
+        and abs(first.amount_in - second.amount_in) < BALANCE_TOLERANCE
+        and abs(first.amount_out - second.amount_out) < BALANCE_TOLERANCE
+        and abs(first.balance - second.balance) < BALANCE_TOLERANCE
+    )
+
+
+def _balance_continues(previous: Transaction, current: Transaction) -> bool:
+    return abs(previous.balance + current.amount_in - current.amount_out - current.balance) < BALANCE_TOLERANCE
@@ -0,0 +1,380 @@
+from abc import ABC, abstractmethod
+from datetime import date
+from functools import partial
+from itertools import islice
+import time
+from typing import AsyncIterator, BinaryIO, Callable, Iterator, TypeVar
+
+from anyio import CapacityLimiter
+from anyio.to_thread import run_sync
+
+from src.models import Transaction, PartitionManifestEntry, TransactionSummary, TransactionSummaryGroup
+from src.services.metrics.app_metrics import AppMetrics
+from src.services.storage.pagination import TransactionCursor, TransactionPage
+from src.services.storage.storage_service import PartitionKey, StorageService
+
+T = TypeVar("T")
+
+_STREAM_BATCH_SIZE = 500
+
+
+class AsyncStorageService(ABC):
+    @abstractmethod
+    async def store_statement(self, statement_bytes: bytes, bank_name: str, year: int, month: int) -> None:
+        pass
+
+    @abstractmethod
+    async def store_statement_stream(self, statement_stream: BinaryIO, bank_name: str, year: int, month: int) -> str:
+        pass
+
+    @abstractmethod
+    async def get_statement_for_bank_on_date(self, bank_name: str, year: int, month: int) -> str:
+        pass
+
+    @abstractmethod
+    async def get_statement_bytes_for_bank_on_date(self, bank_name: str, year: int, month: int) -> bytes:
+        pass
+
+    @abstractmethod
+    async def store_transactions(
+        self, transactions: list[Transaction], bank_name: str, year: int, month: int
+    ) -> None:
+        pass
+
+    @abstractmethod
+    async def store_many_transactions(self, partitions: dict[PartitionKey, list[Transaction]]) -> None:
+        pass
+
+    @abstractmethod
+    async def get_transactions_for_bank_for_date(self, bank_name: str, year: int, month: int) -> list[Transaction]:
+        pass
+
+    @abstractmethod
+    async def get_all_transactions_for_bank(self, bank_name: str) -> list[Transaction]:
+        pass
+
+    @abstractmethod
+    async def get_all_transactions_for_date(self, year: int, month: int) -> list[Transaction]:
+        pass
+
+    @abstractmethod
+    async def get_all_transactions_for_bank_for_year(self, bank_name: str, year: int) -> list[Transaction]:
+        pass
+
+    @abstractmethod
+    async def get_all_transactions_for_year(self, year: int) -> list[Transaction]:
+        pass
+
+    @abstractmethod
+    async def get_all_transactions(self) -> list[Transaction]:
+        pass
+
+    @abstractmethod
+    async def list_partitions(
+        self, bank_name: str | None = None, year: int | None = None, month: int | None = None
+    ) -> list[PartitionManifestEntry]:
+        pass
+
+    @abstractmethod
+    async def iter_transactions(
+        self,
+        bank_name: str | None = None,
+        year: int | None = None,
+        month: int | None = None,
+        after: TransactionCursor | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> AsyncIterator[Transaction]:
+        """
+        Plans the query, raising StorageServiceNotFoundException for a missing month, and returns an async iterator
+        over the matching transactions in cursor order.
+        """
+        pass
+
+    @abstractmethod
+    async def get_transactions_page(
+        self,
+        limit: int,
+        bank_name: str | None = None,
+        year: int | None = None,
+        month: int | None = None,
+        after: TransactionCursor | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> TransactionPage:
+        pass
+
+    @abstractmethod
+    async def search_transactions(
+        self,
+        query: str,
+        limit: int,
+        bank_name: str | None = None,
+        year: int | None = None,
+        month: int | None = None,
+        after: TransactionCursor | None = None,
+    ) -> TransactionPage:
+        pass
+
+    @abstractmethod
+    async def get_transaction_summary(
+        self,
+        group_by: list[TransactionSummaryGroup],
+        bank_name: str | None = None,
+        year: int | None = None,
+        month: int | None = None,
+    ) -> list[TransactionSummary]:
+        pass
+
+
+class ThreadPoolAsyncStorageService(AsyncStorageService):
+    """
+    Runs a synchronous StorageService on worker threads so blocking file and database I/O stays off the event loop.
+
+    The limiter bounds how many storage calls run at once across every request sharing it. Multi-partition queries
+    run the backend's own get_all_* method in one call, so each backend answers them its fastest way, such as one
+    indexed query in SQLite or one concatenated frame in Parquet.
+
+    With metrics, each call is timed by method and by the number of partitions it read or wrote. For queries over
+    many partitions, the matching partitions are listed in the same thread call, so only timed calls pay for it.
+    """
+
+    def __init__(self, storage_service: StorageService, limiter: CapacityLimiter, metrics: AppMetrics | None = None):
+        self.storage_service = storage_service
+        self.limiter = limiter
+        self.metrics = metrics
+
+    async def store_statement(self, statement_bytes: bytes, bank_name: str, year: int, month: int) -> None:
+        await self._run(
+            partial(
+                self.storage_service.store_statement,
+                statement_bytes=statement_bytes,
+                bank_name=bank_name,
+                year=year,
+                month=month,
+            )
+        )
+
+    async def store_statement_stream(self, statement_stream: BinaryIO, bank_name: str, year: int, month: int) -> str:
+        return await self._run(
+            partial(
+                self.storage_service.store_statement_stream,
+                statement_stream=statement_stream,
+                bank_name=bank_name,
+                year=year,
+                month=month,
+            )
+        )
+
+    async def get_statement_for_bank_on_date(self, bank_name: str, year: int, month: int) -> str:
+        return await self._run(
+            partial(self.storage_service.get_statement_for_bank_on_date, bank_name=bank_name, year=year, month=month)
+        )
+
+    async def get_statement_bytes_for_bank_on_date(self, bank_name: str, year: int, month: int) -> bytes:
+        return await self._run(
+            partial(
+                self.storage_service.get_statement_bytes_for_bank_on_date, bank_name=bank_name, year=year, month=month
+            )
+        )
+
+    async def store_transactions(
+        self, transactions: list[Transaction], bank_name: str, year: int, month: int
+    ) -> None:
+        await self._run(
+            partial(
+                self.storage_service.store_transactions,
+                transactions=transactions,
+                bank_name=bank_name,
+                year=year,
+                month=month,
+            )
+        )
+
+    async def store_many_transactions(self, partitions: dict[PartitionKey, list[Transaction]]) -> None:
+        await self._run(
+            partial(self.storage_service.store_many_transactions, partitions=partitions), partitions=len(partitions)
+        )
+
+    async def get_transactions_for_bank_for_date(self, bank_name: str, year: int, month: int) -> list[Transaction]:
+        return await self._run(
+            partial(
+                self.storage_service.get_transactions_for_bank_for_date, bank_name=bank_name, year=year, month=month
+            )
+        )
+
+    async def get_all_transactions_for_bank(self, bank_name: str) -> list[Transaction]:
+        return await self._run(
+            partial(self.storage_service.get_all_transactions_for_bank, bank_name=bank_name),
+            partitions=self._count_partitions(bank_name=bank_name),
+        )
+
+    async def get_all_transactions_for_date(self, year: int, month: int) -> list[Transaction]:
+        return await self._run(
+            partial(self.storage_service.get_all_transactions_for_date, year=year, month=month),
+            partitions=self._count_partitions(year=year, month=month),
+        )
+
+    async def get_all_transactions_for_bank_for_year(self, bank_name: str, year: int) -> list[Transaction]:
+        return await self._run(
+            partial(self.storage_service.get_all_transactions_for_bank_for_year, bank_name=bank_name, year=year),
+            partitions=self._count_partitions(bank_name=bank_name, year=year),
+        )
+
+    async def get_all_transactions_for_year(self, year: int) -> list[Transaction]:
+        return await self._run(
+            partial(self.storage_service.get_all_transactions_for_year, year=year),
+            partitions=self._count_partitions(year=year),
+        )
+
+    async def get_all_transactions(self) -> list[Transaction]:
+        return await self._run(partial(self.storage_service.get_all_transactions), partitions=self._count_partitions())
+
+    async def list_partitions(
+        self, bank_name: str | None = None, year: int | None = None, month: int | None = None
+    ) -> list[PartitionManifestEntry]:
+        # reads only the partition index, not any partition
+        return await self._run(
+            partial(self.storage_service.list_partitions, bank_name=bank_name, year=year, month=month), partitions=0
+        )
+
+    async def iter_transactions(
+        self,
+        bank_name: str | None = None,
+        year: int | None = None,
+        month: int | None = None,
+        after: TransactionCursor | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> AsyncIterator[Transaction]:
+        transactions, partition_count = await self._run_counting_partitions(
+            partial(
+                self.storage_service.iter_transactions,
+                bank_name=bank_name,
+                year=year,
+                month=month,
+                after=after,
+                start_date=start_date,
+                end_date=end_date,
+            ),
+            partitions=self._count_partitions(bank_name=bank_name, year=year, month=month),
+        )
+        return self._iterate_in_threads(transactions, partition_count)
+
+    async def get_transactions_page(
+        self,
+        limit: int,
+        bank_name: str | None = None,
+        year: int | None = None,
+        month: int | None = None,
+        after: TransactionCursor | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> TransactionPage:
+        return await self._run(
+            partial(
+                self.storage_service.get_transactions_page,
+                limit=limit,
+                bank_name=bank_name,
+                year=year,
+                month=month,
+                after=after,
+                start_date=start_date,
+                end_date=end_date,
+            ),
+            partitions=self._count_partitions(bank_name=bank_name, year=year, month=month),
+        )
+
+    async def search_transactions(
+        self,
+        query: str,
+        limit: int,
+        bank_name: str | None = None,
+        year: int | None = None,
+        month: int | None = None,
+        after: TransactionCursor | None = None,
+    ) -> TransactionPage:
+        return await self._run(
+            partial(
+                self.storage_service.search_transactions,
+                query=query,
+                limit=limit,
+                bank_name=bank_name,
+                year=year,
+                month=month,
+                after=after,
+            ),
+            partitions=self._count_partitions(bank_name=bank_name, year=year, month=month),
+        )
+
+    async def get_transaction_summary(
+        self,
+        group_by: list[TransactionSummaryGroup],
+        bank_name: str | None = None,
+        year: int | None = None,
+        month: int | None = None,
+    ) -> list[TransactionSummary]:
+        return await self._run(
+            partial(
+                self.storage_service.get_transaction_summary,
+                group_by=group_by,
+                bank_name=bank_name,
+                year=year,
+                month=month,
+            ),
+            partitions=self._count_partitions(bank_name=bank_name, year=year, month=month),
+        )
+
+    async def _iterate_in_threads(
+        self, transactions: Iterator[Transaction], partition_count: int
+    ) -> AsyncIterator[Transaction]:
+        # pull batches so the per-thread-hop overhead is paid once per batch rather than once per row
+        while batch := await self._run(
+            partial(_take, transactions, _STREAM_BATCH_SIZE), method="iter_transactions", partitions=partition_count
+        ):
+            for transaction in batch:
+                yield transaction
+
+    def _count_partitions(
+        self, bank_name: str | None = None, year: int | None = None, month: int | None = None
+    ) -> Callable[[], int]:
+        return lambda: len(self.storage_service.list_partitions(bank_name=bank_name, year=year, month=month))
+
+    async def _run(self, function: partial[T], method: str | None = None, partitions: int | Callable[[], int] = 1) -> T:
+        result, _ = await self._run_counting_partitions(function, method=method, partitions=partitions)
+        return result
+
+    async def _run_counting_partitions(
+        self, function: partial[T], method: str | None = None, partitions: int | Callable[[], int] = 1
+    ) -> tuple[T, int]:
+        """
+        Runs the call on a storage thread and, with metrics, times it by the partitions it touched. partitions is the
+        count, or a function counting them that runs on the same thread just before the call.
+        """
+
+        if self.metrics is None:
+            return await run_sync(function, limiter=self.limiter), 0
+
+        partition_count = partitions if isinstance(partitions, int) else None
+
+        def call() -> T:
+            nonlocal partition_count
+
+            # counted before the call so a call that fails is still labelled
+            if partition_count is None:
+                partition_count = partitions()
+
+            return function()
+
+        start = time.perf_counter()
+
+        try:
+            return await run_sync(call, limiter=self.limiter), partition_count
+        finally:
+            self.metrics.record_storage_call(
+                method or function.func.__name__, partition_count or 0, time.perf_counter() - start
+            )
+
+
+def _take(iterator: Iterator[T], count: int) -> list[T]:
+    return list(islice(iterator, count))
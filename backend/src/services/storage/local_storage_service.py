@@ -1,126 +1,393 @@
-import json
+import hashlib
+import os
+import tempfile
+from contextlib import ExitStack
+from datetime import date, datetime, timezone
+from itertools import islice
 from pathlib import Path
+from threading import Lock
+from typing import Any, BinaryIO, Generator, Iterator
 
+import pandas as pd
 from pydantic import ValidationError
+from pydantic_core import from_json
 
-from src.models import Transaction, StoredTransactions
-from src.services.storage.storage_service import StorageService, StorageServiceException, \
-    StorageServiceNotFoundException
+from src.models import Transaction, StoredTransactions, PartitionManifestEntry, PartitionRollup, StoredSearchIndex
+from src.services.storage.partition_cache import PartitionCache
+from src.services.storage.merge import merge_partitions
+from src.services.storage.pagination import TransactionCursor, SortKey
+from src.services.storage.partition_manifest import PartitionManifest
+from src.services.storage.search_index import SearchIndex, build_stored_search_index, parse_search_query
+from src.services.storage.storage_service import PartitionKey, StorageService, StorageServiceException, \
+    StorageServiceNotFoundException, copy_statement_stream
+from src.services.storage.transaction_batch import TransactionBatch
+from src.services.storage.transaction_summary import build_partition_rollup
 
 
 class LocalStorageService(StorageService):
-    def __init__(self, storage_dir_path: Path):
-        self.storage_dir_path = storage_dir_path
+    partition_file_name = "transactions.json"
+    manifest_file_name = "manifest.json"
+    search_index_file_name = "search_index.json"
 
-    def store_statement(self, statement_bytes: bytes, bank_name: str, year: int, month: int) -> None:
+    def __init__(self, storage_dir_path: Path, partition_cache: PartitionCache | None = None):
+        self.storage_dir_path = storage_dir_path
+        self.partition_cache = partition_cache
+        self.manifest = PartitionManifest(storage_dir_path / self.manifest_file_name)
+        self.search_index = SearchIndex()
+        self._manifest_write_lock = Lock()
+        self._partition_locks: dict[PartitionKey, Lock] = {}
+        self._partition_locks_lock = Lock()
+
+    def store_statement_stream(self, statement_stream: BinaryIO, bank_name: str, year: int, month: int) -> str:
         dir_path = self.storage_dir_path / bank_name / str(year) / f"{month:02}"
         dir_path.mkdir(parents=True, exist_ok=True)
         file_path = dir_path / "statement.pdf"
-        file_path.write_bytes(statement_bytes)
 
-    def get_statement_for_bank_on_date(self, bank_name: str, year: int, month: int) -> str:
+        # copy into a uniquely named temporary file so concurrent uploads for the same month cannot interleave
+        tmp_file = tempfile.NamedTemporaryFile(dir=dir_path, prefix=f".{file_path.name}.", suffix=".tmp", delete=False)
+
+        try:
+            with tmp_file:
+                statement_sha256 = copy_statement_stream(statement_stream, tmp_file)
+
+            os.replace(tmp_file.name, file_path)
+        finally:
+            # only left behind if the copy failed
+            Path(tmp_file.name).unlink(missing_ok=True)
+
+        return statement_sha256
+
+    def get_statement_bytes_for_bank_on_date(self, bank_name: str, year: int, month: int) -> bytes:
         file_path = self.storage_dir_path / bank_name / str(year) / f"{month:02}" / "statement.pdf"
 
         try:
-            return file_path.read_text()
+            return file_path.read_bytes()
         except FileNotFoundError:
             raise StorageServiceException(f"Could not find file at path: {file_path}")
 
     def store_transactions(
         self, transactions: list[Transaction], bank_name: str, year: int, month: int
     ) -> None:
-        dir_path = self.storage_dir_path / bank_name / str(year) / f"{month:02}"
-        dir_path.mkdir(parents=True, exist_ok=True)
-        file_path = dir_path / "transactions.json"
-        stored_transactions = StoredTransactions(transactions=transactions)
-
-        with open(file_path, "w") as parsed_file:
-            parsed_file.write(stored_transactions.model_dump_json())
+        self.store_many_transactions({(bank_name, year, month): transactions})
+
+    def store_many_transactions(self, partitions: dict[PartitionKey, list[Transaction]]) -> None:
+        with ExitStack() as stack:
+            # held until the manifest is updated, so the entry recorded for a partition always describes the file that
+            # was swapped in last; taken in sorted order so batches sharing partitions cannot deadlock
+            for partition_key in sorted(partitions):
+                stack.enter_context(self._get_partition_lock(partition_key))
+
+            manifest_entries = [
+                self._write_partition(transactions, bank_name=bank_name, year=year, month=month)
+                for (bank_name, year, month), transactions in partitions.items()
+            ]
+
+            # serialised so a rebuild racing another batch cannot overwrite the entries that batch just added
+            with self._manifest_write_lock:
+                if self.manifest.exists():
+                    self.manifest.upsert_many(manifest_entries)
+                else:
+                    # the first write into a directory created before the manifest existed must index what is there
+                    self.rebuild_manifest()
 
     def get_transactions_for_bank_for_date(self, bank_name: str, year: int, month: int) -> list[Transaction]:
-        file_path = self.storage_dir_path / bank_name / str(year) / f"{month:02}" / "transactions.json"
+        batch = self.get_transaction_batch_for_bank_for_date(bank_name=bank_name, year=year, month=month)
+        return batch.to_transactions()
+
+    def get_transaction_batch_for_bank_for_date(self, bank_name: str, year: int, month: int) -> TransactionBatch:
+        """Reads one partition as a TransactionBatch, which is what the partition cache holds."""
+
+        file_path = self._get_partition_file_path(bank_name, year, month)
 
         try:
-            with open(file_path) as parsed_file:
-                json_data = json.load(parsed_file)
+            # stat before reading so a write landing mid-read leaves a stale entry that fails validation next time
+            stat_result = file_path.stat()
+
+            if self.partition_cache is not None:
+                cached_batch = self.partition_cache.get(file_path, stat_result)
+
+                if cached_batch is not None:
+                    return cached_batch
 
-            stored_transactions = StoredTransactions(**json_data)
-            return stored_transactions.transactions
+            manifest_entry = self.manifest.get(bank_name=bank_name, year=year, month=month)
+            batch = self._decode_partition(file_path, manifest_entry.checksum if manifest_entry is not None else None)
+
+            if self.partition_cache is not None:
+                self.partition_cache.put(file_path, stat_result, batch)
+
+            return batch
         except FileNotFoundError:
             raise StorageServiceNotFoundException(f"Could not find file at path: {file_path}")
         except ValidationError:
             raise StorageServiceException(f"Failed to convert json data into StoredTransactions object")
 
     def get_all_transactions_for_bank(self, bank_name: str) -> list[Transaction]:
-        all_transactions_for_bank: list[Transaction] = []
-        bank_dir_path = self.storage_dir_path / bank_name
+        return self._get_sorted_transactions(bank_name=bank_name)
 
-        for year_dir_path in bank_dir_path.iterdir():
-            year = year_dir_path.name
+    def get_all_transactions_for_date(self, year: int, month: int) -> list[Transaction]:
+        return self._get_sorted_transactions(year=year, month=month)
 
-            for month_dir_path in (bank_dir_path / year).iterdir():
-                month = month_dir_path.name
+    def get_all_transactions_for_bank_for_year(self, bank_name: str, year: int) -> list[Transaction]:
+        return self._get_sorted_transactions(bank_name=bank_name, year=year)
 
-                transactions_for_bank_for_date = self.get_transactions_for_bank_for_date(
-                    bank_name=bank_name, year=int(year), month=int(month)
-                )
-                all_transactions_for_bank.extend(transactions_for_bank_for_date)
+    def get_all_transactions_for_year(self, year: int) -> list[Transaction]:
+        return self._get_sorted_transactions(year=year)
 
-        all_transactions_for_bank.sort(key=lambda t: t.date)
-        return all_transactions_for_bank
+    def get_all_transactions(self) -> list[Transaction]:
+        return self._get_sorted_transactions()
+
+    def list_partitions(
+        self, bank_name: str | None = None, year: int | None = None, month: int | None = None
+    ) -> list[PartitionManifestEntry]:
+        if not self.manifest.exists():
+            self.rebuild_manifest()
+
+        return self.manifest.find(bank_name=bank_name, year=year, month=month)
+
+    def get_transactions_frame(
+        self, bank_name: str | None = None, year: int | None = None, month: int | None = None
+    ) -> pd.DataFrame:
+        return self._read_sorted_batch(bank_name=bank_name, year=year, month=month).to_frame()
+
+    def iter_keyed_transactions(
+        self,
+        bank_name: str | None = None,
+        year: int | None = None,
+        month: int | None = None,
+        after: TransactionCursor | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> Iterator[tuple[SortKey, Transaction]]:
+        partitions = self.list_partitions(bank_name=bank_name, year=year, month=month)
+
+        if month is not None and not partitions:
+            raise StorageServiceNotFoundException(f"Could not find any transactions for date: {year}-{month:02}")
+
+        lower_date = start_date
+
+        if after is not None and (lower_date is None or after.date > lower_date):
+            lower_date = after.date
+
+        # partitions that end before the cursor or start date, or begin after the end date, are never loaded
+        partitions = [
+            partition
+            for partition in partitions
+            if partition.min_date is not None
+            and (lower_date is None or partition.max_date >= lower_date)
+            and (end_date is None or partition.min_date <= end_date)
+        ]
+
+        return merge_partitions(
+            partitions, self._load_partition, after=after, start_date=start_date, end_date=end_date
+        )
+
+    def iter_keyed_search_results(
+        self,
+        query: str,
+        bank_name: str | None = None,
+        year: int | None = None,
+        month: int | None = None,
+        after: TransactionCursor | None = None,
+        limit: int | None = None,
+    ) -> Iterator[tuple[SortKey, Transaction]]:
+        terms = parse_search_query(query)
+        partitions = self.list_partitions(bank_name=bank_name, year=year, month=month)
+
+        if month is not None and not partitions:
+            raise StorageServiceNotFoundException(f"Could not find any transactions for date: {year}-{month:02}")
+
+        if after is not None:
+            partitions = [
+                partition
+                for partition in partitions
+                if partition.max_date is not None and partition.max_date >= after.date
+            ]
+
+        keys = self.search_index.search(terms, partitions, self._load_search_index, after=after)
+        return self._iter_search_results(islice(keys, limit))
+
+    def rebuild_manifest(self) -> list[PartitionManifestEntry]:
+        """Regenerates the partition manifest by scanning every bank/year/month directory on disk."""
+
+        entries: list[PartitionManifestEntry] = []
+
+        for file_path in self.storage_dir_path.glob(f"*/*/*/{self.partition_file_name}"):
+            month_dir_path = file_path.parent
+            year_dir_path = month_dir_path.parent
+            bank_name = year_dir_path.parent.name
+
+            if bank_name.startswith(".") or not year_dir_path.name.isdigit() or not month_dir_path.name.isdigit():
+                continue
+
+            year, month = int(year_dir_path.name), int(month_dir_path.name)
+            file_bytes = file_path.read_bytes()
+            modified_at = _get_modified_at(file_path)
+
+            try:
+                batch = self._decode_partition(file_path)
+                rollup = build_partition_rollup(batch)
+            except ValueError:
+                # a ValidationError is a ValueError too
+                raise StorageServiceException(f"Failed to convert partition data at path: {file_path}")
+
+            entries.append(self._build_manifest_entry(bank_name, year, month, file_bytes, batch, rollup, modified_at))
+
+        self.manifest.replace_all(entries)
+        return self.manifest.find()
+
+    def _get_sorted_transactions(
+        self, bank_name: str | None = None, year: int | None = None, month: int | None = None
+    ) -> list[Transaction]:
+        return self._read_sorted_batch(bank_name=bank_name, year=year, month=month).to_transactions()
+
+    def _read_sorted_batch(
+        self, bank_name: str | None = None, year: int | None = None, month: int | None = None
+    ) -> TransactionBatch:
+        partitions = self.list_partitions(bank_name=bank_name, year=year, month=month)
+
+        if month is not None and not partitions:
+            raise StorageServiceNotFoundException(f"Could not find any transactions for date: {year}-{month:02}")
+
+        batch = TransactionBatch.concat([self._load_partition(partition) for partition in partitions])
+
+        # when the whole result is wanted, one stable sort over the already date-ordered partitions beats draining the
+        # lazy heap merge; partitions come in bank/year/month order, so ties match the merge
+        return batch.sort_by_date()
+
+    def _write_partition(
+        self, transactions: list[Transaction], bank_name: str, year: int, month: int
+    ) -> PartitionManifestEntry:
+        batch = TransactionBatch.from_transactions(transactions)
 
-    def get_all_transactions_for_date(self, year: int, month: int) -> list[Transaction]:
-        all_transactions_for_date: list[Transaction] = []
+        try:
+            rollup = build_partition_rollup(batch)
+        except ValueError as e:
+            # refused before anything is written, since amounts that cannot be totalled would break every summary
+            raise StorageServiceException(f"Cannot store transactions for {bank_name} {year}-{month:02}: {e}")
 
-        for bank_dir in self.storage_dir_path.iterdir():
-            bank_name = bank_dir.name
-            transactions_for_bank_for_date = self.get_transactions_for_bank_for_date(
-                bank_name=bank_name, year=year, month=month
-            )
-            all_transactions_for_date.extend(transactions_for_bank_for_date)
+        dir_path = self.storage_dir_path / bank_name / str(year) / f"{month:02}"
+        dir_path.mkdir(parents=True, exist_ok=True)
+        file_path = dir_path / self.partition_file_name
+        file_bytes = self._encode_partition(transactions)
 
-        all_transactions_for_date.sort(key=lambda t: t.date)
-        return all_transactions_for_date
+        _replace_file(file_path, file_bytes)
 
-    def get_all_transactions_for_bank_for_year(self, bank_name: str, year: int) -> list[Transaction]:
-        all_transactions_for_bank_for_year: list[Transaction] = []
-        bank_year_dir_path = self.storage_dir_path / bank_name / str(year)
+        if self.partition_cache is not None:
+            self.partition_cache.invalidate(file_path)
 
-        if not bank_year_dir_path.exists():
-            return []
+        manifest_entry = self._build_manifest_entry(
+            bank_name, year, month, file_bytes, batch, rollup, _get_modified_at(file_path)
+        )
+        self._write_search_index(dir_path, build_stored_search_index(batch, manifest_entry.checksum))
+        return manifest_entry
 
-        for month_dir_path in bank_year_dir_path.iterdir():
-            month = month_dir_path.name
+    def _write_search_index(self, dir_path: Path, stored_search_index: StoredSearchIndex) -> None:
+        _replace_file(dir_path / self.search_index_file_name, stored_search_index.model_dump_json().encode())
 
-            transactions_for_bank_for_date = self.get_transactions_for_bank_for_date(
-                bank_name=bank_name, year=year, month=int(month)
-            )
-            all_transactions_for_bank_for_year.extend(transactions_for_bank_for_date)
+    def _load_search_index(self, partition: PartitionManifestEntry) -> StoredSearchIndex:
+        dir_path = self.storage_dir_path / partition.bank_name / str(partition.year) / f"{partition.month:02}"
 
-        all_transactions_for_bank_for_year.sort(key=lambda t: t.date)
-        return all_transactions_for_bank_for_year
+        try:
+            stored_search_index = StoredSearchIndex.model_validate_json(
+                (dir_path / self.search_index_file_name).read_bytes()
+            )
 
-    def get_all_transactions_for_year(self, year: int) -> list[Transaction]:
-        all_transactions_for_year: list[Transaction] = []
+            if stored_search_index.checksum == partition.checksum:
+                return stored_search_index
+        except (FileNotFoundError, ValidationError):
+            pass
 
-        for bank_dir in self.storage_dir_path.iterdir():
-            bank_name = bank_dir.name
+        # partitions written before indexing existed, or changed outside the service, are indexed on first search
+        stored_search_index = build_stored_search_index(self._load_partition(partition), partition.checksum)
+        self._write_search_index(dir_path, stored_search_index)
+        return stored_search_index
 
-            all_transactions_for_bank_for_year = self.get_all_transactions_for_bank_for_year(
-                bank_name=bank_name, year=year
-            )
-            all_transactions_for_year.extend(all_transactions_for_bank_for_year)
+    def _iter_search_results(self, keys: Iterator[SortKey]) -> Generator[tuple[SortKey, Transaction], Any, None]:
+        partitions: dict[PartitionKey, TransactionBatch] = {}
 
-        all_transactions_for_year.sort(key=lambda t: t.date)
-        return all_transactions_for_year
+        for key in keys:
+            _, bank_name, year, month, position = key
+            partition_key = (bank_name, year, month)
 
-    def get_all_transactions(self) -> list[Transaction]:
-        all_transactions: list[Transaction] = []
+            # only the partitions holding results up to where the caller stops reading are ever loaded
+            if partition_key not in partitions:
+                partitions[partition_key] = self.get_transaction_batch_for_bank_for_date(
+                    bank_name=bank_name, year=year, month=month
+                )
 
-        for bank_dir in self.storage_dir_path.iterdir():
-            bank_name = bank_dir.name
-            transactions_for_bank = self.get_all_transactions_for_bank(bank_name=bank_name)
-            all_transactions.extend(transactions_for_bank)
+            yield key, partitions[partition_key].transaction(position)
+
+    def _load_partition(self, partition: PartitionManifestEntry) -> TransactionBatch:
+        return self.get_transaction_batch_for_bank_for_date(
+            bank_name=partition.bank_name, year=partition.year, month=partition.month
+        )
+
+    def _get_partition_lock(self, partition_key: PartitionKey) -> Lock:
+        with self._partition_locks_lock:
+            return self._partition_locks.setdefault(partition_key, Lock())
+
+    def _get_partition_file_path(self, bank_name: str, year: int, month: int) -> Path:
+        return self.storage_dir_path / bank_name / str(year) / f"{month:02}" / self.partition_file_name
+
+    def _encode_partition(self, transactions: list[Transaction]) -> bytes:
+        return StoredTransactions(transactions=transactions).model_dump_json().encode()
+
+    def _decode_partition(self, file_path: Path, checksum: str | None = None) -> TransactionBatch:
+        """
+        Decodes a partition file, validating it in a single pass over its bytes unless they match the given manifest
+        checksum. The manifest only records checksums of content this service wrote from validated transactions or
+        validated while rebuilding, so a match means the file can be trusted as is.
+        """
+
+        file_bytes = file_path.read_bytes()
+
+        if checksum is not None and hashlib.sha256(file_bytes).hexdigest() == checksum:
+            return TransactionBatch.from_records(from_json(file_bytes)["transactions"])
+
+        return TransactionBatch.from_transactions(StoredTransactions.model_validate_json(file_bytes).transactions)
+
+    @staticmethod
+    def _build_manifest_entry(
+        bank_name: str,
+        year: int,
+        month: int,
+        file_bytes: bytes,
+        batch: TransactionBatch,
+        rollup: PartitionRollup | None,
+        modified_at: datetime,
+    ) -> PartitionManifestEntry:
+        return PartitionManifestEntry(
+            bank_name=bank_name,
+            year=year,
+            month=month,
+            row_count=len(batch),
+            min_date=batch.min_date,
+            max_date=batch.max_date,
+            file_size=len(file_bytes),
+            checksum=hashlib.sha256(file_bytes).hexdigest(),
+            # swapped into the manifest together with the checksum, so the rollup always describes the recorded file
+            rollup=rollup,
+            modified_at=modified_at,
+        )
+
+
+def _replace_file(file_path: Path, content: bytes) -> None:
+    # write to a uniquely named temporary file and swap it in, so concurrent readers never see a partially written file
+    # and concurrent writers never share a temporary file
+    tmp_file = tempfile.NamedTemporaryFile(
+        dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp", delete=False
+    )
+
+    try:
+        with tmp_file:
+            tmp_file.write(content)
+
+        os.replace(tmp_file.name, file_path)
+    finally:
+        # only left behind if the write failed
+        Path(tmp_file.name).unlink(missing_ok=True)
+
+
+def _get_modified_at(file_path: Path) -> datetime:
+    return datetime.fromtimestamp(file_path.stat().st_mtime_ns / 1e9, timezone.utc)
 
-        all_transactions.sort(key=lambda t: t.date)
-        return all_transactions
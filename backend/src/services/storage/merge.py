@@ -0,0 +1,118 @@
+import bisect
+import heapq
+from datetime import date
+from typing import Any, Callable, Generator
+
+import numpy as np
+
+from src.models import PartitionManifestEntry, Transaction
+from src.services.storage.pagination import TransactionCursor, SortKey
+from src.services.storage.transaction_batch import TransactionBatch
+
+KeyedTransaction = tuple[SortKey, Transaction]
+
+
+class _OpenPartition:
+    def __init__(self, partition: PartitionManifestEntry, batch: TransactionBatch, order: list[int], dates: list[int]):
+        self.partition = partition
+        self.batch = batch
+        self.order = order
+        # day ordinals of the rows in merge order, so advancing the heap never touches the batch itself
+        self.dates = dates
+
+
+def merge_partitions(
+    partitions: list[PartitionManifestEntry],
+    load_partition: Callable[[PartitionManifestEntry], TransactionBatch],
+    after: TransactionCursor | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+) -> Generator[KeyedTransaction, Any, None]:
+    """
+    Lazily k-way merges partitions into cursor order (date, bank, year, month, position).
+
+    Partitions are only loaded once the merge reaches their manifest min_date, so memory holds just the partitions
+    whose date ranges overlap the current position. Sort keys are unique, which makes the merge stable: rows sharing
+    a date come out in bank/year/month/position order, exactly like a stable sort over everything.
+
+    Only rows dated between start_date and end_date inclusive are yielded; each partition is cut to that range by
+    bisecting its date order rather than by filtering row by row. Partitions are merged on their date columns, and a
+    Transaction is only built for each row as it is yielded.
+    """
+
+    # rank partitions by bank/year/month so heap entries can tie-break on a small int instead of the full key
+    ranked_partitions = sorted(
+        (partition for partition in partitions if partition.min_date is not None),
+        key=lambda partition: (partition.bank_name, partition.year, partition.month),
+    )
+    pending = sorted(enumerate(ranked_partitions), key=lambda ranked: ranked[1].min_date, reverse=True)
+    heap: list[tuple[int, int, int, _OpenPartition]] = []
+
+    while pending or heap:
+        # a pending partition starting on or before the head's date may still hold a smaller key, so open it first
+        while pending and (not heap or pending[-1][1].min_date.toordinal() <= heap[0][0]):
+            rank, partition = pending.pop()
+            _open_partition(heap, rank, partition, load_partition(partition), after, start_date, end_date)
+
+        if not heap:
+            continue
+
+        _, rank, index, open_partition = heap[0]
+        partition = open_partition.partition
+        position = open_partition.order[index]
+        transaction = open_partition.batch.transaction(position)
+        yield (transaction.date, partition.bank_name, partition.year, partition.month, position), transaction
+
+        index += 1
+
+        if index == len(open_partition.order):
+            heapq.heappop(heap)
+        else:
+            heapq.heapreplace(heap, (open_partition.dates[index], rank, index, open_partition))
+
+
+def _open_partition(
+    heap: list[tuple[int, int, int, _OpenPartition]],
+    rank: int,
+    partition: PartitionManifestEntry,
+    batch: TransactionBatch,
+    after: TransactionCursor | None,
+    start_date: date | None,
+    end_date: date | None,
+) -> None:
+    # statements are normally already in date order, in which case this is a single linear pass
+    order = batch.date_order()
+    dates = batch.dates[order]
+    start, stop = 0, len(order)
+
+    if end_date is not None:
+        stop = int(dates.searchsorted(end_date.toordinal(), side="right"))
+
+    if start_date is not None:
+        start = int(dates.searchsorted(start_date.toordinal(), side="left"))
+
+    if after is not None:
+        start = max(start, _find_after(partition, order, dates, after))
+
+    if start < stop:
+        order, dates = order[:stop].tolist(), dates[:stop].tolist()
+        heapq.heappush(heap, (dates[start], rank, start, _OpenPartition(partition, batch, order, dates)))
+
+
+def _find_after(
+    partition: PartitionManifestEntry, order: np.ndarray, dates: np.ndarray, after: TransactionCursor
+) -> int:
+    # rows on the cursor's date only follow it when their bank/year/month/position is greater than the cursor's
+    ordinal = after.date.toordinal()
+    first, last = int(dates.searchsorted(ordinal, side="left")), int(dates.searchsorted(ordinal, side="right"))
+    partition_key = (partition.bank_name, partition.year, partition.month)
+    after_key = (after.bank_name, after.year, after.month)
+
+    if partition_key < after_key:
+        return last
+
+    if partition_key > after_key:
+        return first
+
+    # a stable sort leaves the positions sharing a date in ascending order
+    return first + bisect.bisect_right(order[first:last].tolist(), after.position)
@@ -0,0 +1,44 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date
+from typing import NamedTuple
+
+from src.models import Transaction
+
+
+# the plain tuple form of a TransactionCursor, which storage yields per row because tuples are much cheaper to build
+SortKey = tuple[date, str, int, int, int]
+
+
+class TransactionCursor(NamedTuple):
+    """
+    Position of a transaction in the global sort order: date, then the bank/year/month partition it is stored in, then
+    its position within that partition. Tuple comparison follows that order, so keyset pagination is `key > cursor`.
+    """
+
+    date: date
+    bank_name: str
+    year: int
+    month: int
+    position: int
+
+    def encode(self) -> str:
+        payload = [self.date.isoformat(), self.bank_name, self.year, self.month, self.position]
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    @classmethod
+    def decode(cls, cursor: str) -> "TransactionCursor":
+        """Raises ValueError if the cursor was not produced by encode."""
+
+        try:
+            cursor_date, bank_name, year, month, position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return cls(date.fromisoformat(cursor_date), str(bank_name), int(year), int(month), int(position))
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+@dataclass
+class TransactionPage:
+    transactions: list[Transaction]
+    next_cursor: TransactionCursor | None
@@ -0,0 +1,115 @@
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.models import Transaction, PartitionManifestEntry
+from src.services.storage.local_storage_service import LocalStorageService
+from src.services.storage.storage_service import StorageServiceException, StorageServiceNotFoundException
+from src.services.storage.transaction_batch import TransactionBatch
+
+# amounts are stored as whole pence so they round-trip exactly and compress well
+PARTITION_SCHEMA = pa.schema(
+    [
+        pa.field("bank_name", pa.dictionary(pa.int32(), pa.string()), nullable=False),
+        pa.field("date", pa.date32(), nullable=False),
+        pa.field("description", pa.dictionary(pa.int32(), pa.string()), nullable=False),
+        pa.field("amount_in", pa.int64(), nullable=False),
+        pa.field("amount_out", pa.int64(), nullable=False),
+        pa.field("balance", pa.int64(), nullable=False),
+    ]
+)
+
+
+class ParquetStorageService(LocalStorageService):
+    """
+    Columnar variant of LocalStorageService that keeps each bank/year/month partition as a compressed Parquet file.
+
+    Multi-partition queries read every partition into a frame, concatenate them and sort once, and only build
+    Transaction objects from the final columns without re-validating them.
+    """
+
+    partition_file_name = "transactions.parquet"
+    manifest_file_name = "parquet_manifest.json"
+    search_index_file_name = "parquet_search_index.json"
+
+    def get_transactions_frame(
+        self, bank_name: str | None = None, year: int | None = None, month: int | None = None
+    ) -> pd.DataFrame:
+        """Returns the matching transactions as one date-ordered frame with amounts in pence."""
+
+        return self._read_partitions_frame(self.list_partitions(bank_name=bank_name, year=year, month=month))
+
+    def get_all_transactions_for_bank(self, bank_name: str) -> list[Transaction]:
+        return self._frame_to_transactions(self.get_transactions_frame(bank_name=bank_name))
+
+    def get_all_transactions_for_date(self, year: int, month: int) -> list[Transaction]:
+        partitions = self.list_partitions(year=year, month=month)
+
+        if not partitions:
+            raise StorageServiceNotFoundException(f"Could not find any transactions for date: {year}-{month:02}")
+
+        return self._frame_to_transactions(self._read_partitions_frame(partitions))
+
+    def get_all_transactions_for_bank_for_year(self, bank_name: str, year: int) -> list[Transaction]:
+        return self._frame_to_transactions(self.get_transactions_frame(bank_name=bank_name, year=year))
+
+    def get_all_transactions_for_year(self, year: int) -> list[Transaction]:
+        return self._frame_to_transactions(self.get_transactions_frame(year=year))
+
+    def get_all_transactions(self) -> list[Transaction]:
+        return self._frame_to_transactions(self.get_transactions_frame())
+
+    def _encode_partition(self, transactions: list[Transaction]) -> bytes:
+        table = pa.table(
+            {
+                "bank_name": [transaction.bank_name for transaction in transactions],
+                "date": [transaction.date for transaction in transactions],
+                "description": [transaction.description for transaction in transactions],
+                "amount_in": [round(transaction.amount_in * 100) for transaction in transactions],
+                "amount_out": [round(transaction.amount_out * 100) for transaction in transactions],
+                "balance": [round(transaction.balance * 100) for transaction in transactions],
+            },
+            schema=PARTITION_SCHEMA,
+        )
+        sink = pa.BufferOutputStream()
+        pq.write_table(table, sink, compression="zstd")
+        return sink.getvalue().to_pybytes()
+
+    def _decode_partition(self, file_path: Path, checksum: str | None = None) -> TransactionBatch:
+        # the file schema already types every column, so there is nothing to validate either way
+        return TransactionBatch.from_frame(self._read_frame(file_path))
+
+    def _read_partitions_frame(self, partitions: list[PartitionManifestEntry]) -> pd.DataFrame:
+        frames = []
+
+        for partition in partitions:
+            file_path = self._get_partition_file_path(partition.bank_name, partition.year, partition.month)
+
+            try:
+                frames.append(self._read_frame(file_path))
+            except FileNotFoundError:
+                # the manifest still lists a partition whose file was deleted, reported like any other missing file
+                raise StorageServiceNotFoundException(f"Could not find file at path: {file_path}")
+
+        if not frames:
+            return PARTITION_SCHEMA.empty_table().to_pandas(types_mapper=pd.ArrowDtype)
+
+        # stable, so rows sharing a date keep their partition order just like the other backends
+        frame = pd.concat(frames, ignore_index=True)
+        return frame.sort_values("date", kind="stable", ignore_index=True)
+
+    @staticmethod
+    def _read_frame(file_path: Path) -> pd.DataFrame:
+        try:
+            return pd.read_parquet(file_path, engine="pyarrow", dtype_backend="pyarrow")
+        except FileNotFoundError:
+            raise
+        except (pa.ArrowException, OSError):
+            raise StorageServiceException(f"Failed to read parquet partition at path: {file_path}")
+
+    @staticmethod
+    def _frame_to_transactions(frame: pd.DataFrame) -> list[Transaction]:
+        # values come straight from the typed file schema, so they go into a batch without per-row validation
+        return TransactionBatch.from_frame(frame).to_transactions()
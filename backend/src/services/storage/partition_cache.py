@@ -0,0 +1,87 @@
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+
+from src.services.storage.transaction_batch import TransactionBatch
+
+
+@dataclass
+class PartitionCacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    max_entries: int
+
+
+@dataclass
+class _PartitionCacheEntry:
+    mtime_ns: int
+    size: int
+    batch: TransactionBatch
+
+
+class PartitionCache:
+    """
+    Size-bounded LRU cache of decoded partitions, held as compact TransactionBatch columns.
+
+    Entries are keyed by file path and are only returned while the file's mtime and size still match the values
+    recorded when it was read, so files changed outside the service are picked up on the next read.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Path, _PartitionCacheEntry] = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, file_path: Path, stat_result: os.stat_result) -> TransactionBatch | None:
+        with self._lock:
+            entry = self._entries.get(file_path)
+
+            if entry is None or entry.mtime_ns != stat_result.st_mtime_ns or entry.size != stat_result.st_size:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(file_path)
+            self._hits += 1
+
+        # batches are read-only, so the cached one can be shared without copying
+        return entry.batch
+
+    def put(self, file_path: Path, stat_result: os.stat_result, batch: TransactionBatch) -> None:
+        if self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[file_path] = _PartitionCacheEntry(
+                mtime_ns=stat_result.st_mtime_ns, size=stat_result.st_size, batch=batch
+            )
+            self._entries.move_to_end(file_path)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, file_path: Path) -> None:
+        with self._lock:
+            self._entries.pop(file_path, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def stats(self) -> PartitionCacheStats:
+        with self._lock:
+            return PartitionCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._entries),
+                max_entries=self.max_entries,
+            )
@@ -0,0 +1,90 @@
+import os
+from pathlib import Path
+from threading import RLock
+
+from pydantic import ValidationError
+
+from src.models import PartitionManifestEntry, StoredPartitionManifest
+from src.services.storage.storage_service import PartitionKey, StorageServiceException
+
+
+class PartitionManifest:
+    """
+    Persisted index of the partitions held in a storage directory.
+
+    Queries are planned from the manifest alone, so reads never walk the bank/year/month directory tree. The parsed
+    manifest is kept in memory and reloaded whenever the file on disk changes.
+    """
+
+    def __init__(self, manifest_file_path: Path):
+        self.manifest_file_path = manifest_file_path
+        self._entries: dict[PartitionKey, PartitionManifestEntry] = {}
+        self._mtime_ns: int | None = None
+        self._lock = RLock()
+
+    def exists(self) -> bool:
+        return self.manifest_file_path.is_file()
+
+    def find(
+        self, bank_name: str | None = None, year: int | None = None, month: int | None = None
+    ) -> list[PartitionManifestEntry]:
+        """Returns the matching partitions ordered by bank, year and month. None matches any value."""
+
+        with self._lock:
+            entries = self._load()
+
+        return [
+            entry
+            for key, entry in sorted(entries.items())
+            if (bank_name is None or entry.bank_name == bank_name)
+            and (year is None or entry.year == year)
+            and (month is None or entry.month == month)
+        ]
+
+    def get(self, bank_name: str, year: int, month: int) -> PartitionManifestEntry | None:
+        with self._lock:
+            return self._load().get((bank_name, year, month))
+
+    def upsert(self, entry: PartitionManifestEntry) -> None:
+        self.upsert_many([entry])
+
+    def upsert_many(self, entries: list[PartitionManifestEntry]) -> None:
+        with self._lock:
+            updated_entries = dict(self._load())
+            updated_entries.update({(entry.bank_name, entry.year, entry.month): entry for entry in entries})
+            self._write(updated_entries)
+
+    def replace_all(self, entries: list[PartitionManifestEntry]) -> None:
+        with self._lock:
+            self._write({(entry.bank_name, entry.year, entry.month): entry for entry in entries})
+
+    def _load(self) -> dict[PartitionKey, PartitionManifestEntry]:
+        try:
+            mtime_ns = self.manifest_file_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._entries, self._mtime_ns = {}, None
+            return self._entries
+
+        if mtime_ns == self._mtime_ns:
+            return self._entries
+
+        try:
+            stored_manifest = StoredPartitionManifest.model_validate_json(self.manifest_file_path.read_bytes())
+        except ValidationError:
+            raise StorageServiceException(f"Failed to read partition manifest at path: {self.manifest_file_path}")
+
+        self._entries = {(entry.bank_name, entry.year, entry.month): entry for entry in stored_manifest.partitions}
+        self._mtime_ns = mtime_ns
+        return self._entries
+
+    def _write(self, entries: dict[PartitionKey, PartitionManifestEntry]) -> None:
+        stored_manifest = StoredPartitionManifest(partitions=[entry for _, entry in sorted(entries.items())])
+        self.manifest_file_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # write to a temporary file and swap it in so readers never see a partially written manifest
+        tmp_file_path = self.manifest_file_path.with_name(f".{self.manifest_file_path.name}.tmp")
+        tmp_file_path.write_text(stored_manifest.model_dump_json())
+        os.replace(tmp_file_path, self.manifest_file_path)
+
+        self._entries = entries
+        self._mtime_ns = self.manifest_file_path.stat().st_mtime_ns
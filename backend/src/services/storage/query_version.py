@@ -0,0 +1,34 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+
+from src.models import PartitionManifestEntry
+
+
+@dataclass(frozen=True)
+class QueryVersion:
+    etag: str
+    last_modified: datetime | None
+
+
+def build_query_version(partitions: list[PartitionManifestEntry]) -> QueryVersion:
+    """
+    Versions a query from the manifest entries of the partitions it reads, without reading any of their rows.
+
+    The tag covers each partition's key, checksum and modification time, so it changes whenever one of them is
+    written, even with identical contents, or a partition is added to the query. last_modified is the latest
+    modification time, or None when any partition predates recorded modification times.
+    """
+
+    digest = hashlib.sha256()
+
+    for partition in partitions:
+        modified_at = partition.modified_at.isoformat() if partition.modified_at is not None else ""
+        digest.update(
+            f"{partition.bank_name}/{partition.year}/{partition.month}:{partition.checksum}:{modified_at}\n".encode()
+        )
+
+    modified_times = [partition.modified_at for partition in partitions]
+    last_modified = max(modified_times) if modified_times and None not in modified_times else None
+
+    return QueryVersion(etag=digest.hexdigest()[:32], last_modified=last_modified)
@@ -0,0 +1,174 @@
+import bisect
+import heapq
+import re
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Generator
+
+from src.models import PartitionManifestEntry, StoredSearchIndex
+from src.services.storage.pagination import SortKey, TransactionCursor
+from src.services.storage.storage_service import PartitionKey
+from src.services.storage.transaction_batch import TransactionBatch
+
+# runs of letters and digits, matching how most tokenizers split "NETFLIX.COM 12/01" into netflix, com, 12 and 01
+_TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+
+@dataclass(frozen=True)
+class SearchTerm:
+    token: str
+    prefix: bool
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def parse_search_query(query: str) -> list[SearchTerm]:
+    """
+    Splits a query into terms that must all match. A word ending in * matches any token starting with it, so "net*"
+    matches both netflix and netto. Raises ValueError for a query without any terms.
+    """
+
+    terms: list[SearchTerm] = []
+
+    for word in query.split():
+        tokens = tokenize(word)
+
+        if tokens:
+            terms.extend(SearchTerm(token=token, prefix=False) for token in tokens[:-1])
+            terms.append(SearchTerm(token=tokens[-1], prefix=word.endswith("*")))
+
+    if not terms:
+        raise ValueError(f"Search query has no terms: {query!r}")
+
+    return terms
+
+
+def build_stored_search_index(batch: TransactionBatch, checksum: str) -> StoredSearchIndex:
+    tokens: dict[str, list[int]] = {}
+
+    for position, description in enumerate(batch.descriptions.tolist()):
+        for token in dict.fromkeys(tokenize(description)):
+            tokens.setdefault(token, []).append(position)
+
+    return StoredSearchIndex(checksum=checksum, dates=batch.to_dates(), tokens=tokens)
+
+
+class _PartitionSearchIndex:
+    def __init__(self, stored_search_index: StoredSearchIndex):
+        self.checksum = stored_search_index.checksum
+        self.dates = stored_search_index.dates
+        self.tokens = stored_search_index.tokens
+        self.vocabulary = sorted(self.tokens)
+
+    def match(self, terms: list[SearchTerm]) -> set[int]:
+        matched_positions: set[int] | None = None
+
+        for term in terms:
+            if term.prefix:
+                positions: set[int] = set()
+
+                for token in self.vocabulary[bisect.bisect_left(self.vocabulary, term.token):]:
+                    if not token.startswith(term.token):
+                        break
+
+                    positions.update(self.tokens[token])
+            else:
+                positions = set(self.tokens.get(term.token, ()))
+
+            matched_positions = positions if matched_positions is None else matched_positions & positions
+
+            if not matched_positions:
+                return set()
+
+        return matched_positions or set()
+
+
+class SearchIndex:
+    """
+    In-memory inverted index over transaction descriptions, held per partition.
+
+    Each partition's index is loaded once and only reloaded when the manifest checksum of the partition changes, so a
+    write re-indexes just the partition it replaced and queries never touch the partition files themselves.
+    """
+
+    def __init__(self):
+        self._partitions: dict[PartitionKey, _PartitionSearchIndex] = {}
+        self._lock = Lock()
+
+    def search(
+        self,
+        terms: list[SearchTerm],
+        partitions: list[PartitionManifestEntry],
+        load_partition_index: Callable[[PartitionManifestEntry], StoredSearchIndex],
+        after: TransactionCursor | None = None,
+    ) -> Generator[SortKey, Any, None]:
+        """
+        Lazily yields the sort keys of the matching transactions in the given partitions, in cursor order.
+
+        Like merge_partitions, a partition is only matched once the merge reaches its manifest min_date, so reading the
+        first page of results only touches the partitions it spans.
+        """
+
+        pending = sorted(
+            (partition for partition in partitions if partition.min_date is not None),
+            key=lambda partition: partition.min_date,
+            reverse=True,
+        )
+        heap: list[tuple[SortKey, int, list[SortKey]]] = []
+
+        while pending or heap:
+            while pending and (not heap or pending[-1].min_date <= heap[0][0][0]):
+                keys = self._match_partition(terms, pending.pop(), load_partition_index, after)
+
+                if keys:
+                    # keys are unique across partitions, so the heap never compares the lists
+                    heapq.heappush(heap, (keys[0], 0, keys))
+
+            if not heap:
+                continue
+
+            key, index, keys = heap[0]
+            yield key
+
+            if index + 1 == len(keys):
+                heapq.heappop(heap)
+            else:
+                heapq.heapreplace(heap, (keys[index + 1], index + 1, keys))
+
+    def _match_partition(
+        self,
+        terms: list[SearchTerm],
+        partition: PartitionManifestEntry,
+        load_partition_index: Callable[[PartitionManifestEntry], StoredSearchIndex],
+        after: TransactionCursor | None,
+    ) -> list[SortKey]:
+        partition_index = self._get_partition_index(partition, load_partition_index)
+        keys = sorted(
+            (partition_index.dates[position], partition.bank_name, partition.year, partition.month, position)
+            for position in partition_index.match(terms)
+        )
+
+        if after is not None:
+            return keys[bisect.bisect_right(keys, after):]
+
+        return keys
+
+    def _get_partition_index(
+        self,
+        partition: PartitionManifestEntry,
+        load_partition_index: Callable[[PartitionManifestEntry], StoredSearchIndex],
+    ) -> _PartitionSearchIndex:
+        key = (partition.bank_name, partition.year, partition.month)
+
+        with self._lock:
+            partition_index = self._partitions.get(key)
+
+        if partition_index is None or partition_index.checksum != partition.checksum:
+            partition_index = _PartitionSearchIndex(load_partition_index(partition))
+
+            with self._lock:
+                self._partitions[key] = partition_index
+
+        return partition_index
@@ -0,0 +1,568 @@
+import hashlib
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from pathlib import Path
+from queue import Empty, Queue
+from typing import Any, BinaryIO, Callable, Generator, Iterable, Iterator
+
+import pandas as pd
+
+from src.models import Transaction, StoredTransactions, PartitionManifestEntry, PartitionRollup
+from src.services.storage.pagination import TransactionCursor, SortKey
+from src.services.storage.search_index import SearchTerm, parse_search_query, tokenize
+from src.services.storage.storage_service import PartitionKey, StorageService, StorageServiceException, \
+    StorageServiceNotFoundException, STATEMENT_CHUNK_SIZE, copy_statement_stream
+from src.services.storage.transaction_batch import TransactionBatch
+from src.services.storage.transaction_summary import build_partition_rollup
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS statements (
+    bank_name TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    statement BLOB NOT NULL,
+    PRIMARY KEY (bank_name, year, month)
+);
+
+CREATE TABLE IF NOT EXISTS partitions (
+    bank_name TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    row_count INTEGER NOT NULL,
+    min_date TEXT,
+    max_date TEXT,
+    content_size INTEGER NOT NULL,
+    checksum TEXT NOT NULL,
+    PRIMARY KEY (bank_name, year, month)
+);
+
+CREATE TABLE IF NOT EXISTS partition_rollups (
+    bank_name TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    transaction_bank_name TEXT NOT NULL,
+    money_in INTEGER NOT NULL,
+    money_out INTEGER NOT NULL,
+    opening_balance INTEGER NOT NULL,
+    closing_balance INTEGER NOT NULL,
+    PRIMARY KEY (bank_name, year, month)
+);
+
+CREATE TABLE IF NOT EXISTS partition_modifications (
+    bank_name TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    modified_at TEXT NOT NULL,
+    PRIMARY KEY (bank_name, year, month)
+);
+
+CREATE TABLE IF NOT EXISTS transactions (
+    bank_name TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    transaction_bank_name TEXT NOT NULL,
+    date TEXT NOT NULL,
+    description TEXT NOT NULL,
+    amount_in REAL NOT NULL,
+    amount_out REAL NOT NULL,
+    balance REAL NOT NULL,
+    PRIMARY KEY (bank_name, year, month, position)
+);
+
+CREATE TABLE IF NOT EXISTS search_tokens (
+    token TEXT NOT NULL,
+    date TEXT NOT NULL,
+    bank_name TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (token, date, bank_name, year, month, position)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_search_tokens_row ON search_tokens (bank_name, year, month, position, token);
+CREATE INDEX IF NOT EXISTS idx_transactions_bank_name_date ON transactions (bank_name, date);
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date);
+CREATE INDEX IF NOT EXISTS idx_transactions_year_month_date ON transactions (year, month, date);
+"""
+
+# bank_name is the partition the row was stored under, transaction_bank_name is the name the model reported
+_SELECT_TRANSACTIONS = """
+SELECT transaction_bank_name, date, description, amount_in, amount_out, balance
+FROM transactions
+"""
+
+_SELECT_KEYED_TRANSACTIONS = """
+SELECT date, bank_name, year, month, position,
+    transaction_bank_name, date, description, amount_in, amount_out, balance
+FROM transactions
+"""
+
+# amounts come out in whole pence, like the parquet partition schema
+_SELECT_TRANSACTIONS_FRAME = """
+SELECT transaction_bank_name AS bank_name, date, description,
+    CAST(ROUND(amount_in * 100) AS INTEGER) AS amount_in,
+    CAST(ROUND(amount_out * 100) AS INTEGER) AS amount_out,
+    CAST(ROUND(balance * 100) AS INTEGER) AS balance
+FROM transactions
+"""
+
+_ORDER_BY = "ORDER BY date, bank_name, year, month, position"
+
+_SEARCH_KEY_COLUMNS = "date, bank_name, year, month, position"
+
+_SELECT_SEARCH_TOKEN_SOURCE = f"SELECT {_SEARCH_KEY_COLUMNS}, description FROM transactions"
+
+# search_tokens is keyed by token and then cursor order, so one token's matches are read off the key already in order,
+# and only the page of matches that is returned is joined to its transactions
+_SELECT_SEARCH_RESULTS = """
+SELECT date, bank_name, year, month, position, transaction_bank_name, date, description, amount_in, amount_out, balance
+FROM (
+    SELECT {distinct} search_tokens.date, search_tokens.bank_name, search_tokens.year, search_tokens.month,
+        search_tokens.position
+    FROM search_tokens {where}
+    ORDER BY 1, 2, 3, 4, 5 {limit}
+) AS matches JOIN transactions USING (date, bank_name, year, month, position)
+ORDER BY date, bank_name, year, month, position
+"""
+
+_FETCH_SIZE = 1000
+
+_PARTITION_FIELDS = ["bank_name", "year", "month", "row_count", "min_date", "max_date", "file_size", "checksum"]
+
+_ROLLUP_FIELDS = ["bank_name", "money_in", "money_out", "opening_balance", "closing_balance"]
+
+
+def _row_to_transaction(row: tuple) -> Transaction:
+    transaction_bank_name, transaction_date, description, amount_in, amount_out, balance = row
+
+    return Transaction(
+        bank_name=transaction_bank_name,
+        date=date.fromisoformat(transaction_date),
+        description=description,
+        amount_in=amount_in,
+        amount_out=amount_out,
+        balance=balance,
+    )
+
+
+def _build_where(
+    bank_name: str | None,
+    year: int | None,
+    month: int | None,
+    after: TransactionCursor | None = None,
+    conditions: tuple[str, ...] = (),
+    parameters: tuple = (),
+) -> tuple[str, tuple]:
+    filters = {"bank_name": bank_name, "year": year, "month": month}
+    conditions += tuple(f"{column} = ?" for column, value in filters.items() if value is not None)
+    parameters += tuple(value for value in filters.values() if value is not None)
+
+    if after is not None:
+        conditions += ("(date, bank_name, year, month, position) > (?, ?, ?, ?, ?)",)
+        parameters += (after.date.isoformat(), after.bank_name, after.year, after.month, after.position)
+
+    return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), parameters
+
+
+def _build_date_range(start_date: date | None, end_date: date | None) -> tuple[tuple[str, ...], tuple]:
+    # dates are stored as ISO strings, which sort in date order and are read off idx_transactions_date
+    bounds = {"date >= ?": start_date, "date <= ?": end_date}
+    return (
+        tuple(condition for condition, bound in bounds.items() if bound is not None),
+        tuple(bound.isoformat() for bound in bounds.values() if bound is not None),
+    )
+
+
+def _build_search_query(
+    terms: list[SearchTerm],
+    bank_name: str | None,
+    year: int | None,
+    month: int | None,
+    after: TransactionCursor | None,
+    limit: int | None,
+) -> tuple[str, tuple]:
+    # an exact term reads its matches straight off the primary key in cursor order, so it drives the query when there
+    # is one, taking the longest as the likeliest to be rare; the other terms are point lookups per match
+    driving_term = max(terms, key=lambda term: (not term.prefix, len(term.token)))
+    other_terms = [term for term in terms if term is not driving_term]
+
+    conditions, parameters = _search_term_condition("search_tokens", driving_term)
+
+    for term in other_terms:
+        term_condition, term_parameters = _search_term_condition("other", term)
+        conditions += (
+            "EXISTS (SELECT 1 FROM search_tokens AS other WHERE other.bank_name = search_tokens.bank_name "
+            "AND other.year = search_tokens.year AND other.month = search_tokens.month "
+            f"AND other.position = search_tokens.position AND {' AND '.join(term_condition)})",
+        )
+        parameters += term_parameters
+
+    where, parameters = _build_where(bank_name, year, month, after, conditions, parameters)
+
+    # a prefix matching several tokens of one description would otherwise return it once per token
+    distinct = "DISTINCT" if driving_term.prefix else ""
+
+    if limit is not None:
+        return _SELECT_SEARCH_RESULTS.format(distinct=distinct, where=where, limit="LIMIT ?"), parameters + (limit,)
+
+    return _SELECT_SEARCH_RESULTS.format(distinct=distinct, where=where, limit=""), parameters
+
+
+def _search_term_condition(table: str, term: SearchTerm) -> tuple[tuple[str, ...], tuple]:
+    if term.prefix:
+        # every token starting with the prefix sorts between it and the prefix followed by the highest code point
+        return (f"{table}.token >= ?", f"{table}.token < ?"), (term.token, f"{term.token}\U0010ffff")
+
+    return (f"{table}.token = ?",), (term.token,)
+
+
+class _SqliteConnectionPool:
+    def __init__(self, db_file_path: Path, pool_size: int, timeout_seconds: float):
+        self._connections: Queue[sqlite3.Connection] = Queue(maxsize=pool_size)
+        self.timeout_seconds = timeout_seconds
+
+        for _ in range(pool_size):
+            connection = sqlite3.connect(db_file_path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._connections.put(connection)
+
+    @contextmanager
+    def connection(self) -> Generator[sqlite3.Connection, Any, None]:
+        # bounded, so a pool held by stuck callers fails requests instead of blocking their threads for ever
+        try:
+            connection = self._connections.get(timeout=self.timeout_seconds)
+        except Empty:
+            raise StorageServiceException(
+                f"Timed out after {self.timeout_seconds}s waiting for a database connection"
+            )
+
+        try:
+            yield connection
+        finally:
+            self._connections.put(connection)
+
+    def close(self) -> None:
+        while not self._connections.empty():
+            self._connections.get_nowait().close()
+
+
+class SqliteStorageService(StorageService):
+    def __init__(self, db_file_path: Path, pool_size: int = 4, pool_timeout_seconds: float = 30):
+        self.db_file_path = db_file_path
+        self.db_file_path.parent.mkdir(parents=True, exist_ok=True)
+        self._pool = _SqliteConnectionPool(db_file_path, pool_size, pool_timeout_seconds)
+
+        with self._pool.connection() as connection:
+            search_tokens_exist = connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_tokens'"
+            ).fetchone()
+            connection.executescript(_SCHEMA)
+
+            if search_tokens_exist is None:
+                # databases created before search existed index their stored transactions once
+                with connection:
+                    self._index_search_tokens(connection, connection.execute(_SELECT_SEARCH_TOKEN_SOURCE))
+
+    def close(self) -> None:
+        self._pool.close()
+
+    def store_statement_stream(self, statement_stream: BinaryIO, bank_name: str, year: int, month: int) -> str:
+        # spool to disk first, since the blob has to be sized before it can be written in chunks
+        with tempfile.TemporaryFile() as spool_file:
+            statement_sha256 = copy_statement_stream(statement_stream, spool_file)
+            statement_size = spool_file.tell()
+            spool_file.seek(0)
+
+            with self._pool.connection() as connection, connection:
+                cursor = connection.execute(
+                    "INSERT OR REPLACE INTO statements (bank_name, year, month, statement) "
+                    "VALUES (?, ?, ?, zeroblob(?))",
+                    (bank_name, year, month, statement_size),
+                )
+
+                with connection.blobopen("statements", "statement", cursor.lastrowid) as blob:
+                    while chunk := spool_file.read(STATEMENT_CHUNK_SIZE):
+                        blob.write(chunk)
+
+        return statement_sha256
+
+    def get_statement_bytes_for_bank_on_date(self, bank_name: str, year: int, month: int) -> bytes:
+        with self._pool.connection() as connection:
+            row = connection.execute(
+                "SELECT statement FROM statements WHERE bank_name = ? AND year = ? AND month = ?",
+                (bank_name, year, month),
+            ).fetchone()
+
+        if row is None:
+            raise StorageServiceException(f"Could not find statement for {bank_name} {year}-{month:02}")
+
+        return row[0]
+
+    def store_transactions(self, transactions: list[Transaction], bank_name: str, year: int, month: int) -> None:
+        self.store_many_transactions({(bank_name, year, month): transactions})
+
+    def store_many_transactions(self, partitions: dict[PartitionKey, list[Transaction]]) -> None:
+        # replace every partition in one transaction so readers never see a half written month or batch
+        with self._pool.connection() as connection, connection:
+            for (bank_name, year, month), transactions in partitions.items():
+                self._replace_partition(connection, transactions, bank_name=bank_name, year=year, month=month)
+
+    def get_transactions_for_bank_for_date(self, bank_name: str, year: int, month: int) -> list[Transaction]:
+        transactions = self._select(
+            "WHERE bank_name = ? AND year = ? AND month = ? ORDER BY position", (bank_name, year, month)
+        )
+
+        if not transactions and not self._partition_exists(bank_name=bank_name, year=year, month=month):
+            raise StorageServiceNotFoundException(f"Could not find transactions for {bank_name} {year}-{month:02}")
+
+        return transactions
+
+    def get_all_transactions_for_bank(self, bank_name: str) -> list[Transaction]:
+        return self._select(f"WHERE bank_name = ? {_ORDER_BY}", (bank_name,))
+
+    def get_all_transactions_for_date(self, year: int, month: int) -> list[Transaction]:
+        transactions = self._select(f"WHERE year = ? AND month = ? {_ORDER_BY}", (year, month))
+
+        if not transactions and not self._partition_exists(year=year, month=month):
+            raise StorageServiceNotFoundException(f"Could not find any transactions for date: {year}-{month:02}")
+
+        return transactions
+
+    def get_all_transactions_for_bank_for_year(self, bank_name: str, year: int) -> list[Transaction]:
+        return self._select(f"WHERE bank_name = ? AND year = ? {_ORDER_BY}", (bank_name, year))
+
+    def get_all_transactions_for_year(self, year: int) -> list[Transaction]:
+        return self._select(f"WHERE year = ? {_ORDER_BY}", (year,))
+
+    def get_all_transactions(self) -> list[Transaction]:
+        return self._select(_ORDER_BY, ())
+
+    def list_partitions(
+        self, bank_name: str | None = None, year: int | None = None, month: int | None = None
+    ) -> list[PartitionManifestEntry]:
+        where, parameters = _build_where(bank_name=bank_name, year=year, month=month)
+
+        with self._pool.connection() as connection:
+            rows = connection.execute(
+                f"""
+                SELECT bank_name, year, month, row_count, min_date, max_date, content_size, checksum,
+                    transaction_bank_name, money_in, money_out, opening_balance, closing_balance, modified_at
+                FROM partitions
+                    LEFT JOIN partition_rollups USING (bank_name, year, month)
+                    LEFT JOIN partition_modifications USING (bank_name, year, month)
+                {where}
+                ORDER BY bank_name, year, month
+                """,
+                parameters,
+            ).fetchall()
+
+        return [
+            PartitionManifestEntry(
+                **dict(zip(_PARTITION_FIELDS, row[:8])),
+                rollup=PartitionRollup(**dict(zip(_ROLLUP_FIELDS, row[8:13]))) if row[8] is not None else None,
+                modified_at=row[13],
+            )
+            for row in rows
+        ]
+
+    def iter_keyed_transactions(
+        self,
+        bank_name: str | None = None,
+        year: int | None = None,
+        month: int | None = None,
+        after: TransactionCursor | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> Iterator[tuple[SortKey, Transaction]]:
+        date_conditions, date_parameters = _build_date_range(start_date, end_date)
+
+        if month is not None and not self._partition_exists(year=year, month=month, bank_name=bank_name):
+            raise StorageServiceNotFoundException(f"Could not find any transactions for date: {year}-{month:02}")
+
+        def build_page_query(page_after: TransactionCursor | None, page_size: int) -> tuple[str, tuple]:
+            where, parameters = _build_where(
+                bank_name=bank_name,
+                year=year,
+                month=month,
+                after=page_after,
+                conditions=date_conditions,
+                parameters=date_parameters,
+            )
+            return f"{_SELECT_KEYED_TRANSACTIONS} {where} {_ORDER_BY} LIMIT ?", parameters + (page_size,)
+
+        return self._iter_keyed_pages(build_page_query, after)
+
+    def iter_keyed_search_results(
+        self,
+        query: str,
+        bank_name: str | None = None,
+        year: int | None = None,
+        month: int | None = None,
+        after: TransactionCursor | None = None,
+        limit: int | None = None,
+    ) -> Iterator[tuple[SortKey, Transaction]]:
+        terms = parse_search_query(query)
+
+        if month is not None and not self._partition_exists(year=year, month=month, bank_name=bank_name):
+            raise StorageServiceNotFoundException(f"Could not find any transactions for date: {year}-{month:02}")
+
+        def build_page_query(page_after: TransactionCursor | None, page_size: int) -> tuple[str, tuple]:
+            return _build_search_query(
+                terms, bank_name=bank_name, year=year, month=month, after=page_after, limit=page_size
+            )
+
+        return self._iter_keyed_pages(build_page_query, after, limit=limit)
+
+    def get_transactions_frame(
+        self, bank_name: str | None = None, year: int | None = None, month: int | None = None
+    ) -> pd.DataFrame:
+        where, parameters = _build_where(bank_name=bank_name, year=year, month=month)
+
+        with self._pool.connection() as connection:
+            return pd.read_sql_query(
+                f"{_SELECT_TRANSACTIONS_FRAME} {where} {_ORDER_BY}", connection, params=parameters, parse_dates=["date"]
+            )
+
+    @staticmethod
+    def _replace_partition(
+        connection: sqlite3.Connection, transactions: list[Transaction], bank_name: str, year: int, month: int
+    ) -> None:
+        rows = [
+            (
+                bank_name,
+                year,
+                month,
+                position,
+                transaction.bank_name,
+                transaction.date.isoformat(),
+                transaction.description,
+                transaction.amount_in,
+                transaction.amount_out,
+                transaction.balance,
+            )
+            for position, transaction in enumerate(transactions)
+        ]
+
+        content = StoredTransactions(transactions=transactions).model_dump_json().encode()
+        dates = [row[5] for row in rows]
+
+        try:
+            rollup = build_partition_rollup(TransactionBatch.from_transactions(transactions))
+        except ValueError as e:
+            raise StorageServiceException(f"Cannot store transactions for {bank_name} {year}-{month:02}: {e}")
+
+        connection.execute(
+            "DELETE FROM transactions WHERE bank_name = ? AND year = ? AND month = ?", (bank_name, year, month)
+        )
+        connection.executemany("INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        connection.execute(
+            "INSERT OR REPLACE INTO partitions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                bank_name,
+                year,
+                month,
+                len(rows),
+                min(dates, default=None),
+                max(dates, default=None),
+                len(content),
+                hashlib.sha256(content).hexdigest(),
+            ),
+        )
+
+        connection.execute(
+            "DELETE FROM search_tokens WHERE bank_name = ? AND year = ? AND month = ?", (bank_name, year, month)
+        )
+        SqliteStorageService._index_search_tokens(
+            connection, ((row[5], bank_name, year, month, row[3], row[6]) for row in rows)
+        )
+
+        connection.execute(
+            "INSERT OR REPLACE INTO partition_modifications VALUES (?, ?, ?, ?)",
+            (bank_name, year, month, datetime.now(timezone.utc).isoformat()),
+        )
+
+        # part of the same transaction as the rows, so a rollup can never describe a partition's previous contents
+        connection.execute(
+            "DELETE FROM partition_rollups WHERE bank_name = ? AND year = ? AND month = ?", (bank_name, year, month)
+        )
+
+        if rollup is not None:
+            connection.execute(
+                "INSERT INTO partition_rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    bank_name,
+                    year,
+                    month,
+                    rollup.bank_name,
+                    rollup.money_in,
+                    rollup.money_out,
+                    rollup.opening_balance,
+                    rollup.closing_balance,
+                ),
+            )
+
+    @staticmethod
+    def _index_search_tokens(connection: sqlite3.Connection, rows: Iterable[tuple]) -> None:
+        # rows are (date, bank_name, year, month, position, description)
+        connection.executemany(
+            "INSERT INTO search_tokens VALUES (?, ?, ?, ?, ?, ?)",
+            ((token, *row[:5]) for row in rows for token in dict.fromkeys(tokenize(row[5]))),
+        )
+
+    def _select(self, clause: str, parameters: tuple) -> list[Transaction]:
+        with self._pool.connection() as connection:
+            rows = connection.execute(f"{_SELECT_TRANSACTIONS} {clause}", parameters).fetchall()
+
+        return [_row_to_transaction(row) for row in rows]
+
+    def _iter_keyed_pages(
+        self,
+        build_page_query: Callable[[TransactionCursor | None, int], tuple[str, tuple]],
+        after: TransactionCursor | None,
+        limit: int | None = None,
+    ) -> Generator[tuple[SortKey, Transaction], Any, None]:
+        """
+        Reads keyset pages of _FETCH_SIZE rows, each one after the last key of the page before, until a short page or
+        the limit. Every page is fetched in full and its pooled connection returned before any row is yielded, so a
+        slow consumer such as a streamed response never holds a connection. Rows written between pages are seen or
+        not by their key, as with cursor pagination through the API.
+        """
+
+        remaining = limit
+
+        while remaining is None or remaining > 0:
+            page_size = _FETCH_SIZE if remaining is None else min(_FETCH_SIZE, remaining)
+            query, parameters = build_page_query(after, page_size)
+
+            with self._pool.connection() as connection:
+                rows = connection.execute(query, parameters).fetchall()
+
+            for row in rows:
+                transaction = _row_to_transaction(row[5:])
+                yield (transaction.date, row[1], row[2], row[3], row[4]), transaction
+
+            if len(rows) < page_size:
+                return
+
+            if remaining is not None:
+                remaining -= len(rows)
+
+            last_row = rows[-1]
+            after = TransactionCursor(date.fromisoformat(last_row[0]), *last_row[1:5])
+
+    def _partition_exists(self, year: int, month: int, bank_name: str | None = None) -> bool:
+        with self._pool.connection() as connection:
+            if bank_name is None:
+                row = connection.execute(
+                    "SELECT 1 FROM partitions WHERE year = ? AND month = ? LIMIT 1", (year, month)
+                ).fetchone()
+            else:
+                row = connection.execute(
+                    "SELECT 1 FROM partitions WHERE bank_name = ? AND year = ? AND month = ?", (bank_name, year, month)
+                ).fetchone()
+
+        return row is not None
@@ -1,6 +1,22 @@
+import hashlib
 from abc import ABC, abstractmethod
+from datetime import date
+from io import BytesIO
+from itertools import islice
+from typing import BinaryIO, Iterator
 
-from src.models import Transaction
+import pandas as pd
+
+from src.models import Transaction, PartitionManifestEntry, TransactionSummary, TransactionSummaryGroup
+from src.services.storage.pagination import TransactionCursor, TransactionPage, SortKey
+from src.services.storage.transaction_batch import TransactionBatch
+from src.services.storage.transaction_summary import summarise_partition_rollups, summarise_transactions_frame
+
+
+PartitionKey = tuple[str, int, int]
+
+# statements are copied in chunks of this size, which bounds the memory a single upload holds
+STATEMENT_CHUNK_SIZE = 1024 * 1024
 
 
 class StorageServiceException(Exception):
@@ -11,19 +27,50 @@ class StorageServiceNotFoundException(StorageServiceException):
     pass
 
 
+def copy_statement_stream(statement_stream: BinaryIO, target_file: BinaryIO) -> str:
+    """Copies a statement in STATEMENT_CHUNK_SIZE chunks and returns the sha256 of what was copied."""
+
+    sha256 = hashlib.sha256()
+
+    while chunk := statement_stream.read(STATEMENT_CHUNK_SIZE):
+        sha256.update(chunk)
+        target_file.write(chunk)
+
+    return sha256.hexdigest()
+
+
 class StorageService(ABC):
-    @abstractmethod
     def store_statement(self, statement_bytes: bytes, bank_name: str, year: int, month: int) -> None:
+        self.store_statement_stream(BytesIO(statement_bytes), bank_name=bank_name, year=year, month=month)
+
+    @abstractmethod
+    def store_statement_stream(self, statement_stream: BinaryIO, bank_name: str, year: int, month: int) -> str:
+        """
+        Stores a statement read from a binary stream in chunks, replacing any stored for the same month only once it
+        has been copied in full. Returns the statement's sha256.
+        """
         pass
 
     @abstractmethod
-    def get_statement_for_bank_on_date(self, bank_name: str, year: int, month: int) -> str:
+    def get_statement_bytes_for_bank_on_date(self, bank_name: str, year: int, month: int) -> bytes:
         pass
 
+    def get_statement_for_bank_on_date(self, bank_name: str, year: int, month: int) -> str:
+        return self.get_statement_bytes_for_bank_on_date(bank_name=bank_name, year=year, month=month).decode()
+
     @abstractmethod
     def store_transactions(self, transactions: list[Transaction], bank_name: str, year: int, month: int) -> None:
         pass
 
+    def store_many_transactions(self, partitions: dict[PartitionKey, list[Transaction]]) -> None:
+        """
+        Stores the transactions for several (bank_name, year, month) partitions at once. Backends override this to
+        update their partition index once for the whole batch rather than once per partition.
+        """
+
+        for (bank_name, year, month), transactions in partitions.items():
+            self.store_transactions(transactions=transactions, bank_name=bank_name, year=year, month=month)
+
     @abstractmethod
     def get_transactions_for_bank_for_date(self, bank_name: str, year: int, month: int) -> list[Transaction]:
         pass
@@ -47,3 +94,135 @@ class StorageService(ABC):
     @abstractmethod
     def get_all_transactions(self) -> list[Transaction]:
         pass
+
+    @abstractmethod
+    def list_partitions(
+        self, bank_name: str | None = None, year: int | None = None, month: int | None = None
+    ) -> list[PartitionManifestEntry]:
+        """Returns the stored partitions matching the filters, ordered by bank, year and month."""
+        pass
+
+    @abstractmethod
+    def iter_keyed_transactions(
+        self,
+        bank_name: str | None = None,
+        year: int | None = None,
+        month: int | None = None,
+        after: TransactionCursor | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> Iterator[tuple[SortKey, Transaction]]:
+        """
+        Lazily yields the transactions matched by the same bank_name/year/month combinations as the get methods, in
+        cursor order, paired with their sort key. Only transactions after the given cursor and dated between
+        start_date and end_date inclusive are yielded; partitions wholly outside that range are never read. Missing
+        data for an explicit month raises StorageServiceNotFoundException before iteration.
+        """
+        pass
+
+    def iter_transactions(
+        self,
+        bank_name: str | None = None,
+        year: int | None = None,
+        month: int | None = None,
+        after: TransactionCursor | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> Iterator[Transaction]:
+        keyed_transactions = self.iter_keyed_transactions(
+            bank_name=bank_name, year=year, month=month, after=after, start_date=start_date, end_date=end_date
+        )
+        return (transaction for _, transaction in keyed_transactions)
+
+    def get_transactions_page(
+        self,
+        limit: int,
+        bank_name: str | None = None,
+        year: int | None = None,
+        month: int | None = None,
+        after: TransactionCursor | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> TransactionPage:
+        keyed_transactions = self.iter_keyed_transactions(
+            bank_name=bank_name, year=year, month=month, after=after, start_date=start_date, end_date=end_date
+        )
+        return _read_page(keyed_transactions, limit)
+
+    @abstractmethod
+    def iter_keyed_search_results(
+        self,
+        query: str,
+        bank_name: str | None = None,
+        year: int | None = None,
+        month: int | None = None,
+        after: TransactionCursor | None = None,
+        limit: int | None = None,
+    ) -> Iterator[tuple[SortKey, Transaction]]:
+        """
+        Like iter_keyed_transactions, but only yields transactions whose description matches every term of the query,
+        and at most limit of them. Terms are whole tokens, or prefixes when they end in *. Raises ValueError for a
+        query without any terms.
+        """
+        pass
+
+    def search_transactions(
+        self,
+        query: str,
+        limit: int,
+        bank_name: str | None = None,
+        year: int | None = None,
+        month: int | None = None,
+        after: TransactionCursor | None = None,
+    ) -> TransactionPage:
+        keyed_transactions = self.iter_keyed_search_results(
+            query, bank_name=bank_name, year=year, month=month, after=after, limit=limit + 1
+        )
+        return _read_page(keyed_transactions, limit)
+
+    def get_transactions_frame(
+        self, bank_name: str | None = None, year: int | None = None, month: int | None = None
+    ) -> pd.DataFrame:
+        """
+        Returns the transactions matched by the same bank_name/year/month combinations as the get methods as one
+        date-ordered frame with amounts in pence. Backends override this to build the columns without going through
+        Transaction objects.
+        """
+
+        transactions = self.iter_transactions(bank_name=bank_name, year=year, month=month)
+        return TransactionBatch.from_transactions(transactions).to_frame()
+
+    def get_transaction_summary(
+        self,
+        group_by: list[TransactionSummaryGroup],
+        bank_name: str | None = None,
+        year: int | None = None,
+        month: int | None = None,
+    ) -> list[TransactionSummary]:
+        """
+        Totals the matching transactions per bank and/or per year, month, week or day. Missing data for an explicit
+        month raises StorageServiceNotFoundException.
+
+        Summaries by bank, year or month are answered from the partition rollups without reading any transactions
+        whenever the rollups can give the exact result.
+        """
+
+        partitions = self.list_partitions(bank_name=bank_name, year=year, month=month)
+
+        if month is not None and not partitions:
+            raise StorageServiceNotFoundException(f"Could not find any transactions for date: {year}-{month:02}")
+
+        summaries = summarise_partition_rollups(partitions, group_by)
+
+        if summaries is not None:
+            return summaries
+
+        frame = self.get_transactions_frame(bank_name=bank_name, year=year, month=month)
+        return summarise_transactions_frame(frame, group_by)
+
+
+def _read_page(keyed_transactions: Iterator[tuple[SortKey, Transaction]], limit: int) -> TransactionPage:
+    # read one transaction past the page to learn whether another page exists
+    page = list(islice(keyed_transactions, limit + 1))
+    next_cursor = TransactionCursor(*page[limit - 1][0]) if len(page) > limit else None
+    return TransactionPage(transactions=[transaction for _, transaction in page[:limit]], next_cursor=next_cursor)
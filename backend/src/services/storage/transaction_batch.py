@@ -0,0 +1,206 @@
+import sys
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+from src.models import Transaction
+
+# numpy counts days from the unix epoch, date.toordinal from 0001-01-01
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+_AMOUNT_COLUMNS = ["amount_in", "amount_out", "balance"]
+
+# the smallest float beyond the int64 range
+_PENCE_LIMIT = 2.0**63
+
+
+@dataclass(frozen=True, eq=False)
+class TransactionBatch:
+    """
+    Read-only, column-oriented block of transactions used on the bulk read paths.
+
+    Dates are held as int32 day ordinals and amounts as float64 exactly as stored, so every backend reads back the
+    amounts it was given, while bank names and descriptions are interned so each distinct string is stored once
+    however many rows repeat it. Amounts are only rounded to whole pence where they are totalled. Batches are only
+    turned into Transaction objects for the rows a caller actually returns.
+    """
+
+    bank_names: np.ndarray
+    dates: np.ndarray
+    descriptions: np.ndarray
+    amount_in: np.ndarray
+    amount_out: np.ndarray
+    balance: np.ndarray
+
+    def __post_init__(self):
+        # batches are shared through the partition cache, so no caller may modify one in place
+        for column in (self.bank_names, self.dates, self.descriptions, self.amount_in, self.amount_out, self.balance):
+            column.flags.writeable = False
+
+    @classmethod
+    def from_transactions(cls, transactions: Iterable[Transaction]) -> "TransactionBatch":
+        transactions = list(transactions)
+
+        return cls(
+            bank_names=_interned([transaction.bank_name for transaction in transactions]),
+            dates=np.array([transaction.date.toordinal() for transaction in transactions], dtype=np.int32),
+            descriptions=_interned([transaction.description for transaction in transactions]),
+            amount_in=np.array([transaction.amount_in for transaction in transactions], dtype=np.float64),
+            amount_out=np.array([transaction.amount_out for transaction in transactions], dtype=np.float64),
+            balance=np.array([transaction.balance for transaction in transactions], dtype=np.float64),
+        )
+
+    @classmethod
+    def from_records(cls, records: list[dict[str, Any]]) -> "TransactionBatch":
+        """
+        Builds a batch straight from decoded transaction dicts, as stored in transactions.json, without validating
+        them. Only for records already known to be valid.
+        """
+
+        date_strings = [record["date"] for record in records]
+        ordinals = {date_string: date.fromisoformat(date_string).toordinal() for date_string in set(date_strings)}
+
+        return cls(
+            bank_names=_interned([record["bank_name"] for record in records]),
+            dates=np.array([ordinals[date_string] for date_string in date_strings], dtype=np.int32),
+            descriptions=_interned([record["description"] for record in records]),
+            **{
+                column: np.array([record[column] for record in records], dtype=np.float64)
+                for column in _AMOUNT_COLUMNS
+            },
+        )
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "TransactionBatch":
+        """Builds a batch from a transactions frame with a date column and amounts already in pence."""
+
+        days = frame["date"].to_numpy(dtype="datetime64[D]").astype(np.int64)
+
+        return cls(
+            bank_names=_interned(frame["bank_name"].astype(str).tolist()),
+            dates=(days + _EPOCH_ORDINAL).astype(np.int32),
+            descriptions=_interned(frame["description"].astype(str).tolist()),
+            **{column: frame[column].to_numpy(dtype=np.int64) / 100 for column in _AMOUNT_COLUMNS},
+        )
+
+    @classmethod
+    def concat(cls, batches: list["TransactionBatch"]) -> "TransactionBatch":
+        if not batches:
+            return cls.from_transactions([])
+
+        if len(batches) == 1:
+            return batches[0]
+
+        return cls(
+            bank_names=np.concatenate([batch.bank_names for batch in batches]),
+            dates=np.concatenate([batch.dates for batch in batches]),
+            descriptions=np.concatenate([batch.descriptions for batch in batches]),
+            amount_in=np.concatenate([batch.amount_in for batch in batches]),
+            amount_out=np.concatenate([batch.amount_out for batch in batches]),
+            balance=np.concatenate([batch.balance for batch in batches]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @property
+    def min_date(self) -> date | None:
+        return date.fromordinal(int(self.dates.min())) if len(self) else None
+
+    @property
+    def max_date(self) -> date | None:
+        return date.fromordinal(int(self.dates.max())) if len(self) else None
+
+    def date_order(self) -> np.ndarray:
+        """Positions in stable date order, so rows sharing a date keep the order they were stored in."""
+
+        return np.argsort(self.dates, kind="stable")
+
+    def take(self, positions: np.ndarray) -> "TransactionBatch":
+        return TransactionBatch(
+            bank_names=self.bank_names[positions],
+            dates=self.dates[positions],
+            descriptions=self.descriptions[positions],
+            amount_in=self.amount_in[positions],
+            amount_out=self.amount_out[positions],
+            balance=self.balance[positions],
+        )
+
+    def sort_by_date(self) -> "TransactionBatch":
+        # statements are normally already in date order, in which case there is nothing to copy
+        if len(self) < 2 or bool(np.all(self.dates[1:] >= self.dates[:-1])):
+            return self
+
+        return self.take(self.date_order())
+
+    def to_dates(self) -> list[date]:
+        # a batch spans few distinct days, so build each date object once and share it between rows
+        dates_by_ordinal = {ordinal: date.fromordinal(ordinal) for ordinal in np.unique(self.dates).tolist()}
+        return [dates_by_ordinal[ordinal] for ordinal in self.dates.tolist()]
+
+    def transaction(self, position: int) -> Transaction:
+        return Transaction.model_construct(
+            bank_name=self.bank_names[position],
+            date=date.fromordinal(int(self.dates[position])),
+            description=self.descriptions[position],
+            amount_in=float(self.amount_in[position]),
+            amount_out=float(self.amount_out[position]),
+            balance=float(self.balance[position]),
+        )
+
+    def to_transactions(self) -> list[Transaction]:
+        columns = [self.bank_names.tolist(), self.to_dates(), self.descriptions.tolist()]
+        columns.extend(getattr(self, column).tolist() for column in _AMOUNT_COLUMNS)
+
+        # every column was typed when the batch was built, so skip per-row validation
+        return [
+            Transaction.model_construct(
+                bank_name=bank_name,
+                date=transaction_date,
+                description=description,
+                amount_in=amount_in,
+                amount_out=amount_out,
+                balance=balance,
+            )
+            for bank_name, transaction_date, description, amount_in, amount_out, balance in zip(*columns)
+        ]
+
+    def to_pence(self, column: str) -> np.ndarray:
+        """
+        Returns an amount column rounded to whole pence, for totalling. Raises ValueError if an amount is not finite
+        or too large to count in pence.
+        """
+
+        return _to_pence(getattr(self, column))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Returns the batch as a transactions frame with a datetime date column and amounts in pence."""
+
+        return pd.DataFrame(
+            {
+                "bank_name": self.bank_names.tolist(),
+                "date": (self.dates.astype(np.int64) - _EPOCH_ORDINAL).astype("datetime64[D]"),
+                "description": self.descriptions.tolist(),
+                **{column: self.to_pence(column) for column in _AMOUNT_COLUMNS},
+            }
+        )
+
+
+def _interned(values: list[str]) -> np.ndarray:
+    column = np.empty(len(values), dtype=object)
+    column[:] = [sys.intern(value) for value in values]
+    return column
+
+
+def _to_pence(amounts: np.ndarray) -> np.ndarray:
+    # rint rounds half to even like round(), so both give the same pence for the same float
+    pence = np.rint(amounts * 100)
+
+    # casting a float outside the int64 range wraps around rather than failing
+    if not np.all(np.abs(pence) < _PENCE_LIMIT):
+        raise ValueError(f"Amounts must be finite and under {_PENCE_LIMIT / 100:.0f} in magnitude")
+
+    return pence.astype(np.int64)
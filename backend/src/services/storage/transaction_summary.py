@@ -0,0 +1,161 @@
+import pandas as pd
+
+from src.models import PartitionManifestEntry, PartitionRollup, TransactionSummary, TransactionSummaryGroup
+from src.services.storage.transaction_batch import TransactionBatch
+
+PERIOD_GROUPS: list[TransactionSummaryGroup] = ["year", "month", "week", "day"]
+
+# groups that never split a partition whose transactions all fall within its own month
+ROLLUP_GROUPS: list[TransactionSummaryGroup] = ["bank", "year", "month"]
+
+_PERIOD_FORMATS = {"year": "%Y", "month": "%Y-%m", "day": "%Y-%m-%d"}
+
+
+def build_partition_rollup(batch: TransactionBatch) -> PartitionRollup | None:
+    """
+    Totals one partition's transactions, with amounts in whole pence. Opening and closing balances come from the first
+    and last transactions in stable date order, matching the order every query path returns them in.
+    Returns None for an empty partition or one whose transactions report more than one bank name.
+    Raises ValueError if an amount is too large to count in pence.
+    """
+
+    if not len(batch) or len(set(batch.bank_names.tolist())) > 1:
+        return None
+
+    order = batch.date_order()
+    first, last = order[0], order[-1]
+    amount_in, amount_out, balance = (batch.to_pence(column) for column in ["amount_in", "amount_out", "balance"])
+
+    return PartitionRollup(
+        bank_name=batch.bank_names[0],
+        money_in=int(amount_in.sum()),
+        money_out=int(amount_out.sum()),
+        opening_balance=int(balance[first] - amount_in[first] + amount_out[first]),
+        closing_balance=int(balance[last]),
+    )
+
+
+def summarise_transactions_frame(
+    frame: pd.DataFrame, group_by: list[TransactionSummaryGroup]
+) -> list[TransactionSummary]:
+    """
+    Totals a date-ordered transactions frame, with amounts in pence, per bank and/or per period.
+
+    The closing balance of a group is the balance after its last transaction for each bank in it, summed across
+    those banks. Groups are returned ordered by bank and then period.
+    """
+
+    rows = pd.DataFrame(
+        {
+            "bank_name": frame["bank_name"].astype(str),
+            "date": frame["date"],
+            "money_in": frame["amount_in"].astype("int64"),
+            "money_out": frame["amount_out"].astype("int64"),
+            "transaction_count": 1,
+            "balance": frame["balance"].astype("int64"),
+        },
+        index=frame.index,
+    )
+    return _summarise_rows(rows, group_by)
+
+
+def summarise_partition_rollups(
+    partitions: list[PartitionManifestEntry], group_by: list[TransactionSummaryGroup]
+) -> list[TransactionSummary] | None:
+    """
+    Totals partitions from their rollups alone, giving the same result as summarising their transactions at a cost
+    proportional to the number of partitions. Returns None when the rollups cannot answer exactly: grouping by week or
+    day, a partition without a rollup, or one holding transactions from more than one period of the grouping.
+    """
+
+    if any(group not in ROLLUP_GROUPS for group in group_by):
+        return None
+
+    period_format = next((_PERIOD_FORMATS[group] for group in group_by if group in PERIOD_GROUPS), None)
+    partitions = [partition for partition in partitions if partition.row_count > 0]
+
+    for partition in partitions:
+        if partition.rollup is None:
+            return None
+
+        if period_format is not None and (
+            partition.min_date.strftime(period_format) != partition.max_date.strftime(period_format)
+        ):
+            return None
+
+    # the last partition in this order holds the row the transactions frame would have ended each group on
+    partitions.sort(key=lambda p: (p.max_date, p.bank_name, p.year, p.month))
+
+    rows = pd.DataFrame(
+        {
+            "bank_name": [partition.rollup.bank_name for partition in partitions],
+            "date": pd.to_datetime([partition.max_date for partition in partitions]),
+            "money_in": [partition.rollup.money_in for partition in partitions],
+            "money_out": [partition.rollup.money_out for partition in partitions],
+            "transaction_count": [partition.row_count for partition in partitions],
+            "balance": [partition.rollup.closing_balance for partition in partitions],
+        }
+    )
+    return _summarise_rows(rows, group_by)
+
+
+def _summarise_rows(rows: pd.DataFrame, group_by: list[TransactionSummaryGroup]) -> list[TransactionSummary]:
+    # rows are either single transactions or whole partitions, in the order their balances were reached
+    if rows.empty:
+        return []
+
+    period_groups = [group for group in group_by if group in PERIOD_GROUPS]
+
+    if len(period_groups) > 1:
+        raise ValueError(f"Can only group by one of {', '.join(PERIOD_GROUPS)}")
+
+    keys = pd.DataFrame(index=rows.index)
+
+    if "bank" in group_by:
+        keys["group_bank_name"] = rows["bank_name"]
+
+    if period_groups:
+        keys["period"] = _to_periods(rows["date"], period_groups[0])
+
+    if keys.columns.empty:
+        # a constant key summarises everything into a single group
+        keys["all"] = 0
+
+    key_columns = list(keys.columns)
+    rows = rows.join(keys)
+
+    grouped = rows.groupby(key_columns, sort=True)
+    totals = grouped[["money_in", "money_out", "transaction_count"]].sum()
+
+    # the last balance per bank is where that bank closed the group
+    closing_balances = rows.groupby(key_columns + ["bank_name"], sort=False)["balance"].last()
+    totals["closing_balance"] = closing_balances.groupby(level=key_columns).sum()
+    totals["net"] = totals["money_in"] - totals["money_out"]
+
+    summary_frame = totals.reset_index()
+    pence_columns = ["money_in", "money_out", "net", "closing_balance"]
+    summary_frame[pence_columns] = summary_frame[pence_columns] / 100
+
+    # one row per group, so building models here is cheap next to the aggregation itself
+    return [
+        TransactionSummary(
+            bank_name=row.get("group_bank_name"),
+            period=row.get("period"),
+            transaction_count=row["transaction_count"],
+            money_in=row["money_in"],
+            money_out=row["money_out"],
+            net=row["net"],
+            closing_balance=row["closing_balance"],
+        )
+        for row in summary_frame.to_dict("records")
+    ]
+
+
+def _to_periods(dates: pd.Series, period_group: TransactionSummaryGroup) -> pd.Series:
+    dates = pd.to_datetime(dates)
+
+    if period_group == "week":
+        iso_calendar = dates.dt.isocalendar()
+        return iso_calendar["year"].astype(str) + "-W" + iso_calendar["week"].astype(str).str.zfill(2)
+
+    return dates.dt.strftime(_PERIOD_FORMATS[period_group])
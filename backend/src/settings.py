@@ -1,11 +1,12 @@
 from pathlib import Path
+from typing import Literal
 
 from pydantic import computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
-    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", frozen=True)
 
     google_gen_ai_api_key: str
     google_gen_ai_model_name: str
@@ -13,8 +14,44 @@ class Settings(BaseSettings):
     google_gen_ai_model_max_tokens: int
     google_gen_ai_model_top_p: float
     google_gen_ai_model_prompt_path: Path
+    google_gen_ai_pages_per_window: int = 2
+    google_gen_ai_window_overlap_lines: int = 3
+    google_gen_ai_max_concurrent_windows: int = 8
+
+    # "fake" swaps the Google model for one answering offline with configurable latency and failures, for load tests
+    statement_parser_model: Literal["google", "fake"] = "google"
+    fake_model_latency_median_seconds: float = 1.0
+    fake_model_latency_sigma: float = 0.5
+    fake_model_error_rate: float = 0.0
+    fake_model_rate_limit_rate: float = 0.0
+    fake_model_seed: int | None = None
+
+    storage_backend: Literal["local", "parquet", "sqlite"] = "local"
+    storage_max_threads: int = 8
 
     local_storage_dir_path: Path
+    local_storage_cache_max_entries: int = 256
+
+    sqlite_storage_db_path: Path | None = None
+    sqlite_storage_pool_size: int = 4
+    sqlite_storage_pool_timeout_seconds: float = 30
+
+    statement_job_workers: int = 2
+    bulk_upload_max_concurrency: int = 4
+
+    parse_cache_max_bytes: int = 64 * 1024 * 1024
+
+    @property
+    def sqlite_storage_db_file_path(self) -> Path:
+        return self.sqlite_storage_db_path or self.local_storage_dir_path / "storage.sqlite3"
+
+    @property
+    def statement_jobs_dir_path(self) -> Path:
+        return self.local_storage_dir_path / ".jobs"
+
+    @property
+    def parse_cache_dir_path(self) -> Path:
+        return self.local_storage_dir_path / ".parse_cache"
 
     @computed_field
     @property
@@ -0,0 +1,62 @@
+import json
+from pathlib import Path
+
+from benchmarks.bench_suite import build_http_cases, get_storage_methods, run_suite
+from benchmarks.compare_results import find_regressions, load_results
+from benchmarks.data_generator import DatasetSpec, generate_partitions
+
+
+def test_generate_partitions_is_deterministic() -> None:
+    # ARRANGE
+    spec = DatasetSpec(banks=2, years=1, transactions_per_month=20, seed=3)
+
+    # ACT
+    partitions = generate_partitions(spec)
+
+    # ASSERT
+    assert partitions == generate_partitions(spec)
+    assert partitions != generate_partitions(DatasetSpec(banks=2, years=1, transactions_per_month=20, seed=4))
+    assert len(partitions) == 24
+    assert all(len(transactions) == 20 for transactions in partitions.values())
+    assert all(
+        [t.date for t in transactions] == sorted(t.date for t in transactions) for transactions in partitions.values()
+    )
+
+
+def test_run_suite_covers_every_storage_method_and_filter() -> None:
+    # ARRANGE
+    spec = DatasetSpec(banks=1, years=1, transactions_per_month=5)
+
+    # ACT
+    suite = run_suite(spec, backends=["local"], repeat=1)
+
+    # ASSERT
+    results = suite["results"]
+    storage_names = {result["name"].split("[")[0] for result in results if result["kind"] == "storage"}
+    http_names = [result["name"] for result in results if result["kind"] == "http"]
+    assert storage_names == get_storage_methods()
+    assert http_names == [name for name, _, _ in build_http_cases(spec)]
+    assert suite["metadata"]["dataset"]["rows"] == 60
+    assert all(result["latency_ms"]["p50"] > 0 and result["peak_memory_bytes"] > 0 for result in results)
+    assert next(result for result in results if result["name"] == "transactions[all]")["rows"] == 60
+
+
+def test_find_regressions_compares_p50_latency(tmp_path: Path) -> None:
+    # ARRANGE
+    def write_results(file_name: str, p50s: dict[str, float]) -> Path:
+        results_file_path = tmp_path / file_name
+        results = [
+            {"backend": "local", "kind": "storage", "name": name, "latency_ms": {"p50": p50}}
+            for name, p50 in p50s.items()
+        ]
+        results_file_path.write_text(json.dumps({"metadata": {}, "results": results}))
+        return results_file_path
+
+    baseline = load_results(write_results("baseline.json", {"fast": 1.0, "slow": 1.0, "removed": 1.0}))
+    new = load_results(write_results("new.json", {"fast": 1.1, "slow": 1.5, "added": 9.0}))
+
+    # ACT
+    regressions = find_regressions(baseline, new, threshold=1.2)
+
+    # ASSERT
+    assert regressions == [(("local", "storage", "slow"), 1.5)]
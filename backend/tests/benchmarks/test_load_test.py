@@ -0,0 +1,32 @@
+import asyncio
+from pathlib import Path
+
+from benchmarks.data_generator import DatasetSpec
+from benchmarks.load_test import LoadTestConfig, run_load_test
+
+
+def test_run_load_test_reports_uploads_reads_and_event_loop_lag(tmp_path: Path) -> None:
+    # ARRANGE
+    config = LoadTestConfig(
+        users=4,
+        duration_seconds=1,
+        upload_weight=1,
+        read_weight=1,
+        dataset=DatasetSpec(banks=1, years=1, transactions_per_month=5),
+        model_latency_median_seconds=0.01,
+    )
+
+    # ACT
+    report = asyncio.run(run_load_test(config, tmp_path))
+
+    # ASSERT
+    uploads = report["endpoints"]["POST /statements/{bank_name}/{year}/{month}"]
+    assert uploads["requests"] > 0
+    assert set(uploads["status_codes"]) == {"202"}
+    assert report["jobs"]["states"] == {"succeeded": uploads["requests"]}
+    assert all(
+        set(endpoint["status_codes"]) == {"200"}
+        for name, endpoint in report["endpoints"].items()
+        if name.startswith("GET")
+    )
+    assert report["event_loop_lag_ms"]["p50"] >= 0
@@ -1,8 +1,52 @@
+import hashlib
+import io
 import json
 from pathlib import Path
 
 import pytest
 
+LARGE_STATEMENT_CHUNK = b"PDF-1.4 fake content " * 4096
+LARGE_STATEMENT_CHUNK_COUNT = 256
+
+
+class RepeatedChunkStream(io.RawIOBase):
+    """Readable stream of a chunk repeated many times, generated as it is read rather than held in memory."""
+
+    def __init__(self, chunk: bytes, count: int):
+        self.chunk = chunk
+        self.position = 0
+        self.size = len(chunk) * count
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self.size - self.position)
+        written = 0
+
+        # copy straight from the chunk so the stream itself allocates nothing per read
+        while written < size:
+            offset = (self.position + written) % len(self.chunk)
+            count = min(len(self.chunk) - offset, size - written)
+            buffer[written:written + count] = memoryview(self.chunk)[offset:offset + count]
+            written += count
+
+        self.position += size
+        return size
+
+
+@pytest.fixture
+def large_statement_stream() -> tuple[io.BufferedReader, str]:
+    """About 20MB statement stream along with its expected sha256."""
+
+    expected_sha256 = hashlib.sha256()
+
+    for _ in range(LARGE_STATEMENT_CHUNK_COUNT):
+        expected_sha256.update(LARGE_STATEMENT_CHUNK)
+
+    stream = io.BufferedReader(RepeatedChunkStream(LARGE_STATEMENT_CHUNK, LARGE_STATEMENT_CHUNK_COUNT))
+    return stream, expected_sha256.hexdigest()
+
 
 @pytest.fixture
 def mock_data(tmp_path: Path) -> None:
@@ -9,17 +9,24 @@ from src.settings import Settings
 
 
 @pytest.fixture
-def override_get_settings(tmp_path: Path) -> Generator[None, Any, None]:
+def override_get_settings(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Generator[None, Any, None]:
     test_settings = Settings(
-        google_gen_ai_api_key="",
-        google_gen_ai_model_name="",
+        google_gen_ai_api_key="test-api-key",
+        google_gen_ai_model_name="gemini-test",
         google_gen_ai_model_temp=1,
         google_gen_ai_model_max_tokens=8000,
         google_gen_ai_model_top_p=0.95,
         google_gen_ai_model_prompt_path=Path("src/prompt.txt"),
         local_storage_dir_path=tmp_path,
     )
+
+    # the app lifespan reads settings from the environment rather than through the dependency override
+    for name, value in test_settings.model_dump(exclude={"google_gen_ai_model_instructions"}, exclude_none=True).items():
+        monkeypatch.setenv(name.upper(), str(value))
+
+    get_settings.cache_clear()
     app.dependency_overrides[get_settings] = lambda: test_settings
     yield
 
     app.dependency_overrides = {}
+    get_settings.cache_clear()
@@ -0,0 +1,34 @@
+import re
+
+from fastapi.testclient import TestClient
+
+from src.main import app
+
+
+def get_metric_value(metrics_text: str, series: str) -> float:
+    match = re.search(rf"^{re.escape(series)} (\S+)$", metrics_text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_get_metrics_reports_requests_storage_and_caches(mock_data: None, override_get_settings: None) -> None:
+    # ARRANGE
+    client = TestClient(app)
+    request_series = 'http_request_duration_seconds_count{method="GET",route="/transactions/",status_code="200"}'
+    storage_series = (
+        'storage_operation_duration_seconds_count{method="get_transactions_for_bank_for_date",partitions="1"}'
+    )
+    metrics_before = client.get("/metrics").text
+
+    # ACT
+    client.get("/transactions/?bank_name=barclays&year=2025&month=1")
+    client.get("/transactions/?bank_name=barclays&year=2025&month=1")
+    response = client.get("/metrics")
+
+    # ASSERT
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert get_metric_value(response.text, request_series) - get_metric_value(metrics_before, request_series) == 2
+    assert get_metric_value(response.text, storage_series) - get_metric_value(metrics_before, storage_series) == 2
+    assert get_metric_value(response.text, "storage_partitions") == 5
+    assert get_metric_value(response.text, 'cache_hit_ratio{cache="partition"}') > 0
+    assert 'cache_hit_ratio{cache="parse"}' in response.text
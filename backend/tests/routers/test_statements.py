@@ -1,74 +1,416 @@
+import json
+import time
+import zipfile
 from datetime import date
 from io import BytesIO
 from pathlib import Path
 from typing import Generator, Any
 
 import pytest
+from anyio import CapacityLimiter
 from fastapi.testclient import TestClient
 
-from src.dependencies import get_settings, get_model_statement_parser
+from src.dependencies import get_settings, get_model_statement_parser, get_parse_cache, get_statement_job_queue
 from src.main import app
 from src.models import Transaction
-from src.settings import Settings
+from src.services.jobs.statement_job_queue import StatementJobQueue
+from src.services.jobs.statement_job_store import StatementJobStore
+from src.services.statement_parser.model_statement_parser import ModelStatementParserException
+from src.services.statement_parser.parse_cache import ParseCache
+from src.services.storage.async_storage_service import ThreadPoolAsyncStorageService
+from src.services.storage.local_storage_service import LocalStorageService
 
 
 # -------------------- FIXTURES -------------------- #
+class MockModelService:
+    model_name = "gemini-test"
+    temperature = 1.0
+    instructions = "Extract the transactions."
+
+    def __init__(self):
+        self.call_count = 0
+
+    async def parse_statement_pages(self, bank_name: str, pages: list[str]) -> list[Transaction]:
+        self.call_count += 1
+        return [
+            Transaction(
+                bank_name="Test Bank",
+                date=date.fromisoformat("2025-01-01"),
+                description="Transaction 1",
+                amount_in=100,
+                amount_out=0,
+                balance=500,
+            ),
+            Transaction(
+                bank_name="Test Bank",
+                date=date.fromisoformat("2025-01-05"),
+                description="Transaction 2",
+                amount_in=0,
+                amount_out=150,
+                balance=350,
+            ),
+            Transaction(
+                bank_name="Test Bank",
+                date=date.fromisoformat("2025-01-21"),
+                description="Transaction 3",
+                amount_in=1000,
+                amount_out=0,
+                balance=1350,
+            ),
+        ]
+
+
+class FlakyModelService(MockModelService):
+    """Fails with an unexpected error for one bank's statements."""
+
+    def __init__(self, failing_bank_name: str):
+        super().__init__()
+        self.failing_bank_name = failing_bank_name
+
+    async def parse_statement_pages(self, bank_name: str, pages: list[str]) -> list[Transaction]:
+        if bank_name == self.failing_bank_name:
+            raise ValueError("Unreadable statement")
+
+        return await super().parse_statement_pages(bank_name=bank_name, pages=pages)
+
+
+class FailingModelService:
+    async def parse_statement_pages(self, bank_name: str, pages: list[str]) -> list[Transaction]:
+        raise ModelStatementParserException("Unexpected model behavior: no transactions found")
+
+
+def build_statement_job_queue(
+    tmp_path: Path, statement_parser: Any, parse_cache: ParseCache | None = None
+) -> StatementJobQueue:
+    return StatementJobQueue(
+        job_store=StatementJobStore(tmp_path / ".jobs"),
+        statement_parser=statement_parser,
+        storage_service=ThreadPoolAsyncStorageService(LocalStorageService(tmp_path), limiter=CapacityLimiter(4)),
+        concurrency=2,
+        parse_cache=parse_cache,
+    )
+
+
 @pytest.fixture
 def override_get_model_service(tmp_path: Path) -> Generator[None, Any, None]:
-    class MockModelService:
-        async def parse_transactions(self, bank_name: str, statement: str) -> list[Transaction]:
-            return [
-                Transaction(
-                    bank_name="Test Bank",
-                    date=date.fromisoformat("2025-01-01"),
-                    description="Transaction 1",
-                    amount_in=100,
-                    amount_out=0,
-                    balance=500,
-                ),
-                Transaction(
-                    bank_name="Test Bank",
-                    date=date.fromisoformat("2025-01-05"),
-                    description="Transaction 2",
-                    amount_in=0,
-                    amount_out=150,
-                    balance=350,
-                ),
-                Transaction(
-                    bank_name="Test Bank",
-                    date=date.fromisoformat("2025-01-21"),
-                    description="Transaction 3",
-                    amount_in=1000,
-                    amount_out=0,
-                    balance=1350,
-                ),
-            ]
-
-    app.dependency_overrides[get_model_statement_parser] = lambda: MockModelService()
+    statement_job_queue = build_statement_job_queue(tmp_path, MockModelService())
+    app.dependency_overrides[get_statement_job_queue] = lambda: statement_job_queue
+    yield
+
+    app.dependency_overrides = {}
+
+
+@pytest.fixture
+def override_get_failing_model_service(tmp_path: Path) -> Generator[None, Any, None]:
+    statement_job_queue = build_statement_job_queue(tmp_path, FailingModelService())
+    app.dependency_overrides[get_statement_job_queue] = lambda: statement_job_queue
     yield
 
     app.dependency_overrides = {}
 
 
+@pytest.fixture
+def override_get_parse_cache(tmp_path: Path) -> Generator[MockModelService, Any, None]:
+    statement_parser = MockModelService()
+    parse_cache = ParseCache(tmp_path / ".parse_cache", max_bytes=1024 * 1024)
+    statement_job_queue = build_statement_job_queue(tmp_path, statement_parser, parse_cache=parse_cache)
+    app.dependency_overrides[get_statement_job_queue] = lambda: statement_job_queue
+    app.dependency_overrides[get_parse_cache] = lambda: parse_cache
+    yield statement_parser
+
+    app.dependency_overrides = {}
+
+
+def wait_for_job(client: TestClient, job_id: str) -> dict:
+    for _ in range(200):
+        job = client.get(f"/jobs/{job_id}").json()
+
+        if job["state"] in {"succeeded", "failed"}:
+            return job
+
+        time.sleep(0.01)
+
+    raise TimeoutError(f"Job {job_id} did not finish")
+
+
 # -------------------- TESTS -------------------- #
 def test_process_statement(tmp_path: Path, override_get_settings: None, override_get_model_service: None) -> None:
     # ARRANGE
     bank_name = "test_bank"
     year = 2025
     month = 9
-    fake_statement = BytesIO(b"%PDF-1.4 fake content")
-    client = TestClient(app)
+    fake_statement = BytesIO(b"fake statement content")
 
     # ACT
-    response = client.post(
-        url=f"/statements/{bank_name}/{year}/{month}",
-        files={"statement": (f"test_statement.pdf", fake_statement, "application/pdf")},
-    )
+    with TestClient(app) as client:
+        response = client.post(
+            url=f"/statements/{bank_name}/{year}/{month}",
+            files={"statement": (f"test_statement.pdf", fake_statement, "application/pdf")},
+        )
+        job = wait_for_job(client, response.json()["id"])
 
     # ASSERT
-    assert response.status_code == 200
+    assert response.status_code == 202
+    assert response.json()["state"] == "queued"
+    assert response.headers["Location"] == f"/jobs/{job['id']}"
+    assert job["state"] == "succeeded"
+    assert job["transaction_count"] == 3
+    assert job["statement_size_bytes"] == len(b"fake statement content")
+    assert job["estimated_prompt_tokens"] == 6
+    assert job["started_at"] is not None and job["finished_at"] is not None
     output_dir_path = tmp_path / bank_name / "2025" / "09"
     raw_file_path = output_dir_path / "statement.pdf"
     parsed_file_path = output_dir_path / "transactions.json"
     assert raw_file_path.is_file()
     assert parsed_file_path.is_file()
+
+
+def test_process_statement_records_parse_failure(
+    tmp_path: Path, override_get_settings: None, override_get_failing_model_service: None
+) -> None:
+    # ARRANGE
+    fake_statement = BytesIO(b"fake statement content")
+
+    # ACT
+    with TestClient(app) as client:
+        response = client.post(
+            url="/statements/test_bank/2025/9",
+            files={"statement": (f"test_statement.pdf", fake_statement, "application/pdf")},
+        )
+        job = wait_for_job(client, response.json()["id"])
+
+    # ASSERT
+    assert response.status_code == 202
+    assert job["state"] == "failed"
+    assert job["error"] == "Unexpected model behavior: no transactions found"
+    assert not (tmp_path / "test_bank" / "2025" / "09" / "transactions.json").exists()
+
+
+def test_process_statement_reuses_cached_parse(
+    tmp_path: Path, override_get_settings: None, override_get_parse_cache: MockModelService
+) -> None:
+    # ARRANGE
+    statement_bytes = b"fake statement content"
+
+    # ACT
+    with TestClient(app) as client:
+        first_response = client.post(
+            url="/statements/test_bank/2025/9",
+            files={"statement": ("test_statement.pdf", BytesIO(statement_bytes), "application/pdf")},
+        )
+        wait_for_job(client, first_response.json()["id"])
+        second_response = client.post(
+            url="/statements/other_bank/2025/10",
+            files={"statement": ("test_statement.pdf", BytesIO(statement_bytes), "application/pdf")},
+        )
+        stats_response = client.get("/statements/parse-cache/stats")
+
+    # ASSERT
+    assert first_response.status_code == 202
+    assert second_response.status_code == 200
+    assert second_response.json()["state"] == "succeeded"
+    assert second_response.json()["cache_hit"] is True
+    assert override_get_parse_cache.call_count == 1
+    stored_transactions = LocalStorageService(tmp_path).get_transactions_for_bank_for_date("other_bank", 2025, 10)
+    assert [transaction.bank_name for transaction in stored_transactions] == ["other_bank"] * 3
+    assert stats_response.json()["hits"] == 1
+    assert stats_response.json()["misses"] == 1
+    assert stats_response.json()["entries"] == 1
+
+
+def test_upload_statements_with_manifest(
+    tmp_path: Path, override_get_settings: None, override_get_model_service: None
+) -> None:
+    # ARRANGE
+    manifest = {
+        "statements": [
+            {"file_name": "jan.pdf", "bank_name": "barclays", "year": 2025, "month": 1},
+            {"file_name": "feb.pdf", "bank_name": "barclays", "year": 2025, "month": 2},
+            {"file_name": "missing.pdf", "bank_name": "lloyds", "year": 2025, "month": 1},
+        ]
+    }
+    client = TestClient(app)
+
+    # ACT
+    response = client.post(
+        url="/statements/bulk",
+        files=[
+            ("statements", ("jan.pdf", BytesIO(b"january statement"), "application/pdf")),
+            ("statements", ("feb.pdf", BytesIO(b"february statement"), "application/pdf")),
+        ],
+        data={"manifest": json.dumps(manifest)},
+    )
+
+    # ASSERT
+    assert response.status_code == 200
+    summary = response.json()
+    assert (summary["succeeded"], summary["failed"]) == (2, 1)
+    assert [result["state"] for result in summary["results"]] == ["succeeded", "succeeded", "failed"]
+    assert summary["results"][0]["transaction_count"] == 3
+    assert summary["results"][2]["error"] == "File not found in upload"
+    local_storage_service = LocalStorageService(tmp_path)
+    assert [(partition.year, partition.month) for partition in local_storage_service.list_partitions()] == [
+        (2025, 1),
+        (2025, 2),
+    ]
+    assert (tmp_path / "barclays" / "2025" / "02" / "statement.pdf").read_bytes() == b"february statement"
+
+
+def test_upload_statements_from_zip(
+    tmp_path: Path, override_get_settings: None, override_get_model_service: None
+) -> None:
+    # ARRANGE
+    manifest = {"statements": [{"file_name": "statements/jan.pdf", "bank_name": "monzo", "year": 2025, "month": 1}]}
+    zip_bytes = BytesIO()
+
+    with zipfile.ZipFile(zip_bytes, "w") as zip_file:
+        zip_file.writestr("manifest.json", json.dumps(manifest))
+        zip_file.writestr("statements/jan.pdf", b"january statement")
+
+    zip_bytes.seek(0)
+    client = TestClient(app)
+
+    # ACT
+    response = client.post(
+        url="/statements/bulk", files={"statements": ("statements.zip", zip_bytes, "application/zip")}
+    )
+
+    # ASSERT
+    assert response.status_code == 200
+    assert response.json()["succeeded"] == 1
+    assert (tmp_path / "monzo" / "2025" / "01" / "transactions.json").is_file()
+
+
+def test_upload_statements_stores_others_when_one_fails_unexpectedly(
+    tmp_path: Path, override_get_settings: None
+) -> None:
+    # ARRANGE
+    statement_job_queue = build_statement_job_queue(tmp_path, FlakyModelService(failing_bank_name="lloyds"))
+    app.dependency_overrides[get_statement_job_queue] = lambda: statement_job_queue
+    manifest = {
+        "statements": [
+            {"file_name": "barclays.pdf", "bank_name": "barclays", "year": 2025, "month": 1},
+            {"file_name": "lloyds.pdf", "bank_name": "lloyds", "year": 2025, "month": 1},
+        ]
+    }
+    client = TestClient(app)
+
+    # ACT
+    response = client.post(
+        url="/statements/bulk",
+        files=[
+            ("statements", ("barclays.pdf", BytesIO(b"barclays january"), "application/pdf")),
+            ("statements", ("lloyds.pdf", BytesIO(b"lloyds january"), "application/pdf")),
+        ],
+        data={"manifest": json.dumps(manifest)},
+    )
+    app.dependency_overrides = {}
+
+    # ASSERT
+    assert response.status_code == 200
+    summary = response.json()
+    assert [result["state"] for result in summary["results"]] == ["succeeded", "failed"]
+    assert summary["results"][1]["error"] == "Unexpected error: ValueError('Unreadable statement')"
+    local_storage_service = LocalStorageService(tmp_path)
+    assert len(local_storage_service.get_transactions_for_bank_for_date("barclays", 2025, 1)) == 3
+    assert [partition.bank_name for partition in local_storage_service.list_partitions()] == ["barclays"]
+
+
+def test_upload_statements_rejects_duplicate_file_names(
+    tmp_path: Path, override_get_settings: None, override_get_model_service: None
+) -> None:
+    # ARRANGE
+    manifest = {"statements": [{"file_name": "jan.pdf", "bank_name": "barclays", "year": 2025, "month": 1}]}
+    client = TestClient(app)
+
+    # ACT
+    response = client.post(
+        url="/statements/bulk",
+        files=[
+            ("statements", ("jan.pdf", BytesIO(b"barclays january"), "application/pdf")),
+            ("statements", ("jan.pdf", BytesIO(b"lloyds january"), "application/pdf")),
+        ],
+        data={"manifest": json.dumps(manifest)},
+    )
+
+    # ASSERT
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Uploaded statements must have distinct file names"
+    assert not (tmp_path / "barclays").exists()
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {},
+        {"manifest": "not json"},
+        {
+            "manifest": json.dumps(
+                {
+                    "statements": [
+                        {"file_name": "jan.pdf", "bank_name": "barclays", "year": 2025, "month": 1},
+                        {"file_name": "jan-copy.pdf", "bank_name": "barclays", "year": 2025, "month": 1},
+                    ]
+                }
+            )
+        },
+    ],
+)
+def test_upload_statements_invalid_manifest(
+    override_get_settings: None, override_get_model_service: None, data: dict
+) -> None:
+    client = TestClient(app)
+
+    response = client.post(
+        url="/statements/bulk",
+        files={"statements": ("jan.pdf", BytesIO(b"january statement"), "application/pdf")},
+        data=data,
+    )
+
+    assert response.status_code == 400
+
+
+def test_get_job_not_found(override_get_settings: None) -> None:
+    # ARRANGE
+    client = TestClient(app)
+
+    # ACT
+    response = client.get("/jobs/0123456789abcdef")
+
+    # ASSERT
+    assert response.status_code == 404
+
+
+def test_lifespan_shares_parser_until_shutdown(override_get_settings: None) -> None:
+    # ARRANGE
+    settings = get_settings()
+
+    # ACT
+    with TestClient(app):
+        first_parser = get_model_statement_parser(settings)
+        second_parser = get_model_statement_parser(settings)
+
+    # ASSERT
+    assert first_parser is second_parser
+    assert get_model_statement_parser(settings) is not first_parser
+
+
+def test_reload_instructions(tmp_path: Path, override_get_settings: None) -> None:
+    # ARRANGE
+    prompt_file_path = tmp_path / "prompt.txt"
+    prompt_file_path.write_text("Original instructions")
+    test_settings = get_settings().model_copy(update={"google_gen_ai_model_prompt_path": prompt_file_path})
+    app.dependency_overrides[get_settings] = lambda: test_settings
+    statement_parser = get_model_statement_parser(test_settings)
+    provider = statement_parser.provider
+    prompt_file_path.write_text("Updated instructions")
+    client = TestClient(app)
+
+    # ACT
+    response = client.post(url="/statements/instructions/reload")
+
+    # ASSERT
+    assert response.status_code == 200
+    assert get_model_statement_parser(test_settings) is statement_parser
+    assert statement_parser.instructions == "Updated instructions"
+    assert statement_parser.provider is provider
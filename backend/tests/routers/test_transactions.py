@@ -1,8 +1,16 @@
+import json
+from pathlib import Path
+
 import pytest
 from fastapi.testclient import TestClient
 
+from src.dependencies import get_settings
 from src.main import app
 from src.models import Transaction
+from src.scripts.migrate_local_to_sqlite import migrate_local_storage
+from src.services.storage.local_storage_service import LocalStorageService
+from src.services.storage.sqlite_storage_service import SqliteStorageService
+from src.settings import Settings
 
 
 def test_get_bank_transactions_for_date(mock_data: None, override_get_settings: None) -> None:
@@ -445,3 +453,342 @@ def test_get_transactions_raises_404_exception_if_no_data_found() -> None:
 
 def test_get_transactions_raises_500_exception_if_stored_transactions_in_invalid_format() -> None:
     pass
+
+
+def test_get_transactions_uses_sqlite_backend_when_selected(mock_data: None, tmp_path: Path) -> None:
+    # ARRANGE
+    test_settings = Settings(
+        google_gen_ai_api_key="",
+        google_gen_ai_model_name="",
+        google_gen_ai_model_temp=1,
+        google_gen_ai_model_max_tokens=8000,
+        google_gen_ai_model_top_p=0.95,
+        google_gen_ai_model_prompt_path=Path("src/prompt.txt"),
+        local_storage_dir_path=tmp_path,
+        storage_backend="sqlite",
+        sqlite_storage_db_path=tmp_path / "db" / "storage.sqlite3",
+    )
+    sqlite_storage_service = SqliteStorageService(test_settings.sqlite_storage_db_file_path)
+    migrate_local_storage(LocalStorageService(tmp_path), sqlite_storage_service)
+    app.dependency_overrides[get_settings] = lambda: test_settings
+    client = TestClient(app)
+
+    # ACT
+    response = client.get("/transactions/?bank_name=barclays&year=2025&month=2")
+
+    # ASSERT
+    app.dependency_overrides = {}
+    assert response.status_code == 200
+    assert [transaction["description"] for transaction in response.json()] == ["Gym Membership", "Bonus"]
+
+
+@pytest.mark.parametrize(
+    "url, headers",
+    [
+        ("/transactions/?year=2025&format=ndjson", {}),
+        ("/transactions/?year=2025", {"Accept": "application/x-ndjson"}),
+    ],
+)
+def test_get_transactions_streams_ndjson(
+    mock_data: None, override_get_settings: None, url: str, headers: dict[str, str]
+) -> None:
+    # ARRANGE
+    client = TestClient(app)
+
+    # ACT
+    response = client.get(url, headers=headers)
+    json_response = client.get("/transactions/?year=2025")
+
+    # ASSERT
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in response.text.splitlines()] == json_response.json()
+
+
+def test_get_transactions_stream_raises_404_if_no_data_found(mock_data: None, override_get_settings: None) -> None:
+    # ARRANGE
+    client = TestClient(app)
+
+    # ACT
+    response = client.get("/transactions/?year=2023&month=1&format=ndjson")
+
+    # ASSERT
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["", "bank_name=barclays", "bank_name=lloyds&year=2024", "bank_name=monzo&year=2025&month=1", "year=2025",
+     "year=2025&month=1"],
+)
+def test_get_transactions_paginates_with_cursor(mock_data: None, override_get_settings: None, query: str) -> None:
+    # ARRANGE
+    client = TestClient(app)
+    expected_transactions = client.get(f"/transactions/?{query}").json()
+
+    # ACT
+    pages = []
+    response = client.get(f"/transactions/?{query}&limit=2")
+    pages.append(response.json())
+
+    while "X-Next-Cursor" in response.headers:
+        response = client.get(f"/transactions/?{query}&limit=2&cursor={response.headers['X-Next-Cursor']}")
+        pages.append(response.json())
+
+    # ASSERT
+    assert all(len(page) <= 2 for page in pages)
+    assert [transaction for page in pages for transaction in page] == expected_transactions
+    assert len(pages) == (len(expected_transactions) + 1) // 2
+
+
+def test_get_transactions_raises_400_for_invalid_cursor(mock_data: None, override_get_settings: None) -> None:
+    # ARRANGE
+    client = TestClient(app)
+
+    # ACT
+    response = client.get("/transactions/?limit=2&cursor=not-a-cursor")
+
+    # ASSERT
+    assert response.status_code == 400
+
+
+def test_get_transactions_filters_date_range_across_years(mock_data: None, override_get_settings: None) -> None:
+    # ARRANGE
+    client = TestClient(app)
+    expected_transactions = [
+        transaction
+        for transaction in client.get("/transactions/").json()
+        if "2024-12-20" <= transaction["date"] <= "2025-01-05"
+    ]
+
+    # ACT
+    response = client.get("/transactions/?start_date=2024-12-20&end_date=2025-01-05")
+
+    # ASSERT
+    assert response.status_code == 200
+    assert response.json() == expected_transactions
+    assert {transaction["date"][:4] for transaction in expected_transactions} == {"2024", "2025"}
+
+
+def test_get_transactions_raises_400_if_start_date_after_end_date(
+    mock_data: None, override_get_settings: None
+) -> None:
+    # ARRANGE
+    client = TestClient(app)
+
+    # ACT
+    response = client.get("/transactions/?start_date=2025-02-01&end_date=2025-01-01")
+
+    # ASSERT
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "url", ["/transactions/?bank_name=barclays", "/transactions/summary?bank_name=barclays",
+            "/transactions/search?q=salary&bank_name=barclays"],
+)
+def test_get_transactions_returns_304_for_matching_etag(mock_data: None, override_get_settings: None, url: str) -> None:
+    # ARRANGE
+    client = TestClient(app)
+    first_response = client.get(url)
+
+    # ACT
+    response = client.get(url, headers={"If-None-Match": first_response.headers["ETag"]})
+
+    # ASSERT
+    assert first_response.status_code == 200
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == first_response.headers["ETag"]
+
+
+@pytest.mark.parametrize(
+    "url, status_code",
+    [
+        ("/transactions/?month=1", 400),
+        ("/transactions/?bank_name=barclays&year=2023&month=1", 404),
+        ("/transactions/?year=2023&month=1&format=ndjson", 404),
+        ("/transactions/summary?month=1", 400),
+        ("/transactions/summary?year=2023&month=1", 404),
+        ("/transactions/search?q=*", 400),
+        ("/transactions/search?q=salary&year=2023&month=1", 404),
+    ],
+)
+def test_conditional_get_of_invalid_or_missing_query_is_not_answered_with_304(
+    mock_data: None, override_get_settings: None, url: str, status_code: int
+) -> None:
+    # ARRANGE
+    client = TestClient(app)
+    # the tag every query over no partitions gets
+    empty_etag = client.get("/transactions/?bank_name=unknown").headers["ETag"]
+
+    # ACT
+    star_response = client.get(url, headers={"If-None-Match": "*"})
+    empty_etag_response = client.get(url, headers={"If-None-Match": empty_etag})
+
+    # ASSERT
+    assert star_response.status_code == status_code
+    assert empty_etag_response.status_code == status_code
+
+
+def test_get_transactions_returns_304_if_not_modified_since(mock_data: None, override_get_settings: None) -> None:
+    # ARRANGE
+    client = TestClient(app)
+    first_response = client.get("/transactions/")
+
+    # ACT
+    response = client.get("/transactions/", headers={"If-Modified-Since": first_response.headers["Last-Modified"]})
+    earlier_response = client.get("/transactions/", headers={"If-Modified-Since": "Wed, 01 Jan 2020 00:00:00 GMT"})
+
+    # ASSERT
+    assert response.status_code == 304
+    assert earlier_response.status_code == 200
+
+
+def test_get_transactions_etag_changes_only_when_queried_partition_is_written(
+    tmp_path: Path, mock_data: None, override_get_settings: None
+) -> None:
+    # ARRANGE
+    client = TestClient(app)
+    barclays_etag = client.get("/transactions/?bank_name=barclays").headers["ETag"]
+    lloyds_etag = client.get("/transactions/?bank_name=lloyds").headers["ETag"]
+    local_storage_service = LocalStorageService(tmp_path)
+    transactions = local_storage_service.get_transactions_for_bank_for_date(bank_name="barclays", year=2025, month=1)
+
+    # ACT
+    # rewritten unchanged, which must still invalidate the tag
+    local_storage_service.store_transactions(transactions, bank_name="barclays", year=2025, month=1)
+    barclays_response = client.get("/transactions/?bank_name=barclays", headers={"If-None-Match": barclays_etag})
+    lloyds_response = client.get("/transactions/?bank_name=lloyds", headers={"If-None-Match": lloyds_etag})
+
+    # ASSERT
+    assert barclays_response.status_code == 200
+    assert barclays_response.headers["ETag"] != barclays_etag
+    assert lloyds_response.status_code == 304
+
+
+def test_get_transactions_tags_json_and_ndjson_separately(mock_data: None, override_get_settings: None) -> None:
+    # ARRANGE
+    client = TestClient(app)
+    json_etag = client.get("/transactions/").headers["ETag"]
+
+    # ACT
+    response = client.get("/transactions/?format=ndjson", headers={"If-None-Match": json_etag})
+
+    # ASSERT
+    assert response.status_code == 200
+    assert response.headers["ETag"] != json_etag
+
+
+def test_get_transaction_summary_groups_by_bank_and_month_by_default(
+    mock_data: None, override_get_settings: None
+) -> None:
+    # ARRANGE
+    client = TestClient(app)
+
+    # ACT
+    response = client.get("/transactions/summary?bank_name=barclays")
+
+    # ASSERT
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "bank_name": "Barclays",
+            "period": "2025-01",
+            "transaction_count": 3,
+            "money_in": 2500,
+            "money_out": 195.7,
+            "net": 2304.3,
+            "closing_balance": 4304.3,
+        },
+        {
+            "bank_name": "Barclays",
+            "period": "2025-02",
+            "transaction_count": 2,
+            "money_in": 500,
+            "money_out": 45,
+            "net": 455,
+            "closing_balance": 4759.3,
+        },
+    ]
+
+
+def test_get_transaction_summary_groups_by_requested_period(mock_data: None, override_get_settings: None) -> None:
+    # ARRANGE
+    client = TestClient(app)
+
+    # ACT
+    response = client.get("/transactions/summary?group_by=year")
+
+    # ASSERT
+    assert response.status_code == 200
+    assert [(summary["period"], summary["transaction_count"]) for summary in response.json()] == [
+        ("2024", 2),
+        ("2025", 10),
+    ]
+
+
+@pytest.mark.parametrize("query", ["month=1", "group_by=month&group_by=week", "group_by=quarter"])
+def test_get_transaction_summary_rejects_invalid_query(
+    mock_data: None, override_get_settings: None, query: str
+) -> None:
+    # ARRANGE
+    client = TestClient(app)
+
+    # ACT
+    response = client.get(f"/transactions/summary?{query}")
+
+    # ASSERT
+    assert response.status_code in (400, 422)
+
+
+def test_get_transaction_summary_raises_404_if_no_data_found(mock_data: None, override_get_settings: None) -> None:
+    # ARRANGE
+    client = TestClient(app)
+
+    # ACT
+    response = client.get("/transactions/summary?year=2023&month=1")
+
+    # ASSERT
+    assert response.status_code == 404
+
+
+def test_search_transactions_returns_matches_in_date_order(mock_data: None, override_get_settings: None) -> None:
+    # ARRANGE
+    client = TestClient(app)
+
+    # ACT
+    response = client.get("/transactions/search?q=grocer*")
+
+    # ASSERT
+    assert response.status_code == 200
+    assert [(transaction["date"], transaction["description"]) for transaction in response.json()] == [
+        ("2025-01-03", "Grocery Store"),
+        ("2025-01-30", "Groceries"),
+    ]
+
+
+def test_search_transactions_paginates_with_cursor(mock_data: None, override_get_settings: None) -> None:
+    # ARRANGE
+    client = TestClient(app)
+
+    # ACT
+    first_page = client.get("/transactions/search?q=grocer*&limit=1")
+    second_page = client.get(f"/transactions/search?q=grocer*&limit=1&cursor={first_page.headers['X-Next-Cursor']}")
+
+    # ASSERT
+    assert [transaction["description"] for transaction in first_page.json()] == ["Grocery Store"]
+    assert [transaction["description"] for transaction in second_page.json()] == ["Groceries"]
+    assert "X-Next-Cursor" not in second_page.headers
+
+
+@pytest.mark.parametrize("query", ["q=", "q=*", "q=salary&month=1", "q=salary&cursor=not-a-cursor"])
+def test_search_transactions_rejects_invalid_query(mock_data: None, override_get_settings: None, query: str) -> None:
+    # ARRANGE
+    client = TestClient(app)
+
+    # ACT
+    response = client.get(f"/transactions/search?{query}")
+
+    # ASSERT
+    assert response.status_code in (400, 422)
@@ -0,0 +1,177 @@
+import asyncio
+import hashlib
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+from anyio import CapacityLimiter
+
+from src.models import StatementJob, Transaction
+from src.services.jobs.statement_job_queue import StatementJobQueue
+from src.services.jobs.statement_job_store import StatementJobStore
+from src.services.statement_parser.parse_cache import ParseCache
+from src.services.storage.async_storage_service import ThreadPoolAsyncStorageService
+from src.services.storage.local_storage_service import LocalStorageService
+
+
+class MockModelService:
+    model_name = "mock"
+    temperature = 1
+    instructions = "Parse it"
+
+    def __init__(self):
+        self.statements: list[str] = []
+
+    async def parse_statement_pages(self, bank_name: str, pages: list[str]) -> list[Transaction]:
+        self.statements.append("\n".join(pages))
+        return [
+            Transaction(
+                bank_name=bank_name,
+                date=date(2025, 1, 1),
+                description="\n".join(pages),
+                amount_in=100,
+                amount_out=0,
+                balance=500,
+            )
+        ]
+
+
+async def wait_until_finished(job_store: StatementJobStore, job_ids: list[str]) -> list[StatementJob]:
+    for _ in range(200):
+        jobs = [job_store.get(job_id) for job_id in job_ids]
+
+        if all(job.state in {"succeeded", "failed"} for job in jobs):
+            return jobs
+
+        await asyncio.sleep(0.01)
+
+    raise TimeoutError("Jobs did not finish")
+
+
+def test_start_resumes_unfinished_jobs(tmp_path: Path) -> None:
+    # ARRANGE
+    local_storage_service = LocalStorageService(tmp_path)
+    job_store = StatementJobStore(tmp_path / ".jobs")
+    statement_parser = MockModelService()
+    job_queue = StatementJobQueue(
+        job_store=job_store,
+        statement_parser=statement_parser,
+        storage_service=ThreadPoolAsyncStorageService(local_storage_service, limiter=CapacityLimiter(2)),
+        concurrency=2,
+    )
+    created_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    jobs = [
+        StatementJob(id="queued", bank_name="barclays", year=2025, month=1, state="queued", created_at=created_at),
+        StatementJob(
+            id="running",
+            bank_name="lloyds",
+            year=2025,
+            month=1,
+            state="running",
+            created_at=created_at,
+            started_at=created_at,
+        ),
+        StatementJob(
+            id="succeeded",
+            bank_name="monzo",
+            year=2025,
+            month=1,
+            state="succeeded",
+            created_at=created_at,
+            transaction_count=0,
+        ),
+    ]
+
+    for job in jobs:
+        local_storage_service.store_statement(job.bank_name.encode(), bank_name=job.bank_name, year=2025, month=1)
+        job_store.save(job)
+
+    async def run() -> list[StatementJob]:
+        await job_queue.start()
+
+        try:
+            return await wait_until_finished(job_store, ["queued", "running"])
+        finally:
+            await job_queue.stop()
+
+    # ACT
+    finished_jobs = asyncio.run(run())
+
+    # ASSERT
+    assert [job.state for job in finished_jobs] == ["succeeded", "succeeded"]
+    assert sorted(statement_parser.statements) == ["barclays", "lloyds"]
+    assert job_store.get("succeeded").transaction_count == 0
+    assert local_storage_service.get_transactions_for_bank_for_date("lloyds", 2025, 1)[0].description == "lloyds"
+
+
+def test_missing_statement_fails_job(tmp_path: Path) -> None:
+    # ARRANGE
+    job_store = StatementJobStore(tmp_path / ".jobs")
+    job_queue = StatementJobQueue(
+        job_store=job_store,
+        statement_parser=MockModelService(),
+        storage_service=ThreadPoolAsyncStorageService(LocalStorageService(tmp_path), limiter=CapacityLimiter(2)),
+        concurrency=1,
+    )
+
+    async def run() -> list[StatementJob]:
+        try:
+            job = await job_queue.enqueue(bank_name="barclays", year=2025, month=1)
+            return await wait_until_finished(job_store, [job.id])
+        finally:
+            await job_queue.stop()
+
+    # ACT
+    [job] = asyncio.run(run())
+
+    # ASSERT
+    assert job.state == "failed"
+    assert job.error.startswith("Could not find file at path")
+    assert job.finished_at >= job.started_at >= job.created_at
+
+
+def test_statement_uploaded_again_before_job_runs_is_cached_under_its_own_sha256(tmp_path: Path) -> None:
+    # ARRANGE
+    local_storage_service = LocalStorageService(tmp_path)
+    job_store = StatementJobStore(tmp_path / ".jobs")
+    statement_parser = MockModelService()
+    job_queue = StatementJobQueue(
+        job_store=job_store,
+        statement_parser=statement_parser,
+        storage_service=ThreadPoolAsyncStorageService(local_storage_service, limiter=CapacityLimiter(2)),
+        concurrency=1,
+        parse_cache=ParseCache(tmp_path / ".parse_cache", max_bytes=1_000_000),
+    )
+    statement_x_sha256 = hashlib.sha256(b"Statement X").hexdigest()
+
+    async def run() -> list[StatementJob]:
+        try:
+            local_storage_service.store_statement(b"Statement X", bank_name="barclays", year=2025, month=1)
+            first_job = await job_queue.enqueue(
+                bank_name="barclays", year=2025, month=1, statement_sha256=statement_x_sha256
+            )
+            # replaced before the worker gets to read it
+            local_storage_service.store_statement(b"Statement Y", bank_name="barclays", year=2025, month=1)
+            await wait_until_finished(job_store, [first_job.id])
+
+            local_storage_service.store_statement(b"Statement X", bank_name="barclays", year=2025, month=2)
+            second_job = await job_queue.enqueue(
+                bank_name="barclays", year=2025, month=2, statement_sha256=statement_x_sha256
+            )
+            return await wait_until_finished(job_store, [first_job.id, second_job.id])
+        finally:
+            await job_queue.stop()
+
+    # ACT
+    first_job, second_job = asyncio.run(run())
+
+    # ASSERT
+    assert not first_job.cache_hit
+    assert not second_job.cache_hit
+    assert statement_parser.statements == ["Statement Y", "Statement X"]
+    assert local_storage_service.get_transactions_for_bank_for_date("barclays", 2025, 2)[0].description == "Statement X"
+
+
+def test_job_store_rejects_non_job_ids(tmp_path: Path) -> None:
+    job_store = StatementJobStore(tmp_path / ".jobs")
+
+    assert job_store.get("../manifest") is None
@@ -0,0 +1,40 @@
+from src.services.metrics.prometheus_metrics import Counter, Histogram, render_metrics
+
+
+def test_histogram_renders_cumulative_buckets_per_series() -> None:
+    # ARRANGE
+    histogram = Histogram("request_duration_seconds", "Request time.", ("route",), buckets=(0.1, 1.0))
+
+    # ACT
+    for value in [0.05, 0.1, 0.5, 2.0]:
+        histogram.observe(value, "/transactions/")
+
+    histogram.observe(0.2, "/jobs/{job_id}")
+
+    # ASSERT
+    assert render_metrics([histogram]).splitlines() == [
+        "# HELP request_duration_seconds Request time.",
+        "# TYPE request_duration_seconds histogram",
+        'request_duration_seconds_bucket{route="/jobs/{job_id}",le="0.1"} 0',
+        'request_duration_seconds_bucket{route="/jobs/{job_id}",le="1"} 1',
+        'request_duration_seconds_bucket{route="/jobs/{job_id}",le="+Inf"} 1',
+        'request_duration_seconds_sum{route="/jobs/{job_id}"} 0.2',
+        'request_duration_seconds_count{route="/jobs/{job_id}"} 1',
+        'request_duration_seconds_bucket{route="/transactions/",le="0.1"} 2',
+        'request_duration_seconds_bucket{route="/transactions/",le="1"} 3',
+        'request_duration_seconds_bucket{route="/transactions/",le="+Inf"} 4',
+        'request_duration_seconds_sum{route="/transactions/"} 2.65',
+        'request_duration_seconds_count{route="/transactions/"} 4',
+    ]
+
+
+def test_counter_escapes_label_values() -> None:
+    # ARRANGE
+    counter = Counter("tokens_total", "Tokens.", ("model",))
+
+    # ACT
+    counter.inc('gemini "flash"', amount=10)
+    counter.inc('gemini "flash"', amount=5)
+
+    # ASSERT
+    assert render_metrics([counter]).splitlines()[-1] == 'tokens_total{model="gemini \\"flash\\""} 15'
@@ -0,0 +1,124 @@
+import asyncio
+import re
+import time
+from datetime import date
+from pathlib import Path
+
+import pytest
+from pydantic_ai.exceptions import ModelHTTPError
+
+from src.dependencies import get_app_metrics, get_model_statement_parser
+from src.models import Transaction
+from src.services.metrics.app_metrics import AppMetrics
+from src.services.statement_parser.fake_model import FAKE_MODEL_NAME, build_fake_model
+from src.services.statement_parser.model_statement_parser import ModelStatementParser, \
+    ModelStatementParserException
+from src.settings import Settings
+
+STATEMENT_PAGES = [
+    "Barclays statement 2025-01\n2025-01-03 Salary 2500.00 0.00 2500.00",
+    "2025-01-05 Grocery Store 0.00 75.20 2424.80\nPage 2 of 2",
+]
+
+
+def build_statement_parser(**fake_model_kwargs) -> ModelStatementParser:
+    return ModelStatementParser(
+        api_key="unused",
+        model_name=FAKE_MODEL_NAME,
+        temperature=1,
+        max_tokens=8000,
+        top_p=0.95,
+        instructions="Extract the transactions.",
+        pages_per_window=1,
+        window_overlap_lines=1,
+        model=build_fake_model(**fake_model_kwargs),
+    )
+
+
+def test_fake_model_parses_transaction_lines_of_statement() -> None:
+    # ARRANGE
+    statement_parser = build_statement_parser(latency_median_seconds=0.05, latency_sigma=0, seed=0)
+
+    # ACT
+    start = time.perf_counter()
+    transactions = asyncio.run(statement_parser.parse_statement_pages(bank_name="Barclays", pages=STATEMENT_PAGES))
+    elapsed = time.perf_counter() - start
+
+    # ASSERT
+    assert transactions == [
+        Transaction(
+            bank_name="Barclays",
+            date=date(2025, 1, 3),
+            description="Salary",
+            amount_in=2500,
+            amount_out=0,
+            balance=2500,
+        ),
+        Transaction(
+            bank_name="Barclays",
+            date=date(2025, 1, 5),
+            description="Grocery Store",
+            amount_in=0,
+            amount_out=75.20,
+            balance=2424.80,
+        ),
+    ]
+    # both windows are answered concurrently
+    assert 0.05 <= elapsed < 0.1 * 2
+
+
+@pytest.mark.parametrize("fake_model_kwargs, status_code", [({"error_rate": 1}, 500), ({"rate_limit_rate": 1}, 429)])
+def test_fake_model_fails_at_configured_rate(fake_model_kwargs: dict[str, float], status_code: int) -> None:
+    # ARRANGE
+    statement_parser = build_statement_parser(**fake_model_kwargs)
+
+    # ACT & ASSERT
+    with pytest.raises(ModelStatementParserException) as exception_info:
+        asyncio.run(statement_parser.parse_transactions(bank_name="Barclays", statement=STATEMENT_PAGES[0]))
+
+    assert isinstance(exception_info.value.__cause__, ModelHTTPError)
+    assert exception_info.value.__cause__.status_code == status_code
+
+
+def test_model_calls_and_tokens_are_recorded() -> None:
+    # ARRANGE
+    metrics = AppMetrics()
+    statement_parser = build_statement_parser()
+    statement_parser.metrics = metrics
+
+    # ACT
+    asyncio.run(statement_parser.parse_statement_pages(bank_name="Barclays", pages=STATEMENT_PAGES))
+
+    # ASSERT
+    rendered_metrics = metrics.render()
+    assert 'model_request_duration_seconds_count{model="fake",outcome="success"} 2' in rendered_metrics
+    assert int(re.search(r'model_input_tokens_total\{model="fake"\} (\d+)', rendered_metrics).group(1)) > 0
+    assert int(re.search(r'model_output_tokens_total\{model="fake"\} (\d+)', rendered_metrics).group(1)) > 0
+
+
+def test_parser_from_dependencies_records_tokens_of_every_call(tmp_path: Path) -> None:
+    # ARRANGE
+    settings = Settings(
+        google_gen_ai_api_key="unused",
+        google_gen_ai_model_name="unused",
+        google_gen_ai_model_temp=1,
+        google_gen_ai_model_max_tokens=8000,
+        google_gen_ai_model_top_p=0.95,
+        google_gen_ai_model_prompt_path=Path("src/prompt.txt"),
+        statement_parser_model="fake",
+        local_storage_dir_path=tmp_path,
+    )
+    # the parser is built as the app builds it, with the process-wide metrics injected
+    statement_parser = get_model_statement_parser(settings)
+    rendered_metrics_before = get_app_metrics().render()
+
+    # ACT
+    transactions = asyncio.run(statement_parser.parse_statement_pages(bank_name="Barclays", pages=STATEMENT_PAGES))
+
+    # ASSERT
+    def count_input_tokens(rendered_metrics: str) -> int:
+        match = re.search(r'model_input_tokens_total\{model="fake"\} (\d+)', rendered_metrics)
+        return int(match.group(1)) if match else 0
+
+    assert len(transactions) == 2
+    assert count_input_tokens(get_app_metrics().render()) > count_input_tokens(rendered_metrics_before)
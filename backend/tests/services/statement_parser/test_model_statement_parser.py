@@ -0,0 +1,85 @@
+import asyncio
+import time
+from datetime import date
+
+from src.models import Transaction
+from src.services.statement_parser.model_statement_parser import ModelStatementParser
+
+
+def build_statement_parser(max_concurrent_windows: int = 8) -> ModelStatementParser:
+    return ModelStatementParser(
+        api_key="test-api-key",
+        model_name="gemini-test",
+        temperature=1,
+        max_tokens=8000,
+        top_p=0.95,
+        instructions="Extract the transactions.",
+        pages_per_window=1,
+        window_overlap_lines=0,
+        max_concurrent_windows=max_concurrent_windows,
+    )
+
+
+def parse_page(statement: str) -> list[Transaction]:
+    # each page holds one transaction paying in its page number on that day
+    page_numbers = [int(line) for line in statement.splitlines()]
+    return [
+        Transaction(
+            bank_name="Barclays",
+            date=date(2025, 1, page_number),
+            description=f"Page {page_number}",
+            amount_in=page_number,
+            amount_out=0,
+            balance=page_number * (page_number + 1) / 2,
+        )
+        for page_number in page_numbers
+    ]
+
+
+def test_parse_statement_pages_parses_windows_concurrently() -> None:
+    # ARRANGE
+    statement_parser = build_statement_parser()
+    pages = [str(page_number) for page_number in range(1, 21)]
+    active_windows = 0
+    max_active_windows = 0
+
+    async def parse_transactions(bank_name: str, statement: str) -> list[Transaction]:
+        nonlocal active_windows, max_active_windows
+        active_windows += 1
+        max_active_windows = max(max_active_windows, active_windows)
+        await asyncio.sleep(0.05)
+        active_windows -= 1
+        return parse_page(statement)
+
+    statement_parser.parse_transactions = parse_transactions
+
+    # ACT
+    start = time.perf_counter()
+    transactions = asyncio.run(statement_parser.parse_statement_pages(bank_name="Barclays", pages=pages))
+    elapsed = time.perf_counter() - start
+
+    # ASSERT
+    assert [transaction.amount_in for transaction in transactions] == list(range(1, 21))
+    assert max_active_windows == 8
+    # 20 windows at 8 at a time take three rounds rather than twenty
+    assert elapsed < 0.05 * 10
+
+
+def test_parse_statement_pages_falls_back_to_single_prompt() -> None:
+    # ARRANGE
+    statement_parser = build_statement_parser()
+    statements = []
+
+    async def parse_transactions(bank_name: str, statement: str) -> list[Transaction]:
+        statements.append(statement)
+        # the model misses page 2 when it is parsed on its own
+        return parse_page(statement) if statement != "2" else []
+
+    statement_parser.parse_transactions = parse_transactions
+
+    # ACT
+    transactions = asyncio.run(statement_parser.parse_statement_pages(bank_name="Barclays", pages=["1", "2", "3"]))
+
+    # ASSERT
+    assert statements[-1] == "1\n2\n3"
+    assert [transaction.amount_in for transaction in transactions] == [1, 2, 3]
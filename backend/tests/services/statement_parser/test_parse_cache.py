@@ -0,0 +1,71 @@
+from datetime import date
+from pathlib import Path
+
+from src.models import ParsedTransaction
+from src.services.statement_parser.parse_cache import ParseCache
+
+
+def build_transactions(description: str) -> list[ParsedTransaction]:
+    return [
+        ParsedTransaction(date=date(2025, 1, 3), description=description, amount_in=0, amount_out=75.2, balance=924.8)
+    ]
+
+
+def test_get_returns_put_transactions_and_counts_saved_time(tmp_path: Path) -> None:
+    # ARRANGE
+    parse_cache = ParseCache(tmp_path, max_bytes=1024 * 1024)
+    parse_cache.put("key", build_transactions("Grocery Store"), model_seconds=12.5)
+
+    # ACT
+    transactions = parse_cache.get("key")
+    missing_transactions = parse_cache.get("other-key")
+
+    # ASSERT
+    assert transactions == build_transactions("Grocery Store")
+    assert missing_transactions is None
+    stats = parse_cache.stats
+    assert (stats.hits, stats.misses, stats.hit_rate, stats.entries) == (1, 1, 0.5, 1)
+    assert stats.saved_model_seconds == 12.5
+
+
+def test_put_evicts_least_recently_used_over_max_bytes(tmp_path: Path) -> None:
+    # ARRANGE
+    probe_cache = ParseCache(tmp_path / "probe", max_bytes=1024 * 1024)
+    probe_cache.put("a", build_transactions("A"), model_seconds=1)
+    entry_bytes = probe_cache.stats.size_bytes
+    parse_cache = ParseCache(tmp_path / "cache", max_bytes=entry_bytes * 2)
+    parse_cache.put("a", build_transactions("A"), model_seconds=1)
+    parse_cache.put("b", build_transactions("B"), model_seconds=1)
+    parse_cache.get("a")
+
+    # ACT
+    parse_cache.put("c", build_transactions("C"), model_seconds=1)
+
+    # ASSERT
+    assert parse_cache.get("b") is None
+    assert parse_cache.get("a") is not None
+    assert parse_cache.get("c") is not None
+    assert parse_cache.stats.evictions == 1
+    assert sorted(path.stem for path in (tmp_path / "cache").glob("*.json")) == ["a", "c"]
+
+
+def test_entries_survive_restart(tmp_path: Path) -> None:
+    # ARRANGE
+    ParseCache(tmp_path, max_bytes=1024 * 1024).put("key", build_transactions("Salary"), model_seconds=3)
+
+    # ACT
+    parse_cache = ParseCache(tmp_path, max_bytes=1024 * 1024)
+
+    # ASSERT
+    assert parse_cache.stats.entries == 1
+    assert parse_cache.get("key") == build_transactions("Salary")
+
+
+def test_build_key_depends_on_model_configuration() -> None:
+    key = ParseCache.build_key("statement-sha", model_name="gemini", temperature=1, instructions="Parse it")
+
+    assert key == ParseCache.build_key("statement-sha", model_name="gemini", temperature=1, instructions="Parse it")
+    assert key != ParseCache.build_key("statement-sha", model_name="gemini", temperature=1, instructions="Parse")
+    assert key != ParseCache.build_key("statement-sha", model_name="gemini", temperature=0.5, instructions="Parse it")
+    assert key != ParseCache.build_key("statement-sha", model_name="other", temperature=1, instructions="Parse it")
+    assert key != ParseCache.build_key("other-sha", model_name="gemini", temperature=1, instructions="Parse it")
@@ -0,0 +1,106 @@
+import pytest
+
+from src.services.statement_parser.statement_preprocessor import StatementPreprocessorException, preprocess_statement
+
+
+def build_pdf(pages: list[list[str]]) -> bytes:
+    """Builds a minimal PDF with one line of Helvetica text per entry on each page."""
+
+    page_object_numbers = [4 + index * 2 for index in range(len(pages))]
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % number for number in page_object_numbers)
+        + b"] /Count %d >>" % len(pages),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+
+    for page_object_number, lines in zip(page_object_numbers, pages):
+        text_operations = b" ".join(b"(%s) Tj T*" % line.encode() for line in lines)
+        content = b"BT /F1 10 Tf 14 TL 50 780 Td " + text_operations + b" ET"
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> "
+            b"/Contents %d 0 R >>" % (page_object_number + 1)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+
+    xref_offset = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return pdf
+
+
+def test_preprocess_statement_extracts_pdf_text_without_repeated_headers() -> None:
+    # ARRANGE
+    statement_bytes = build_pdf(
+        [
+            ["Barclays Bank", "Account 12345678", "03 Jan Grocery Store 75.20 1924.80", "Page 1 of 2"],
+            ["Barclays Bank", "Account 12345678", "10 Jan   Salary   2500.00 4424.80", "Page 2 of 2"],
+        ]
+    )
+
+    # ACT
+    preprocessed_statement = preprocess_statement(statement_bytes)
+
+    # ASSERT
+    assert preprocessed_statement.text.splitlines() == [
+        "Barclays Bank",
+        "Account 12345678",
+        "03 Jan Grocery Store 75.20 1924.80",
+        "10 Jan Salary 2500.00 4424.80",
+    ]
+    assert preprocessed_statement.page_count == 2
+    assert preprocessed_statement.input_bytes == len(statement_bytes)
+    assert preprocessed_statement.estimated_tokens == -(-len(preprocessed_statement.text) // 4)
+    assert preprocessed_statement.estimated_tokens < preprocessed_statement.input_bytes / 4
+
+
+def test_preprocess_statement_keeps_repeated_transactions_inside_pages() -> None:
+    # ARRANGE
+    repeated_transaction = "05 Jan Coffee Shop 3.10 1000.00"
+    statement_bytes = build_pdf(
+        [
+            ["Header", "Columns", "Summary", repeated_transaction, "Middle 1", "End 1", "Footer A", "Footer B"],
+            ["Header", "Columns", "Summary", repeated_transaction, "Middle 2", "End 2", "Footer A", "Footer B"],
+        ]
+    )
+
+    # ACT
+    lines = preprocess_statement(statement_bytes).text.splitlines()
+
+    # ASSERT
+    assert lines.count(repeated_transaction) == 2
+    assert lines.count("Header") == 1
+    assert lines.count("Footer B") == 1
+
+
+def test_preprocess_statement_falls_back_to_text() -> None:
+    preprocessed_statement = preprocess_statement(b"Barclays statement\n\n  Salary   2500 \n")
+
+    assert preprocessed_statement.text == "Barclays statement\nSalary 2500"
+    assert preprocessed_statement.page_count == 1
+
+
+@pytest.mark.parametrize(
+    "statement_bytes",
+    [
+        b"%PDF-1.4 fake content\n\n  Salary   2500 \n",
+        build_pdf([["03 Jan Grocery Store 75.20 1924.80"]])[:200],
+        build_pdf([["03 Jan Grocery Store 75.20 1924.80"]]).replace(b"/Length 74", b"/Length (x)"),
+    ],
+)
+def test_preprocess_statement_rejects_unreadable_pdf(statement_bytes: bytes) -> None:
+    with pytest.raises(StatementPreprocessorException, match="not a readable PDF"):
+        preprocess_statement(statement_bytes)
+
+
+def test_preprocess_statement_without_text_raises() -> None:
+    with pytest.raises(StatementPreprocessorException):
+        preprocess_statement(build_pdf([[], []]))
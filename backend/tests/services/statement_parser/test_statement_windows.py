@@ -0,0 +1,49 @@
+from datetime import date
+
+import pytest
+
+from src.models import Transaction
+from src.services.statement_parser.statement_windows import StatementStitchingException, build_page_windows, \
+    stitch_window_transactions
+
+
+def build_transaction(day: int, amount_in: float, amount_out: float, balance: float) -> Transaction:
+    return Transaction(
+        bank_name="Barclays",
+        date=date(2025, 1, day),
+        description=f"Transaction {day}",
+        amount_in=amount_in,
+        amount_out=amount_out,
+        balance=balance,
+    )
+
+
+def test_build_page_windows_prefixes_overlap_lines() -> None:
+    pages = ["a1\na2\na3", "b1\nb2", "c1\nc2", "d1"]
+
+    windows = build_page_windows(pages, pages_per_window=2, overlap_lines=1)
+
+    assert windows == ["a1\na2\na3\nb1\nb2", "b2\nc1\nc2\nd1"]
+
+
+def test_stitch_window_transactions_drops_overlap_duplicates() -> None:
+    # ARRANGE
+    first = build_transaction(3, 0, 75.20, 1924.80)
+    second = build_transaction(10, 2500, 0, 4424.80)
+    third = build_transaction(25, 0, 120.50, 4304.30)
+    fourth = build_transaction(28, 10, 0, 4314.30)
+
+    # ACT
+    transactions = stitch_window_transactions([[first, second], [second, third], [], [fourth]])
+
+    # ASSERT
+    assert transactions == [first, second, third, fourth]
+
+
+def test_stitch_window_transactions_raises_on_balance_gap() -> None:
+    first = build_transaction(3, 0, 75.20, 1924.80)
+    # the 2500 salary on the 10th is missing
+    third = build_transaction(25, 0, 120.50, 4304.30)
+
+    with pytest.raises(StatementStitchingException):
+        stitch_window_transactions([[first], [third]])
@@ -0,0 +1,201 @@
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+from anyio import CapacityLimiter
+
+from src.services.metrics.app_metrics import AppMetrics
+from src.services.storage.async_storage_service import ThreadPoolAsyncStorageService
+from src.services.storage.local_storage_service import LocalStorageService
+from src.services.storage.storage_service import StorageServiceNotFoundException
+
+
+@pytest.fixture
+def local_storage_service(tmp_path: Path) -> LocalStorageService:
+    return LocalStorageService(tmp_path)
+
+
+@pytest.mark.parametrize(
+    "method_name, kwargs",
+    [
+        ("get_transactions_for_bank_for_date", {"bank_name": "barclays", "year": 2025, "month": 1}),
+        ("get_all_transactions_for_bank", {"bank_name": "lloyds"}),
+        ("get_all_transactions_for_date", {"year": 2025, "month": 1}),
+        ("get_all_transactions_for_bank_for_year", {"bank_name": "lloyds", "year": 2024}),
+        ("get_all_transactions_for_year", {"year": 2025}),
+        ("get_all_transactions", {}),
+    ],
+)
+def test_queries_match_storage_service(
+    mock_data: None, local_storage_service: LocalStorageService, method_name: str, kwargs: dict
+) -> None:
+    async_storage_service = ThreadPoolAsyncStorageService(local_storage_service, limiter=CapacityLimiter(2))
+
+    transactions = asyncio.run(getattr(async_storage_service, method_name)(**kwargs))
+
+    assert transactions == getattr(local_storage_service, method_name)(**kwargs)
+
+
+def test_get_all_transactions_for_date_raises_not_found(
+    mock_data: None, local_storage_service: LocalStorageService
+) -> None:
+    async_storage_service = ThreadPoolAsyncStorageService(local_storage_service, limiter=CapacityLimiter(2))
+
+    with pytest.raises(StorageServiceNotFoundException):
+        asyncio.run(async_storage_service.get_all_transactions_for_date(year=2023, month=1))
+
+
+def test_iter_transactions_yields_in_order(mock_data: None, local_storage_service: LocalStorageService) -> None:
+    # ARRANGE
+    async_storage_service = ThreadPoolAsyncStorageService(local_storage_service, limiter=CapacityLimiter(2))
+
+    async def collect() -> list:
+        return [transaction async for transaction in await async_storage_service.iter_transactions(year=2025)]
+
+    # ACT
+    transactions = asyncio.run(collect())
+
+    # ASSERT
+    assert transactions == local_storage_service.get_all_transactions_for_year(2025)
+
+
+def test_storage_calls_do_not_block_the_event_loop(
+    mock_data: None, local_storage_service: LocalStorageService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # ARRANGE
+    def slow_get_all_transactions() -> list:
+        time.sleep(0.2)
+        return []
+
+    monkeypatch.setattr(local_storage_service, "get_all_transactions", slow_get_all_transactions)
+    async_storage_service = ThreadPoolAsyncStorageService(local_storage_service, limiter=CapacityLimiter(8))
+    ticks = 0
+
+    async def tick() -> None:
+        nonlocal ticks
+
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    async def run() -> float:
+        start = time.perf_counter()
+        await asyncio.gather(async_storage_service.get_all_transactions(), tick())
+        return time.perf_counter() - start
+
+    # ACT
+    elapsed = asyncio.run(run())
+
+    # ASSERT
+    # the loop kept ticking while the storage call slept on a worker thread
+    assert ticks == 10
+    assert elapsed < 0.3
+
+
+@pytest.mark.parametrize(
+    "method_name, kwargs",
+    [
+        ("get_all_transactions_for_bank", {"bank_name": "lloyds"}),
+        ("get_all_transactions_for_date", {"year": 2025, "month": 1}),
+        ("get_all_transactions_for_bank_for_year", {"bank_name": "lloyds", "year": 2024}),
+        ("get_all_transactions_for_year", {"year": 2025}),
+        ("get_all_transactions", {}),
+    ],
+)
+def test_multi_partition_queries_run_the_backends_own_method(
+    mock_data: None,
+    local_storage_service: LocalStorageService,
+    monkeypatch: pytest.MonkeyPatch,
+    method_name: str,
+    kwargs: dict,
+) -> None:
+    # ARRANGE
+    expected_transactions = getattr(local_storage_service, method_name)(**kwargs)
+    calls = []
+
+    def get_transactions(**call_kwargs) -> list:
+        calls.append(call_kwargs)
+        return expected_transactions
+
+    monkeypatch.setattr(local_storage_service, method_name, get_transactions)
+    async_storage_service = ThreadPoolAsyncStorageService(local_storage_service, limiter=CapacityLimiter(2))
+
+    # ACT
+    transactions = asyncio.run(getattr(async_storage_service, method_name)(**kwargs))
+
+    # ASSERT
+    assert transactions is expected_transactions
+    assert calls == [kwargs]
+
+
+def test_storage_calls_are_timed_per_method(mock_data: None, local_storage_service: LocalStorageService) -> None:
+    # ARRANGE
+    metrics = AppMetrics()
+    async_storage_service = ThreadPoolAsyncStorageService(
+        local_storage_service, limiter=CapacityLimiter(2), metrics=metrics
+    )
+
+    async def read_transactions() -> None:
+        await async_storage_service.get_all_transactions_for_year(2025)
+        [transaction async for transaction in await async_storage_service.iter_transactions()]
+
+    # ACT
+    asyncio.run(read_transactions())
+
+    # ASSERT
+    rendered_metrics = metrics.render()
+    assert (
+        'storage_operation_duration_seconds_count{method="get_all_transactions_for_year",partitions="2-10"} 1'
+        in rendered_metrics
+    )
+    # opening the iterator plus one batch and the empty batch ending it
+    assert (
+        'storage_operation_duration_seconds_count{method="iter_transactions",partitions="2-10"} 3' in rendered_metrics
+    )
+
+
+@pytest.mark.parametrize(
+    "partition_count, expected_bucket",
+    [(0, "0"), (1, "1"), (2, "2-10"), (10, "2-10"), (11, "11-100"), (100, "11-100"), (101, "101+")],
+)
+def test_storage_calls_are_labelled_by_partitions_written(
+    local_storage_service: LocalStorageService, partition_count: int, expected_bucket: str
+) -> None:
+    # ARRANGE
+    metrics = AppMetrics()
+    async_storage_service = ThreadPoolAsyncStorageService(
+        local_storage_service, limiter=CapacityLimiter(2), metrics=metrics
+    )
+    partitions = {("barclays", 2000 + index // 12, index % 12 + 1): [] for index in range(partition_count)}
+
+    # ACT
+    asyncio.run(async_storage_service.store_many_transactions(partitions))
+
+    # ASSERT
+    assert (
+        f'storage_operation_duration_seconds_count{{method="store_many_transactions",partitions="{expected_bucket}"}} 1'
+        in metrics.render()
+    )
+
+
+def test_failed_storage_calls_are_labelled_by_partitions_read(
+    mock_data: None, local_storage_service: LocalStorageService
+) -> None:
+    # ARRANGE
+    metrics = AppMetrics()
+    async_storage_service = ThreadPoolAsyncStorageService(
+        local_storage_service, limiter=CapacityLimiter(2), metrics=metrics
+    )
+
+    # ACT
+    with pytest.raises(StorageServiceNotFoundException):
+        asyncio.run(async_storage_service.get_transactions_page(limit=10, bank_name="barclays", year=2030, month=1))
+
+    asyncio.run(async_storage_service.get_transactions_page(limit=10, bank_name="lloyds"))
+
+    # ASSERT
+    rendered_metrics = metrics.render()
+    page_series = 'storage_operation_duration_seconds_count{method="get_transactions_page",partitions="%s"}'
+    assert f"{page_series % '0'} 1" in rendered_metrics
+    assert f"{page_series % '2-10'} 1" in rendered_metrics
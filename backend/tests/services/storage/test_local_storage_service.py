@@ -1,12 +1,20 @@
+import hashlib
+import io
 import json
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from pathlib import Path
 
 import pytest
 
-from src.models import Transaction
+from src.models import StoredTransactions, Transaction
 from src.services.storage.local_storage_service import LocalStorageService
-from src.services.storage.storage_service import StorageServiceException
+from src.services.storage.partition_cache import PartitionCache
+from src.services.storage.storage_service import StorageServiceException, StorageServiceNotFoundException, \
+    STATEMENT_CHUNK_SIZE
+from src.services.storage.transaction_batch import TransactionBatch
+from src.services.storage.transaction_summary import build_partition_rollup
 
 
 @pytest.fixture
@@ -30,6 +38,51 @@ def test_store_statement_stores_expected_data_in_expected_location(
         assert statement_file.read() == statement_content
 
 
+def test_store_statement_stream_copies_in_chunks_and_returns_sha256(
+    tmp_path: Path, local_storage_service: LocalStorageService, large_statement_stream: tuple[io.BufferedReader, str]
+) -> None:
+    # ARRANGE
+    statement_stream, expected_sha256 = large_statement_stream
+    tracemalloc.start()
+
+    # ACT
+    try:
+        statement_sha256 = local_storage_service.store_statement_stream(
+            statement_stream=statement_stream, bank_name="Test Bank", year=2025, month=1
+        )
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # ASSERT
+    statement_path = tmp_path / "Test Bank" / "2025" / "01" / "statement.pdf"
+    assert statement_sha256 == expected_sha256
+    assert hashlib.sha256(statement_path.read_bytes()).hexdigest() == expected_sha256
+    assert peak_bytes < 4 * STATEMENT_CHUNK_SIZE
+    assert [path.name for path in statement_path.parent.iterdir()] == ["statement.pdf"]
+
+
+def test_store_statement_stream_leaves_no_temporary_file_on_failure(
+    tmp_path: Path, local_storage_service: LocalStorageService
+) -> None:
+    # ARRANGE
+    class FailingStream(io.RawIOBase):
+        def readable(self) -> bool:
+            return True
+
+        def readinto(self, buffer) -> int:
+            raise OSError("connection reset")
+
+    # ACT
+    with pytest.raises(OSError):
+        local_storage_service.store_statement_stream(
+            statement_stream=FailingStream(), bank_name="Test Bank", year=2025, month=1
+        )
+
+    # ASSERT
+    assert list((tmp_path / "Test Bank" / "2025" / "01").iterdir()) == []
+
+
 def test_get_statement_for_bank_on_date_file_exists(tmp_path: Path, local_storage_service: LocalStorageService) -> None:
     # ARRANGE
     statement_content = "PDF-1.4 fake content"
@@ -489,3 +542,400 @@ def test_get_all_transactions(mock_data: None, local_storage_service: LocalStora
         ),
     ]
     assert transactions == expected_transactions
+
+
+def test_get_transactions_for_bank_for_date_serves_repeat_reads_from_partition_cache(
+    tmp_path: Path, mock_data: None
+) -> None:
+    # ARRANGE
+    partition_cache = PartitionCache(max_entries=8)
+    local_storage_service = LocalStorageService(tmp_path, partition_cache=partition_cache)
+
+    # ACT
+    first_read = local_storage_service.get_transactions_for_bank_for_date(bank_name="barclays", year=2025, month=1)
+    second_read = local_storage_service.get_transactions_for_bank_for_date(bank_name="barclays", year=2025, month=1)
+
+    # ASSERT
+    assert first_read == second_read
+    assert partition_cache.stats.misses == 1
+    assert partition_cache.stats.hits == 1
+
+
+def test_warm_reads_return_transactions_independent_of_the_cache(tmp_path: Path, mock_data: None) -> None:
+    # ARRANGE
+    partition_cache = PartitionCache(max_entries=8)
+    local_storage_service = LocalStorageService(tmp_path, partition_cache=partition_cache)
+    expected_transactions = local_storage_service.get_all_transactions()
+    first_read = local_storage_service.get_transactions_for_bank_for_date(bank_name="barclays", year=2025, month=1)
+
+    # ACT
+    first_read[0].description = "HACKED"
+    first_read.clear()
+
+    # ASSERT
+    second_read = local_storage_service.get_transactions_for_bank_for_date(bank_name="barclays", year=2025, month=1)
+    assert second_read
+    assert all(transaction.description != "HACKED" for transaction in second_read)
+    assert local_storage_service.get_all_transactions() == expected_transactions
+    assert partition_cache.stats.hits > 0
+
+
+def test_get_transactions_for_bank_for_date_rereads_partition_changed_on_disk(tmp_path: Path, mock_data: None) -> None:
+    # ARRANGE
+    partition_cache = PartitionCache(max_entries=8)
+    local_storage_service = LocalStorageService(tmp_path, partition_cache=partition_cache)
+    local_storage_service.get_transactions_for_bank_for_date(bank_name="barclays", year=2025, month=1)
+
+    with open(tmp_path / "barclays" / "2025" / "01" / "transactions.json", "w") as stored_transactions_file:
+        json.dump({"transactions": []}, stored_transactions_file)
+
+    # ACT
+    transactions = local_storage_service.get_transactions_for_bank_for_date(bank_name="barclays", year=2025, month=1)
+
+    # ASSERT
+    assert transactions == []
+    assert partition_cache.stats.misses == 2
+
+
+def test_get_transactions_for_bank_for_date_skips_validation_for_partition_matching_manifest(
+    tmp_path: Path, mock_data: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # ARRANGE
+    local_storage_service = LocalStorageService(tmp_path)
+    local_storage_service.list_partitions()
+    file_path = tmp_path / "barclays" / "2025" / "01" / "transactions.json"
+    expected_transactions = StoredTransactions.model_validate_json(file_path.read_bytes()).transactions
+
+    def fail_validation(*args, **kwargs) -> None:
+        raise AssertionError("partition was validated again")
+
+    monkeypatch.setattr(StoredTransactions, "model_validate_json", fail_validation)
+
+    # ACT
+    transactions = local_storage_service.get_transactions_for_bank_for_date(bank_name="barclays", year=2025, month=1)
+
+    # ASSERT
+    assert transactions == expected_transactions
+
+
+def test_get_transactions_for_bank_for_date_validates_partition_changed_on_disk(
+    tmp_path: Path, mock_data: None
+) -> None:
+    # ARRANGE
+    local_storage_service = LocalStorageService(tmp_path)
+    local_storage_service.list_partitions()
+    file_path = tmp_path / "barclays" / "2025" / "01" / "transactions.json"
+    file_path.write_text(json.dumps({"transactions": [{"bank_name": "barclays"}]}))
+
+    # ACT & ASSERT
+    with pytest.raises(StorageServiceException):
+        local_storage_service.get_transactions_for_bank_for_date(bank_name="barclays", year=2025, month=1)
+
+
+def test_stored_amounts_read_back_exactly(tmp_path: Path) -> None:
+    # ARRANGE
+    local_storage_service = LocalStorageService(tmp_path, partition_cache=PartitionCache(max_entries=8))
+    transaction = Transaction(
+        bank_name="barclays",
+        date=date(2025, 1, 1),
+        description="Transaction 1",
+        amount_in=0,
+        amount_out=12.345,
+        balance=987.655,
+    )
+    local_storage_service.store_transactions(transactions=[transaction], bank_name="barclays", year=2025, month=1)
+
+    # ACT
+    transactions = local_storage_service.get_transactions_for_bank_for_date(bank_name="barclays", year=2025, month=1)
+
+    # ASSERT
+    assert transactions == [transaction]
+    assert local_storage_service.get_all_transactions() == [transaction]
+
+
+def test_store_transactions_rejects_amounts_too_large_to_total(tmp_path: Path) -> None:
+    # ARRANGE
+    local_storage_service = LocalStorageService(tmp_path)
+    transaction = Transaction(
+        bank_name="barclays",
+        date=date(2025, 1, 1),
+        description="Transaction 1",
+        amount_in=1e17,
+        amount_out=0,
+        balance=1e17,
+    )
+
+    # ACT & ASSERT
+    with pytest.raises(StorageServiceException, match="Cannot store transactions for barclays 2025-01"):
+        local_storage_service.store_transactions(transactions=[transaction], bank_name="barclays", year=2025, month=1)
+
+    assert not (tmp_path / "barclays" / "2025" / "01" / "transactions.json").exists()
+
+
+def test_store_transactions_invalidates_cached_partition(tmp_path: Path, mock_data: None) -> None:
+    # ARRANGE
+    partition_cache = PartitionCache(max_entries=8)
+    local_storage_service = LocalStorageService(tmp_path, partition_cache=partition_cache)
+    local_storage_service.get_transactions_for_bank_for_date(bank_name="barclays", year=2025, month=1)
+
+    # ACT
+    local_storage_service.store_transactions(transactions=[], bank_name="barclays", year=2025, month=1)
+
+    # ASSERT
+    assert partition_cache.stats.size == 0
+    assert local_storage_service.get_transactions_for_bank_for_date(bank_name="barclays", year=2025, month=1) == []
+
+
+def test_partition_cache_evicts_least_recently_used_partition(tmp_path: Path, mock_data: None) -> None:
+    # ARRANGE
+    partition_cache = PartitionCache(max_entries=2)
+    local_storage_service = LocalStorageService(tmp_path, partition_cache=partition_cache)
+
+    # ACT
+    local_storage_service.get_transactions_for_bank_for_date(bank_name="barclays", year=2025, month=1)
+    local_storage_service.get_transactions_for_bank_for_date(bank_name="barclays", year=2025, month=2)
+    local_storage_service.get_transactions_for_bank_for_date(bank_name="barclays", year=2025, month=1)
+    local_storage_service.get_transactions_for_bank_for_date(bank_name="monzo", year=2025, month=1)
+    local_storage_service.get_transactions_for_bank_for_date(bank_name="barclays", year=2025, month=1)
+
+    # ASSERT
+    assert partition_cache.stats.evictions == 1
+    assert partition_cache.stats.hits == 2
+    assert partition_cache.stats.size == 2
+
+
+def test_get_all_transactions_for_date_skips_banks_without_that_month(
+    mock_data: None, local_storage_service: LocalStorageService
+) -> None:
+    transactions = local_storage_service.get_all_transactions_for_date(year=2025, month=2)
+
+    assert [transaction.description for transaction in transactions] == ["Gym Membership", "Bonus"]
+
+
+def test_get_all_transactions_for_date_raises_not_found_if_no_bank_has_that_month(
+    mock_data: None, local_storage_service: LocalStorageService
+) -> None:
+    with pytest.raises(StorageServiceNotFoundException):
+        local_storage_service.get_all_transactions_for_date(year=2023, month=1)
+
+
+def test_concurrent_writers_to_same_partition_leave_manifest_matching_file(tmp_path: Path) -> None:
+    # ARRANGE
+    local_storage_service = LocalStorageService(tmp_path)
+    local_storage_service.rebuild_manifest()
+
+    def store(writer: int) -> None:
+        transactions = [
+            Transaction(
+                bank_name="barclays",
+                date=date(2025, 1, 1 + row),
+                description=f"Writer {writer}",
+                amount_in=writer,
+                amount_out=0,
+                balance=writer * (row + 1),
+            )
+            for row in range(writer % 5 + 1)
+        ]
+        local_storage_service.store_transactions(transactions=transactions, bank_name="barclays", year=2025, month=1)
+
+    # ACT
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(store, range(64)))
+
+    # ASSERT
+    [manifest_entry] = local_storage_service.list_partitions()
+    file_bytes = (tmp_path / "barclays" / "2025" / "01" / "transactions.json").read_bytes()
+    stored_transactions = StoredTransactions.model_validate_json(file_bytes).transactions
+    assert manifest_entry.checksum == hashlib.sha256(file_bytes).hexdigest()
+    assert manifest_entry.rollup == build_partition_rollup(TransactionBatch.from_transactions(stored_transactions))
+    assert list((tmp_path / "barclays" / "2025" / "01").glob(".*.tmp")) == []
+
+
+def test_store_transactions_updates_manifest(tmp_path: Path, mock_data: None) -> None:
+    # ARRANGE
+    local_storage_service = LocalStorageService(tmp_path)
+    local_storage_service.rebuild_manifest()
+    transactions = [
+        Transaction(
+            bank_name="Test Bank",
+            date=date.fromisoformat("2025-03-04"),
+            description="Transaction 1",
+            amount_in=100,
+            amount_out=0,
+            balance=500,
+        ),
+        Transaction(
+            bank_name="Test Bank",
+            date=date.fromisoformat("2025-03-01"),
+            description="Transaction 2",
+            amount_in=0,
+            amount_out=150,
+            balance=350,
+        ),
+    ]
+
+    # ACT
+    local_storage_service.store_transactions(transactions=transactions, bank_name="Test Bank", year=2025, month=3)
+
+    # ASSERT
+    entry = LocalStorageService(tmp_path).manifest.get(bank_name="Test Bank", year=2025, month=3)
+    file_bytes = (tmp_path / "Test Bank" / "2025" / "03" / "transactions.json").read_bytes()
+    assert entry is not None
+    assert entry.row_count == 2
+    assert entry.min_date == date.fromisoformat("2025-03-01")
+    assert entry.max_date == date.fromisoformat("2025-03-04")
+    assert entry.file_size == len(file_bytes)
+    assert entry.checksum == hashlib.sha256(file_bytes).hexdigest()
+    assert len(local_storage_service.manifest.find()) == 6
+
+
+def test_store_many_transactions_writes_manifest_once(
+    tmp_path: Path, mock_data: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # ARRANGE
+    local_storage_service = LocalStorageService(tmp_path)
+    local_storage_service.rebuild_manifest()
+    manifest_writes = []
+    write_manifest = local_storage_service.manifest._write
+
+    def record_manifest_write(entries: dict) -> None:
+        manifest_writes.append(entries)
+        write_manifest(entries)
+
+    monkeypatch.setattr(local_storage_service.manifest, "_write", record_manifest_write)
+    partitions = {
+        ("Test Bank", 2025, month): [
+            Transaction(
+                bank_name="Test Bank",
+                date=date(2025, month, 1),
+                description=f"Transaction {month}",
+                amount_in=100,
+                amount_out=0,
+                balance=500,
+            )
+        ]
+        for month in range(1, 13)
+    }
+
+    # ACT
+    local_storage_service.store_many_transactions(partitions)
+
+    # ASSERT
+    assert len(manifest_writes) == 1
+    assert len(local_storage_service.list_partitions(bank_name="Test Bank")) == 12
+    assert local_storage_service.get_all_transactions_for_bank("Test Bank") == [
+        transaction for transactions in partitions.values() for transaction in transactions
+    ]
+
+
+def test_rebuild_manifest_indexes_every_partition_on_disk(
+    tmp_path: Path, mock_data: None, local_storage_service: LocalStorageService
+) -> None:
+    entries = local_storage_service.rebuild_manifest()
+
+    assert [(entry.bank_name, entry.year, entry.month, entry.row_count) for entry in entries] == [
+        ("barclays", 2025, 1, 3),
+        ("barclays", 2025, 2, 2),
+        ("lloyds", 2024, 12, 2),
+        ("lloyds", 2025, 1, 2),
+        ("monzo", 2025, 1, 3),
+    ]
+    assert (tmp_path / "manifest.json").is_file()
+
+
+def test_iter_transactions_matches_get_all_transactions(
+    mock_data: None, local_storage_service: LocalStorageService
+) -> None:
+    assert list(local_storage_service.iter_transactions()) == local_storage_service.get_all_transactions()
+
+
+def test_iter_transactions_keeps_date_order_across_overlapping_partitions(
+    local_storage_service: LocalStorageService,
+) -> None:
+    # ARRANGE
+    def transaction(bank_name: str, transaction_date: str) -> Transaction:
+        return Transaction(
+            bank_name=bank_name,
+            date=date.fromisoformat(transaction_date),
+            description=f"{bank_name} {transaction_date}",
+            amount_in=0,
+            amount_out=1,
+            balance=100,
+        )
+
+    # a statement period that runs past the end of its month overlaps the next month's partition
+    local_storage_service.store_transactions(
+        transactions=[transaction("A", "2025-01-20"), transaction("A", "2025-02-03")], bank_name="a", year=2025, month=1
+    )
+    local_storage_service.store_transactions(
+        transactions=[transaction("B", "2025-02-01"), transaction("B", "2025-02-10")], bank_name="b", year=2025, month=2
+    )
+    local_storage_service.store_transactions(
+        transactions=[transaction("A", "2025-03-01")], bank_name="a", year=2025, month=3
+    )
+
+    # ACT
+    transactions = list(local_storage_service.iter_transactions())
+
+    # ASSERT
+    assert [t.description for t in transactions] == [
+        "A 2025-01-20", "B 2025-02-01", "A 2025-02-03", "B 2025-02-10", "A 2025-03-01"
+    ]
+
+
+def test_iter_transactions_raises_not_found_for_missing_month(
+    mock_data: None, local_storage_service: LocalStorageService
+) -> None:
+    with pytest.raises(StorageServiceNotFoundException):
+        local_storage_service.iter_transactions(bank_name="monzo", year=2025, month=2)
+
+
+def test_get_transactions_page_skips_partitions_before_cursor(
+    mock_data: None, local_storage_service: LocalStorageService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # ARRANGE
+    first_page = local_storage_service.get_transactions_page(limit=11)
+    loaded_partitions = []
+    get_transaction_batch_for_bank_for_date = local_storage_service.get_transaction_batch_for_bank_for_date
+
+    def record_partition_load(bank_name: str, year: int, month: int) -> TransactionBatch:
+        loaded_partitions.append((bank_name, year, month))
+        return get_transaction_batch_for_bank_for_date(bank_name=bank_name, year=year, month=month)
+
+    monkeypatch.setattr(local_storage_service, "get_transaction_batch_for_bank_for_date", record_partition_load)
+
+    # ACT
+    second_page = local_storage_service.get_transactions_page(limit=11, after=first_page.next_cursor)
+
+    # ASSERT
+    assert [transaction.description for transaction in second_page.transactions] == ["Bonus"]
+    assert second_page.next_cursor is None
+    assert loaded_partitions == [("barclays", 2025, 2)]
+
+
+def test_iter_transactions_filters_date_range_without_loading_other_partitions(
+    mock_data: None, local_storage_service: LocalStorageService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # ARRANGE
+    loaded_partitions = []
+    get_transaction_batch_for_bank_for_date = local_storage_service.get_transaction_batch_for_bank_for_date
+
+    def record_partition_load(bank_name: str, year: int, month: int) -> TransactionBatch:
+        loaded_partitions.append((bank_name, year, month))
+        return get_transaction_batch_for_bank_for_date(bank_name=bank_name, year=year, month=month)
+
+    start_date, end_date = date(2024, 12, 20), date(2025, 1, 5)
+    expected_transactions = [
+        transaction
+        for transaction in local_storage_service.get_all_transactions()
+        if start_date <= transaction.date <= end_date
+    ]
+    monkeypatch.setattr(local_storage_service, "get_transaction_batch_for_bank_for_date", record_partition_load)
+
+    # ACT
+    transactions = list(local_storage_service.iter_transactions(start_date=start_date, end_date=end_date))
+
+    # ASSERT
+    assert transactions == expected_transactions
+    assert transactions
+    assert ("barclays", 2025, 2) not in loaded_partitions
@@ -0,0 +1,141 @@
+from datetime import date
+from itertools import islice
+from typing import Callable
+
+from src.models import PartitionManifestEntry, Transaction
+from src.services.storage.merge import merge_partitions
+from src.services.storage.pagination import TransactionCursor
+from src.services.storage.transaction_batch import TransactionBatch
+
+
+def build_partition(
+    bank_name: str, year: int, month: int, dates: list[str]
+) -> tuple[PartitionManifestEntry, list[Transaction]]:
+    transactions = [
+        Transaction(
+            bank_name=bank_name,
+            date=date.fromisoformat(transaction_date),
+            description=f"{bank_name} {position}",
+            amount_in=0,
+            amount_out=1,
+            balance=100,
+        )
+        for position, transaction_date in enumerate(dates)
+    ]
+    entry = PartitionManifestEntry(
+        bank_name=bank_name,
+        year=year,
+        month=month,
+        row_count=len(transactions),
+        min_date=min((t.date for t in transactions), default=None),
+        max_date=max((t.date for t in transactions), default=None),
+        file_size=0,
+        checksum="",
+    )
+    return entry, transactions
+
+
+def partition_loader(
+    partitions: list[tuple[PartitionManifestEntry, list[Transaction]]],
+) -> Callable[[PartitionManifestEntry], TransactionBatch]:
+    batches_by_key = {
+        (entry.bank_name, entry.year, entry.month): TransactionBatch.from_transactions(transactions)
+        for entry, transactions in partitions
+    }
+    return lambda entry: batches_by_key[(entry.bank_name, entry.year, entry.month)]
+
+
+def test_merge_partitions_is_stable_across_banks_and_unsorted_partitions() -> None:
+    # ARRANGE
+    partitions = [
+        build_partition("b", 2025, 1, ["2025-01-02", "2025-01-01", "2025-01-02"]),
+        build_partition("a", 2025, 1, ["2025-01-02", "2025-01-03"]),
+        build_partition("a", 2024, 12, []),
+    ]
+    expected = sorted(
+        (t for _, transactions in partitions for t in transactions),
+        key=lambda t: (t.date, t.bank_name),
+    )
+
+    # ACT
+    keyed_transactions = list(merge_partitions([entry for entry, _ in partitions], partition_loader(partitions)))
+
+    # ASSERT
+    assert [t.description for _, t in keyed_transactions] == [t.description for t in expected]
+    assert [key for key, _ in keyed_transactions] == sorted(key for key, _ in keyed_transactions)
+    assert [t.description for _, t in keyed_transactions] == ["b 1", "a 0", "b 0", "b 2", "a 1"]
+
+
+def test_merge_partitions_loads_partitions_only_when_reached() -> None:
+    # ARRANGE
+    partitions = [
+        build_partition("a", 2025, 1, ["2025-01-01", "2025-01-20"]),
+        build_partition("a", 2025, 2, ["2025-02-01", "2025-02-20"]),
+        build_partition("b", 2025, 2, ["2025-02-05"]),
+    ]
+    loaded = []
+    load_partition = partition_loader(partitions)
+
+    def record_partition_load(entry: PartitionManifestEntry) -> TransactionBatch:
+        loaded.append((entry.bank_name, entry.month))
+        return load_partition(entry)
+
+    # ACT
+    first_two = list(islice(merge_partitions([entry for entry, _ in partitions], record_partition_load), 2))
+
+    # ASSERT
+    assert [t.description for _, t in first_two] == ["a 0", "a 1"]
+    assert loaded == [("a", 1)]
+
+
+def test_merge_partitions_starts_after_cursor() -> None:
+    # ARRANGE
+    partitions = [
+        build_partition("a", 2025, 1, ["2025-01-01", "2025-01-02", "2025-01-02"]),
+        build_partition("b", 2025, 1, ["2025-01-02"]),
+    ]
+    after = TransactionCursor(date(2025, 1, 2), "a", 2025, 1, 1)
+
+    # ACT
+    keyed_transactions = list(
+        merge_partitions([entry for entry, _ in partitions], partition_loader(partitions), after=after)
+    )
+
+    # ASSERT
+    assert [t.description for _, t in keyed_transactions] == ["a 2", "b 0"]
+
+
+def test_merge_partitions_yields_only_dates_within_range() -> None:
+    # ARRANGE
+    partitions = [
+        build_partition("a", 2025, 1, ["2025-01-05", "2025-01-01", "2025-01-31", "2025-02-01"]),
+        build_partition("b", 2025, 1, ["2025-01-01", "2025-01-05", "2025-01-06"]),
+    ]
+    after = TransactionCursor(date(2025, 1, 5), "a", 2025, 1, 0)
+    full_merge = list(merge_partitions([entry for entry, _ in partitions], partition_loader(partitions)))
+
+    # ACT
+    keyed_transactions = list(
+        merge_partitions(
+            [entry for entry, _ in partitions],
+            partition_loader(partitions),
+            start_date=date(2025, 1, 2),
+            end_date=date(2025, 1, 31),
+        )
+    )
+    keyed_transactions_after = list(
+        merge_partitions(
+            [entry for entry, _ in partitions],
+            partition_loader(partitions),
+            after=after,
+            start_date=date(2025, 1, 2),
+            end_date=date(2025, 1, 31),
+        )
+    )
+
+    # ASSERT
+    assert keyed_transactions == [
+        (key, t) for key, t in full_merge if date(2025, 1, 2) <= t.date <= date(2025, 1, 31)
+    ]
+    assert [t.description for _, t in keyed_transactions] == ["a 0", "b 1", "b 2", "a 2"]
+    assert [t.description for _, t in keyed_transactions_after] == ["b 1", "b 2", "a 2"]
@@ -0,0 +1,111 @@
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.models import Transaction
+from src.services.storage.local_storage_service import LocalStorageService
+from src.services.storage.parquet_storage_service import ParquetStorageService
+from src.services.storage.storage_service import StorageServiceNotFoundException
+
+
+@pytest.fixture
+def parquet_storage_service(tmp_path: Path) -> ParquetStorageService:
+    return ParquetStorageService(tmp_path)
+
+
+@pytest.fixture
+def converted_mock_data(mock_data: None, tmp_path: Path, parquet_storage_service: ParquetStorageService) -> None:
+    local_storage_service = LocalStorageService(tmp_path)
+
+    for partition in local_storage_service.rebuild_manifest():
+        parquet_storage_service.store_transactions(
+            transactions=local_storage_service.get_transactions_for_bank_for_date(
+                bank_name=partition.bank_name, year=partition.year, month=partition.month
+            ),
+            bank_name=partition.bank_name,
+            year=partition.year,
+            month=partition.month,
+        )
+
+
+def test_store_transactions_writes_typed_parquet_partition(
+    tmp_path: Path, parquet_storage_service: ParquetStorageService
+) -> None:
+    # ARRANGE
+    transactions = [
+        Transaction(
+            bank_name="Test Bank",
+            date=date.fromisoformat("2025-01-01"),
+            description="Transaction 1",
+            amount_in=100.1,
+            amount_out=0,
+            balance=500.29,
+        ),
+    ]
+
+    # ACT
+    parquet_storage_service.store_transactions(transactions=transactions, bank_name="test", year=2025, month=1)
+
+    # ASSERT
+    frame = pd.read_parquet(tmp_path / "test" / "2025" / "01" / "transactions.parquet")
+    assert frame["amount_in"].tolist() == [10010]
+    assert frame["balance"].tolist() == [50029]
+    assert parquet_storage_service.get_transactions_for_bank_for_date(bank_name="test", year=2025, month=1) == (
+        transactions
+    )
+
+
+def test_get_all_transactions_for_date_not_exists(
+    converted_mock_data: None, parquet_storage_service: ParquetStorageService
+) -> None:
+    with pytest.raises(StorageServiceNotFoundException):
+        parquet_storage_service.get_all_transactions_for_date(year=2023, month=1)
+
+
+def test_get_all_transactions_raises_not_found_for_partition_deleted_behind_manifest(
+    tmp_path: Path, converted_mock_data: None, parquet_storage_service: ParquetStorageService
+) -> None:
+    # ARRANGE
+    parquet_storage_service.list_partitions()
+    (tmp_path / "barclays" / "2025" / "01" / "transactions.parquet").unlink()
+
+    # ACT & ASSERT
+    with pytest.raises(StorageServiceNotFoundException):
+        parquet_storage_service.get_all_transactions_for_bank("barclays")
+
+
+def test_get_transactions_frame_is_date_ordered(
+    converted_mock_data: None, parquet_storage_service: ParquetStorageService
+) -> None:
+    frame = parquet_storage_service.get_transactions_frame(year=2025)
+
+    assert len(frame) == 10
+    assert frame["date"].is_monotonic_increasing
+
+
+@pytest.mark.parametrize(
+    "method_name, kwargs",
+    [
+        ("get_transactions_for_bank_for_date", {"bank_name": "barclays", "year": 2025, "month": 1}),
+        ("get_all_transactions_for_bank", {"bank_name": "lloyds"}),
+        ("get_all_transactions_for_date", {"year": 2025, "month": 1}),
+        ("get_all_transactions_for_bank_for_year", {"bank_name": "lloyds", "year": 2024}),
+        ("get_all_transactions_for_year", {"year": 2025}),
+        ("get_all_transactions", {}),
+        ("get_all_transactions_for_bank", {"bank_name": "unknown"}),
+    ],
+)
+def test_queries_match_local_storage_service(
+    tmp_path: Path,
+    converted_mock_data: None,
+    parquet_storage_service: ParquetStorageService,
+    method_name: str,
+    kwargs: dict,
+) -> None:
+    local_storage_service = LocalStorageService(tmp_path)
+
+    transactions = getattr(parquet_storage_service, method_name)(**kwargs)
+
+    assert transactions == getattr(local_storage_service, method_name)(**kwargs)
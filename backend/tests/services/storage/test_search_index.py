@@ -0,0 +1,181 @@
+import sqlite3
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from src.models import Transaction
+from src.scripts.migrate_local_to_sqlite import migrate_local_storage
+from src.services.storage.local_storage_service import LocalStorageService
+from src.services.storage.pagination import TransactionCursor
+from src.services.storage.parquet_storage_service import ParquetStorageService
+from src.services.storage.search_index import SearchTerm, parse_search_query, tokenize
+from src.services.storage.sqlite_storage_service import SqliteStorageService
+from src.services.storage.storage_service import StorageService, StorageServiceNotFoundException
+
+
+@pytest.fixture
+def storage_services(mock_data: None, tmp_path: Path) -> list[StorageService]:
+    local_storage_service = LocalStorageService(tmp_path)
+    sqlite_storage_service = SqliteStorageService(tmp_path / "db" / "storage.sqlite3", pool_size=1)
+    migrate_local_storage(local_storage_service, sqlite_storage_service)
+    parquet_storage_service = ParquetStorageService(tmp_path)
+    parquet_storage_service.store_many_transactions(
+        {
+            (partition.bank_name, partition.year, partition.month): (
+                local_storage_service.get_transactions_for_bank_for_date(
+                    bank_name=partition.bank_name, year=partition.year, month=partition.month
+                )
+            )
+            for partition in local_storage_service.list_partitions()
+        }
+    )
+    yield [local_storage_service, sqlite_storage_service, parquet_storage_service]
+
+    sqlite_storage_service.close()
+
+
+def test_tokenize_splits_on_punctuation_and_lowercases() -> None:
+    # ACT & ASSERT
+    assert tokenize("NETFLIX.COM 12/01 Card_Payment") == ["netflix", "com", "12", "01", "card", "payment"]
+
+
+def test_parse_search_query_marks_prefix_terms() -> None:
+    # ACT
+    terms = parse_search_query("netflix.com  sub*")
+
+    # ASSERT
+    assert terms == [
+        SearchTerm(token="netflix", prefix=False),
+        SearchTerm(token="com", prefix=False),
+        SearchTerm(token="sub", prefix=True),
+    ]
+
+
+@pytest.mark.parametrize("query", ["", "  ", "*", "--"])
+def test_parse_search_query_rejects_query_without_terms(query: str) -> None:
+    # ACT & ASSERT
+    with pytest.raises(ValueError):
+        parse_search_query(query)
+
+
+@pytest.mark.parametrize(
+    "query, expected_descriptions",
+    [
+        ("groceries", ["Groceries"]),
+        ("GROCER*", ["Grocery Store", "Groceries"]),
+        ("re*", ["Restaurant", "Gift Received"]),
+        ("store grocery", ["Grocery Store"]),
+        ("payment", ["Freelance Payment"]),
+        ("netflix", []),
+    ],
+)
+def test_search_transactions_matches_tokens_and_prefixes_in_date_order(
+    storage_services: list[StorageService], query: str, expected_descriptions: list[str]
+) -> None:
+    # ACT
+    pages = [
+        storage_service.search_transactions(query=query, limit=100, year=2025)
+        for storage_service in storage_services
+    ]
+
+    # ASSERT
+    for page in pages:
+        assert sorted(transaction.description for transaction in page.transactions) == sorted(expected_descriptions)
+        assert [transaction.date for transaction in page.transactions] == sorted(
+            transaction.date for transaction in page.transactions
+        )
+        assert page.transactions == pages[0].transactions
+        assert page.next_cursor is None
+
+
+def test_search_transactions_paginates_with_cursor(storage_services: list[StorageService]) -> None:
+    for storage_service in storage_services:
+        # ARRANGE
+        expected_transactions = storage_service.search_transactions(query="r*", limit=100).transactions
+
+        # ACT
+        transactions = []
+        after: TransactionCursor | None = None
+
+        while True:
+            page = storage_service.search_transactions(query="r*", limit=1, after=after)
+            transactions.extend(page.transactions)
+
+            if page.next_cursor is None:
+                break
+
+            after = page.next_cursor
+
+        # ASSERT
+        assert len(expected_transactions) > 1
+        assert transactions == expected_transactions
+
+
+def test_search_transactions_reindexes_overwritten_partition(storage_services: list[StorageService]) -> None:
+    for storage_service in storage_services:
+        # ARRANGE
+        storage_service.search_transactions(query="groceries", limit=10)
+
+        # ACT
+        storage_service.store_transactions(
+            transactions=[
+                Transaction(
+                    bank_name="Monzo",
+                    date=date(2025, 1, 20),
+                    description="Netflix Subscription",
+                    amount_in=0,
+                    amount_out=10.99,
+                    balance=100,
+                )
+            ],
+            bank_name="monzo",
+            year=2025,
+            month=1,
+        )
+
+        # ASSERT
+        assert storage_service.search_transactions(query="groceries", limit=10).transactions == []
+        assert [
+            transaction.description
+            for transaction in storage_service.search_transactions(query="netflix", limit=10).transactions
+        ] == ["Netflix Subscription"]
+
+
+def test_search_transactions_raises_not_found_for_missing_month(storage_services: list[StorageService]) -> None:
+    for storage_service in storage_services:
+        # ACT & ASSERT
+        with pytest.raises(StorageServiceNotFoundException):
+            storage_service.search_transactions(query="groceries", limit=10, year=2023, month=1)
+
+
+def test_local_search_indexes_partitions_without_index_file(mock_data: None, tmp_path: Path) -> None:
+    # ARRANGE
+    local_storage_service = LocalStorageService(tmp_path)
+
+    # ACT
+    page = local_storage_service.search_transactions(query="salary", limit=10)
+
+    # ASSERT
+    assert [transaction.description for transaction in page.transactions] == ["Salary"]
+    assert (tmp_path / "barclays" / "2025" / "01" / "search_index.json").is_file()
+
+
+def test_sqlite_indexes_existing_transactions_when_search_is_added(mock_data: None, tmp_path: Path) -> None:
+    # ARRANGE
+    db_file_path = tmp_path / "db" / "storage.sqlite3"
+    sqlite_storage_service = SqliteStorageService(db_file_path, pool_size=1)
+    migrate_local_storage(LocalStorageService(tmp_path), sqlite_storage_service)
+    sqlite_storage_service.close()
+
+    # a database written before search existed
+    with sqlite3.connect(db_file_path) as connection:
+        connection.execute("DROP TABLE search_tokens")
+
+    # ACT
+    sqlite_storage_service = SqliteStorageService(db_file_path, pool_size=1)
+    page = sqlite_storage_service.search_transactions(query="salary", limit=10)
+    sqlite_storage_service.close()
+
+    # ASSERT
+    assert [transaction.description for transaction in page.transactions] == ["Salary"]
@@ -0,0 +1,297 @@
+import hashlib
+import io
+import tracemalloc
+from datetime import date
+from pathlib import Path
+from typing import Generator, Any
+
+import pytest
+
+from src.models import Transaction
+from src.scripts.migrate_local_to_sqlite import migrate_local_storage
+from src.services.storage.local_storage_service import LocalStorageService
+from src.services.storage import sqlite_storage_service as sqlite_storage_module
+from src.services.storage.sqlite_storage_service import SqliteStorageService
+from src.services.storage.storage_service import StorageServiceException, StorageServiceNotFoundException, \
+    STATEMENT_CHUNK_SIZE
+
+
+@pytest.fixture
+def sqlite_storage_service(tmp_path: Path) -> Generator[SqliteStorageService, Any, None]:
+    sqlite_storage_service = SqliteStorageService(tmp_path / "db" / "storage.sqlite3", pool_size=2)
+    yield sqlite_storage_service
+
+    sqlite_storage_service.close()
+
+
+@pytest.fixture
+def migrated_mock_data(mock_data: None, tmp_path: Path, sqlite_storage_service: SqliteStorageService) -> None:
+    migrate_local_storage(LocalStorageService(tmp_path), sqlite_storage_service)
+
+
+def test_store_statement_and_get_statement_for_bank_on_date(sqlite_storage_service: SqliteStorageService) -> None:
+    # ARRANGE
+    statement_content = "PDF-1.4 fake content"
+
+    # ACT
+    sqlite_storage_service.store_statement(
+        statement_bytes=statement_content.encode("utf-8"), bank_name="Test Bank", year=2025, month=1
+    )
+
+    # ASSERT
+    statement = sqlite_storage_service.get_statement_for_bank_on_date(bank_name="Test Bank", year=2025, month=1)
+    assert statement == statement_content
+
+
+def test_store_statement_stream_writes_blob_in_chunks_and_returns_sha256(
+    sqlite_storage_service: SqliteStorageService, large_statement_stream: tuple[io.BufferedReader, str]
+) -> None:
+    # ARRANGE
+    statement_stream, expected_sha256 = large_statement_stream
+    tracemalloc.start()
+
+    # ACT
+    try:
+        statement_sha256 = sqlite_storage_service.store_statement_stream(
+            statement_stream=statement_stream, bank_name="Test Bank", year=2025, month=1
+        )
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # ASSERT
+    statement_bytes = sqlite_storage_service.get_statement_bytes_for_bank_on_date(
+        bank_name="Test Bank", year=2025, month=1
+    )
+    assert statement_sha256 == expected_sha256
+    assert hashlib.sha256(statement_bytes).hexdigest() == expected_sha256
+    assert peak_bytes < 4 * STATEMENT_CHUNK_SIZE
+
+
+def test_get_statement_for_bank_on_date_does_not_exist(sqlite_storage_service: SqliteStorageService) -> None:
+    with pytest.raises(StorageServiceException, match="Could not find statement"):
+        sqlite_storage_service.get_statement_for_bank_on_date(bank_name="Test Bank", year=2025, month=1)
+
+
+def test_store_transactions_replaces_partition(sqlite_storage_service: SqliteStorageService) -> None:
+    # ARRANGE
+    first_upload = [
+        Transaction(
+            bank_name="Test Bank",
+            date=date.fromisoformat("2025-01-01"),
+            description="Transaction 1",
+            amount_in=100,
+            amount_out=0,
+            balance=500,
+        ),
+        Transaction(
+            bank_name="Test Bank",
+            date=date.fromisoformat("2025-01-05"),
+            description="Transaction 2",
+            amount_in=0,
+            amount_out=150,
+            balance=350,
+        ),
+    ]
+    second_upload = [first_upload[1]]
+
+    # ACT
+    sqlite_storage_service.store_transactions(transactions=first_upload, bank_name="test", year=2025, month=1)
+    sqlite_storage_service.store_transactions(transactions=second_upload, bank_name="test", year=2025, month=1)
+
+    # ASSERT
+    transactions = sqlite_storage_service.get_transactions_for_bank_for_date(bank_name="test", year=2025, month=1)
+    assert transactions == second_upload
+
+
+def test_store_transactions_records_partition_modification_time(sqlite_storage_service: SqliteStorageService) -> None:
+    # ARRANGE
+    transactions = [
+        Transaction(
+            bank_name="test", date=date(2025, 1, 1), description="Transaction", amount_in=0, amount_out=10, balance=90
+        )
+    ]
+    sqlite_storage_service.store_transactions(transactions=transactions, bank_name="test", year=2025, month=1)
+    [first_partition] = sqlite_storage_service.list_partitions()
+
+    # ACT
+    sqlite_storage_service.store_transactions(transactions=transactions, bank_name="test", year=2025, month=1)
+
+    # ASSERT
+    [partition] = sqlite_storage_service.list_partitions()
+    assert partition.checksum == first_partition.checksum
+    assert partition.modified_at > first_partition.modified_at
+    assert partition.modified_at.tzinfo is not None
+
+
+def test_store_many_transactions_stores_every_partition(sqlite_storage_service: SqliteStorageService) -> None:
+    # ARRANGE
+    partitions = {
+        (bank_name, 2025, 1): [
+            Transaction(
+                bank_name=bank_name,
+                date=date(2025, 1, day),
+                description="Transaction",
+                amount_in=0,
+                amount_out=10,
+                balance=100 - day,
+            )
+            for day in (1, 2)
+        ]
+        for bank_name in ("barclays", "monzo")
+    }
+
+    # ACT
+    sqlite_storage_service.store_many_transactions(partitions)
+
+    # ASSERT
+    assert [(partition.bank_name, partition.row_count) for partition in sqlite_storage_service.list_partitions()] == [
+        ("barclays", 2),
+        ("monzo", 2),
+    ]
+    assert sqlite_storage_service.get_transactions_for_bank_for_date("monzo", 2025, 1) == partitions[("monzo", 2025, 1)]
+
+
+def test_get_transactions_for_bank_for_date_empty_partition(sqlite_storage_service: SqliteStorageService) -> None:
+    sqlite_storage_service.store_transactions(transactions=[], bank_name="test", year=2025, month=1)
+
+    assert sqlite_storage_service.get_transactions_for_bank_for_date(bank_name="test", year=2025, month=1) == []
+
+
+def test_get_transactions_for_bank_for_date_not_exists(sqlite_storage_service: SqliteStorageService) -> None:
+    with pytest.raises(StorageServiceNotFoundException):
+        sqlite_storage_service.get_transactions_for_bank_for_date(bank_name="test", year=2025, month=1)
+
+
+def test_get_all_transactions_for_date_not_exists(
+    migrated_mock_data: None, sqlite_storage_service: SqliteStorageService
+) -> None:
+    with pytest.raises(StorageServiceNotFoundException):
+        sqlite_storage_service.get_all_transactions_for_date(year=2023, month=1)
+
+
+@pytest.mark.parametrize(
+    "method_name, kwargs",
+    [
+        ("get_transactions_for_bank_for_date", {"bank_name": "barclays", "year": 2025, "month": 1}),
+        ("get_all_transactions_for_bank", {"bank_name": "lloyds"}),
+        ("get_all_transactions_for_date", {"year": 2025, "month": 1}),
+        ("get_all_transactions_for_bank_for_year", {"bank_name": "lloyds", "year": 2024}),
+        ("get_all_transactions_for_year", {"year": 2025}),
+        ("get_all_transactions", {}),
+    ],
+)
+def test_queries_match_local_storage_service(
+    tmp_path: Path,
+    migrated_mock_data: None,
+    sqlite_storage_service: SqliteStorageService,
+    method_name: str,
+    kwargs: dict,
+) -> None:
+    local_storage_service = LocalStorageService(tmp_path)
+
+    transactions = getattr(sqlite_storage_service, method_name)(**kwargs)
+
+    assert transactions
+    assert transactions == getattr(local_storage_service, method_name)(**kwargs)
+
+
+def test_migrate_local_storage_imports_statements(tmp_path: Path, sqlite_storage_service: SqliteStorageService) -> None:
+    # ARRANGE
+    local_storage_service = LocalStorageService(tmp_path / "local")
+    local_storage_service.store_statement(statement_bytes=b"PDF-1.4 fake content", bank_name="test", year=2025, month=1)
+
+    # ACT
+    migrate_local_storage(local_storage_service, sqlite_storage_service)
+
+    # ASSERT
+    statement = sqlite_storage_service.get_statement_for_bank_on_date(bank_name="test", year=2025, month=1)
+    assert statement == "PDF-1.4 fake content"
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"bank_name": "lloyds"}, {"year": 2025, "month": 1}])
+def test_iter_transactions_matches_local_storage_service(
+    tmp_path: Path, migrated_mock_data: None, sqlite_storage_service: SqliteStorageService, kwargs: dict
+) -> None:
+    local_storage_service = LocalStorageService(tmp_path)
+
+    transactions = list(sqlite_storage_service.iter_transactions(**kwargs))
+
+    assert transactions == list(local_storage_service.iter_transactions(**kwargs))
+
+
+def test_iter_transactions_reads_pages_without_holding_a_connection(
+    tmp_path: Path, migrated_mock_data: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # ARRANGE
+    monkeypatch.setattr(sqlite_storage_module, "_FETCH_SIZE", 2)
+    single_connection_service = SqliteStorageService(
+        tmp_path / "db" / "storage.sqlite3", pool_size=1, pool_timeout_seconds=0.1
+    )
+    local_storage_service = LocalStorageService(tmp_path)
+
+    try:
+        # ACT
+        transactions = single_connection_service.iter_transactions()
+        search_results = single_connection_service.iter_keyed_search_results("e*")
+        first_transaction = next(transactions)
+        next(search_results)
+        # the only connection is back in the pool while both iterators are suspended mid-page
+        partitions = single_connection_service.list_partitions()
+        remaining_transactions = list(transactions)
+        search_page = single_connection_service.search_transactions("e*", limit=3)
+
+        # ASSERT
+        assert [first_transaction, *remaining_transactions] == list(local_storage_service.iter_transactions())
+        assert len(partitions) == 5
+        assert search_page == local_storage_service.search_transactions("e*", limit=3)
+    finally:
+        single_connection_service.close()
+
+
+def test_connection_checkout_times_out_with_storage_exception(tmp_path: Path) -> None:
+    # ARRANGE
+    single_connection_service = SqliteStorageService(
+        tmp_path / "db" / "storage.sqlite3", pool_size=1, pool_timeout_seconds=0.05
+    )
+
+    try:
+        with single_connection_service._pool.connection():
+            # ACT & ASSERT
+            with pytest.raises(StorageServiceException, match="waiting for a database connection"):
+                single_connection_service.list_partitions()
+    finally:
+        single_connection_service.close()
+
+
+def test_iter_transactions_raises_not_found_for_missing_month(
+    migrated_mock_data: None, sqlite_storage_service: SqliteStorageService
+) -> None:
+    with pytest.raises(StorageServiceNotFoundException):
+        sqlite_storage_service.iter_transactions(bank_name="monzo", year=2025, month=2)
+
+
+def test_get_transactions_page_matches_local_storage_service(
+    tmp_path: Path, migrated_mock_data: None, sqlite_storage_service: SqliteStorageService
+) -> None:
+    local_storage_service = LocalStorageService(tmp_path)
+    first_page = local_storage_service.get_transactions_page(limit=4, year=2025)
+
+    page = sqlite_storage_service.get_transactions_page(limit=4, year=2025, after=first_page.next_cursor)
+
+    assert page == local_storage_service.get_transactions_page(limit=4, year=2025, after=first_page.next_cursor)
+
+
+def test_get_transactions_page_filters_date_range_like_local_storage_service(
+    tmp_path: Path, migrated_mock_data: None, sqlite_storage_service: SqliteStorageService
+) -> None:
+    local_storage_service = LocalStorageService(tmp_path)
+    date_range = {"start_date": date(2024, 12, 20), "end_date": date(2025, 1, 15)}
+    first_page = local_storage_service.get_transactions_page(limit=2, **date_range)
+
+    page = sqlite_storage_service.get_transactions_page(limit=2, after=first_page.next_cursor, **date_range)
+
+    assert page == local_storage_service.get_transactions_page(limit=2, after=first_page.next_cursor, **date_range)
+    assert list(sqlite_storage_service.iter_transactions(**date_range)) == list(
+        local_storage_service.iter_transactions(**date_range)
+    )
@@ -0,0 +1,134 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from src.models import Transaction
+from src.services.storage.transaction_batch import TransactionBatch
+
+
+@pytest.fixture
+def transactions() -> list[Transaction]:
+    return [
+        Transaction(
+            bank_name="Barclays",
+            date=date(2025, 1, 5),
+            description="Grocery Store",
+            amount_in=0,
+            amount_out=75.20,
+            balance=1924.80,
+        ),
+        Transaction(
+            bank_name="Barclays",
+            date=date(2025, 1, 3),
+            description="Salary",
+            amount_in=2500,
+            amount_out=0,
+            balance=2000,
+        ),
+        Transaction(
+            bank_name="Barclays",
+            date=date(2025, 1, 5),
+            description="Grocery Store",
+            amount_in=0,
+            amount_out=0.1,
+            balance=1924.70,
+        ),
+    ]
+
+
+def test_from_transactions_round_trips_transactions(transactions: list[Transaction]) -> None:
+    # ACT
+    batch = TransactionBatch.from_transactions(transactions)
+
+    # ASSERT
+    assert batch.to_transactions() == transactions
+    assert [batch.transaction(position) for position in range(len(batch))] == transactions
+    assert batch.to_pence("amount_out").tolist() == [7520, 0, 10]
+    assert (batch.min_date, batch.max_date) == (date(2025, 1, 3), date(2025, 1, 5))
+
+
+def test_from_transactions_interns_repeated_strings(transactions: list[Transaction]) -> None:
+    # ARRANGE
+    descriptions = ["".join(["Grocery", " Store"]) for _ in transactions]
+    assert descriptions[0] is not descriptions[2]
+
+    # ACT
+    batch = TransactionBatch.from_transactions(
+        transaction.model_copy(update={"description": description})
+        for transaction, description in zip(transactions, descriptions)
+    )
+
+    # ASSERT
+    assert batch.descriptions[0] is batch.descriptions[2]
+    assert batch.bank_names[0] is batch.bank_names[1]
+
+
+def test_sort_by_date_is_stable(transactions: list[Transaction]) -> None:
+    # ARRANGE
+    batch = TransactionBatch.from_transactions(transactions)
+
+    # ACT
+    sorted_batch = batch.sort_by_date()
+
+    # ASSERT
+    assert sorted_batch.to_transactions() == sorted(transactions, key=lambda t: t.date)
+    assert sorted_batch.sort_by_date() is sorted_batch
+
+
+def test_concat_and_take_keep_rows_together(transactions: list[Transaction]) -> None:
+    # ARRANGE
+    batches = [
+        TransactionBatch.from_transactions(transactions[:1]),
+        TransactionBatch.from_transactions(transactions[1:]),
+    ]
+
+    # ACT
+    batch = TransactionBatch.concat(batches).take(np.array([2, 0]))
+
+    # ASSERT
+    assert batch.to_transactions() == [transactions[2], transactions[0]]
+    assert len(TransactionBatch.concat([])) == 0
+
+
+def test_frame_round_trips_batch(transactions: list[Transaction]) -> None:
+    # ARRANGE
+    batch = TransactionBatch.from_transactions(transactions)
+
+    # ACT
+    frame = batch.to_frame()
+
+    # ASSERT
+    assert frame["amount_in"].tolist() == [0, 250000, 0]
+    assert frame["date"].dt.day.tolist() == [5, 3, 5]
+    assert TransactionBatch.from_frame(frame).to_transactions() == transactions
+
+
+def test_amounts_are_kept_as_given_and_only_rounded_to_pence_for_totals(transactions: list[Transaction]) -> None:
+    # ARRANGE
+    transactions = [transactions[0].model_copy(update={"amount_out": 12.345}), transactions[1]]
+
+    # ACT
+    batch = TransactionBatch.from_records([transaction.model_dump(mode="json") for transaction in transactions])
+
+    # ASSERT
+    assert batch.to_transactions() == transactions
+    assert batch.to_pence("amount_out").tolist() == [1234, 0]
+
+
+def test_to_pence_rejects_amounts_beyond_int64_pence(transactions: list[Transaction]) -> None:
+    # ARRANGE
+    batch = TransactionBatch.from_transactions([transactions[0].model_copy(update={"balance": 1e17})])
+
+    # ACT & ASSERT
+    with pytest.raises(ValueError):
+        batch.to_pence("balance")
+
+
+def test_batch_columns_are_read_only(transactions: list[Transaction]) -> None:
+    # ARRANGE
+    batch = TransactionBatch.from_transactions(transactions)
+
+    # ACT & ASSERT
+    with pytest.raises(ValueError):
+        batch.balance[0] = 0
@@ -0,0 +1,317 @@
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.models import PartitionRollup, Transaction, TransactionSummary, TransactionSummaryGroup
+from src.scripts.migrate_local_to_sqlite import migrate_local_storage
+from src.scripts.verify_rollups import find_stale_rollups, repair_rollups
+from src.services.storage.local_storage_service import LocalStorageService
+from src.services.storage.parquet_storage_service import ParquetStorageService
+from src.services.storage.sqlite_storage_service import SqliteStorageService
+from src.services.storage.storage_service import StorageServiceNotFoundException
+from src.services.storage.transaction_batch import TransactionBatch
+from src.services.storage.transaction_summary import build_partition_rollup, summarise_partition_rollups, \
+    summarise_transactions_frame
+
+
+def build_frame(rows: list[tuple[str, str, int, int, int]]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "bank_name": [row[0] for row in rows],
+            "date": pd.to_datetime([date.fromisoformat(row[1]) for row in rows]),
+            "description": ["" for _ in rows],
+            "amount_in": [row[2] for row in rows],
+            "amount_out": [row[3] for row in rows],
+            "balance": [row[4] for row in rows],
+        }
+    )
+
+
+def test_summarise_transactions_frame_groups_by_bank_and_month() -> None:
+    # ARRANGE
+    frame = build_frame(
+        [
+            ("Barclays", "2025-01-03", 0, 7520, 192480),
+            ("Monzo", "2025-01-05", 5000, 0, 105000),
+            ("Barclays", "2025-01-10", 250000, 0, 442480),
+            ("Barclays", "2025-02-02", 0, 4500, 437980),
+        ]
+    )
+
+    # ACT
+    summaries = summarise_transactions_frame(frame, group_by=["bank", "month"])
+
+    # ASSERT
+    assert summaries == [
+        TransactionSummary(
+            bank_name="Barclays",
+            period="2025-01",
+            transaction_count=2,
+            money_in=2500,
+            money_out=75.2,
+            net=2424.8,
+            closing_balance=4424.8,
+        ),
+        TransactionSummary(
+            bank_name="Barclays",
+            period="2025-02",
+            transaction_count=1,
+            money_in=0,
+            money_out=45,
+            net=-45,
+            closing_balance=4379.8,
+        ),
+        TransactionSummary(
+            bank_name="Monzo",
+            period="2025-01",
+            transaction_count=1,
+            money_in=50,
+            money_out=0,
+            net=50,
+            closing_balance=1050,
+        ),
+    ]
+
+
+def test_summarise_transactions_frame_sums_closing_balance_of_each_bank_in_period() -> None:
+    # ARRANGE
+    frame = build_frame(
+        [
+            ("Barclays", "2024-12-30", 0, 100, 1000),
+            ("Monzo", "2025-01-01", 0, 100, 500),
+            ("Barclays", "2025-01-02", 0, 100, 900),
+            ("Barclays", "2025-01-06", 0, 100, 800),
+        ]
+    )
+
+    # ACT
+    summaries = summarise_transactions_frame(frame, group_by=["week"])
+
+    # ASSERT
+    assert [(summary.period, summary.transaction_count, summary.closing_balance) for summary in summaries] == [
+        ("2025-W01", 3, 14),
+        ("2025-W02", 1, 8),
+    ]
+
+
+def test_summarise_transactions_frame_without_groups_returns_single_total() -> None:
+    # ARRANGE
+    frame = build_frame([("Barclays", "2025-01-03", 100, 0, 100), ("Monzo", "2025-03-01", 0, 50, 200)])
+
+    # ACT
+    summaries = summarise_transactions_frame(frame, group_by=[])
+
+    # ASSERT
+    assert summaries == [
+        TransactionSummary(transaction_count=2, money_in=1, money_out=0.5, net=0.5, closing_balance=3)
+    ]
+
+
+def test_summarise_transactions_frame_returns_empty_list_for_no_transactions() -> None:
+    # ACT
+    summaries = summarise_transactions_frame(build_frame([]), group_by=["bank", "day"])
+
+    # ASSERT
+    assert summaries == []
+
+
+def test_summarise_transactions_frame_rejects_multiple_periods() -> None:
+    # ACT & ASSERT
+    with pytest.raises(ValueError):
+        summarise_transactions_frame(build_frame([("Barclays", "2025-01-03", 100, 0, 100)]), ["month", "day"])
+
+
+@pytest.mark.parametrize("group_by", [["bank", "month"], ["bank"], ["year"], ["week"], ["day"], []])
+def test_get_transaction_summary_matches_across_storage_backends(
+    mock_data: None, tmp_path: Path, group_by: list[TransactionSummaryGroup]
+) -> None:
+    # ARRANGE
+    local_storage_service = LocalStorageService(tmp_path)
+    sqlite_storage_service = SqliteStorageService(tmp_path / "db" / "storage.sqlite3", pool_size=1)
+    migrate_local_storage(local_storage_service, sqlite_storage_service)
+    parquet_storage_service = ParquetStorageService(tmp_path)
+    parquet_storage_service.store_many_transactions(
+        {
+            (partition.bank_name, partition.year, partition.month): (
+                local_storage_service.get_transactions_for_bank_for_date(
+                    bank_name=partition.bank_name, year=partition.year, month=partition.month
+                )
+            )
+            for partition in local_storage_service.list_partitions()
+        }
+    )
+
+    # ACT
+    summaries = [
+        storage_service.get_transaction_summary(group_by=group_by, year=2025)
+        for storage_service in [local_storage_service, sqlite_storage_service, parquet_storage_service]
+    ]
+    sqlite_storage_service.close()
+
+    # ASSERT
+    assert summaries[0]
+    assert summaries[0] == summaries[1] == summaries[2]
+
+
+def test_get_transaction_summary_raises_not_found_for_missing_month(mock_data: None, tmp_path: Path) -> None:
+    # ARRANGE
+    local_storage_service = LocalStorageService(tmp_path)
+
+    # ACT & ASSERT
+    with pytest.raises(StorageServiceNotFoundException):
+        local_storage_service.get_transaction_summary(group_by=["bank"], year=2023, month=1)
+
+
+def test_build_partition_rollup_totals_partition_in_pence() -> None:
+    # ARRANGE
+    transactions = [
+        Transaction(
+            bank_name="Barclays",
+            date=date(2025, 1, 10),
+            description="Salary",
+            amount_in=2500,
+            amount_out=0,
+            balance=4424.80,
+        ),
+        Transaction(
+            bank_name="Barclays",
+            date=date(2025, 1, 3),
+            description="Grocery Store",
+            amount_in=0,
+            amount_out=75.20,
+            balance=1924.80,
+        ),
+    ]
+
+    # ACT
+    rollup = build_partition_rollup(TransactionBatch.from_transactions(transactions))
+
+    # ASSERT
+    assert rollup == PartitionRollup(
+        bank_name="Barclays", money_in=250000, money_out=7520, opening_balance=200000, closing_balance=442480
+    )
+
+
+def test_build_partition_rollup_returns_none_for_mixed_bank_names() -> None:
+    # ARRANGE
+    transactions = [
+        Transaction(bank_name=bank_name, date=date(2025, 1, 3), description="", amount_in=1, amount_out=0, balance=1)
+        for bank_name in ["Barclays", "Monzo"]
+    ]
+
+    # ACT & ASSERT
+    assert build_partition_rollup(TransactionBatch.from_transactions(transactions)) is None
+    assert build_partition_rollup(TransactionBatch.from_transactions([])) is None
+
+
+@pytest.mark.parametrize("group_by", [["bank", "month"], ["bank", "year"], ["month"], ["year"], ["bank"], []])
+def test_summarise_partition_rollups_matches_transactions_frame(
+    mock_data: None, tmp_path: Path, group_by: list[TransactionSummaryGroup]
+) -> None:
+    # ARRANGE
+    local_storage_service = LocalStorageService(tmp_path)
+
+    # ACT
+    summaries = summarise_partition_rollups(local_storage_service.list_partitions(), group_by)
+
+    # ASSERT
+    assert summaries is not None
+    assert summaries == summarise_transactions_frame(local_storage_service.get_transactions_frame(), group_by)
+
+
+def test_summarise_partition_rollups_declines_when_rollups_cannot_answer_exactly(
+    mock_data: None, tmp_path: Path
+) -> None:
+    # ARRANGE
+    local_storage_service = LocalStorageService(tmp_path)
+    local_storage_service.store_transactions(
+        transactions=[
+            Transaction(
+                bank_name="Monzo", date=date(2025, 2, 28), description="", amount_in=1, amount_out=0, balance=1
+            ),
+            Transaction(
+                bank_name="Monzo", date=date(2025, 3, 1), description="", amount_in=1, amount_out=0, balance=2
+            ),
+        ],
+        bank_name="monzo",
+        year=2025,
+        month=3,
+    )
+    partitions = local_storage_service.list_partitions()
+    partitions_without_rollup = [partition.model_copy(update={"rollup": None}) for partition in partitions]
+
+    # ACT & ASSERT
+    assert summarise_partition_rollups(partitions, ["week"]) is None
+    assert summarise_partition_rollups(partitions, ["month"]) is None
+    assert summarise_partition_rollups(partitions, ["year"]) is not None
+    assert summarise_partition_rollups(partitions_without_rollup, ["year"]) is None
+
+
+def test_store_transactions_recomputes_rollup_when_partition_is_overwritten(
+    mock_data: None, tmp_path: Path
+) -> None:
+    # ARRANGE
+    local_storage_service = LocalStorageService(tmp_path)
+    sqlite_storage_service = SqliteStorageService(tmp_path / "db" / "storage.sqlite3", pool_size=1)
+    transactions = [
+        Transaction(
+            bank_name="Barclays", date=date(2025, 1, 31), description="Refund", amount_in=10, amount_out=0, balance=60
+        )
+    ]
+
+    # ACT
+    for storage_service in [local_storage_service, sqlite_storage_service]:
+        storage_service.store_transactions(transactions=transactions, bank_name="barclays", year=2025, month=1)
+
+    # ASSERT
+    expected_rollup = PartitionRollup(
+        bank_name="Barclays", money_in=1000, money_out=0, opening_balance=5000, closing_balance=6000
+    )
+
+    for storage_service in [local_storage_service, sqlite_storage_service]:
+        [partition] = storage_service.list_partitions(bank_name="barclays", year=2025, month=1)
+        assert partition.rollup == expected_rollup
+
+    sqlite_storage_service.close()
+
+
+def test_verify_rollups_finds_and_repairs_stale_rollups(mock_data: None, tmp_path: Path) -> None:
+    # ARRANGE
+    local_storage_service = LocalStorageService(tmp_path)
+    partitions = local_storage_service.list_partitions()
+
+    # a manifest written before rollups existed
+    local_storage_service.manifest.replace_all(
+        [partition.model_copy(update={"rollup": None}) for partition in partitions]
+    )
+
+    # ACT
+    stale_partitions = find_stale_rollups(local_storage_service)
+    repair_rollups(local_storage_service, stale_partitions)
+
+    # ASSERT
+    assert len(stale_partitions) == len(partitions)
+    assert find_stale_rollups(local_storage_service) == []
+    assert [partition.rollup for partition in local_storage_service.list_partitions()] == [
+        partition.rollup for partition in partitions
+    ]
+
+
+def test_verify_rollups_finds_stale_sqlite_rollup(mock_data: None, tmp_path: Path) -> None:
+    # ARRANGE
+    sqlite_storage_service = SqliteStorageService(tmp_path / "db" / "storage.sqlite3", pool_size=1)
+    migrate_local_storage(LocalStorageService(tmp_path), sqlite_storage_service)
+
+    with sqlite_storage_service._pool.connection() as connection, connection:
+        connection.execute("UPDATE partition_rollups SET money_in = 0 WHERE bank_name = 'monzo'")
+
+    # ACT
+    stale_partitions = find_stale_rollups(sqlite_storage_service)
+    sqlite_storage_service.close()
+
+    # ASSERT
+    assert [(partition.bank_name, partition.year, partition.month) for partition in stale_partitions] == [
+        ("monzo", 2025, 1)
+    ]